@@ -1,11 +1,27 @@
 import streamlit as st
 import os
+import secrets
+import time
+import uuid
 from dotenv import load_dotenv
-from utils.document_processor import extract_text_from_file
-from utils.question_generator import generate_interview_questions
-from utils.answer_evaluator import evaluate_answer
+from utils.document_processor import extract_document
+from utils.question_generator import (stream_interview_questions, stream_followup_question,
+                                      finalize_followup_question, generate_followup_question)
+from utils.answer_evaluator import evaluate_answer, stream_evaluation, evaluate_answers_batch, prescored_evaluation
+from utils.evaluation_store import EvaluationStore, evaluation_key
+from utils.question_dedup import QuestionIndex
+from utils.job_queue import CANCELLED, DONE, JobLimitExceeded, get_job_queue
+from utils.prefetch import get_prefetcher, prefetch_enabled
+from utils.prescorer import REASON_LABELS, confident_prescore
+from utils.report_export import export_store, interview_report, parquet_available
+from utils.scheduler import BULK, INTERACTIVE
+from utils.session_store import get_session_store, token_owner, user_owner
+from utils.token_budget import get_token_stats, session_budget_from_env, use_budget
+from utils.telemetry import bind_session, configure_logging, recent_spans, render_prometheus
+from utils.warmup import start_background_warm_up
 
 load_dotenv()
+configure_logging()
 st.set_page_config(
     page_title="AI Interview Agent",
     page_icon="🎯",
@@ -20,18 +36,399 @@ if 'questions' not in st.session_state:
     st.session_state.questions = []
 if 'current_question_idx' not in st.session_state:
     st.session_state.current_question_idx = 0
-if 'evaluations' not in st.session_state:
-    st.session_state.evaluations = []
+if 'evaluation_store' not in st.session_state:
+    st.session_state.evaluation_store = EvaluationStore()
+if 'answers' not in st.session_state:
+    st.session_state.answers = {}
 if 'ai_model' not in st.session_state:
     st.session_state.ai_model = 'gemini'
+if 'token_budget' not in st.session_state:
+    st.session_state.token_budget = session_budget_from_env()
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = []
+if 'job_messages' not in st.session_state:
+    st.session_state.job_messages = []
+if 'prefetch' not in st.session_state:
+    st.session_state.prefetch = prefetch_enabled()
+
+session_store = get_session_store()
+job_queue = get_job_queue()
+prefetcher = get_prefetcher()
+JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', 1))
+
+def reset_interview():
+    for job_id in st.session_state.jobs:
+        job_queue.cancel(job_id)
+    st.session_state.jobs = []
+    st.session_state.pop('job_partials', None)
+    st.session_state.pop('generation_timings', None)
+    st.session_state.job_description = None
+    st.session_state.resume_text = None
+    st.session_state.questions = []
+    st.session_state.current_question_idx = 0
+    st.session_state.answers = {}
+    st.session_state.evaluation_store = EvaluationStore()
+    # Answer widgets keep their own state by key; drop it so the next session's answers show.
+    for key in [k for k in st.session_state if str(k).startswith('answer_')]:
+        del st.session_state[key]
+
+def restore_session(session_id, record):
+    reset_interview()
+    st.session_state.session_id = session_id
+    st.session_state.job_description = record.get('job_description')
+    st.session_state.resume_text = record.get('resume_text')
+    st.session_state.questions = record.get('questions', [])
+    st.session_state.current_question_idx = record.get('current_question_idx', 0)
+    st.session_state.answers = {int(idx): text for idx, text in record.get('answers', {}).items()}
+    st.session_state.evaluation_store = EvaluationStore.from_records(
+        record.get('evaluations', []), st.session_state.job_description
+    )
+
+def session_title():
+    def first_line(text):
+        return next((line.strip() for line in (text or "").splitlines() if line.strip()), "")[:60]
+    return " — ".join(part for part in (first_line(st.session_state.job_description),
+                                        first_line(st.session_state.resume_text)) if part) or "Untitled interview"
+
+def checkpoint_session():
+    if session_store is None or not (st.session_state.job_description or st.session_state.resume_text):
+        return
+    record = {
+        'job_description': st.session_state.job_description,
+        'resume_text': st.session_state.resume_text,
+        'questions': st.session_state.questions,
+        'current_question_idx': st.session_state.current_question_idx,
+        'answers': {str(idx): text for idx, text in st.session_state.answers.items()},
+        'evaluations': st.session_state.evaluation_store.to_records(),
+    }
+    search_text = "\n".join([
+        (st.session_state.job_description or "")[:2000],
+        (st.session_state.resume_text or "")[:2000],
+        *(q['question'] for q in st.session_state.questions),
+    ])
+    session_store.save(st.session_state.session_id, st.session_state.owner, record, session_title(), search_text)
+
+def resolve_owner():
+    # The signed-in user when an authenticating proxy passes its identity in
+    # SESSION_OWNER_HEADER; otherwise a random token kept in the page link,
+    # which is then the only way back to this browser's interviews.
+    header = os.getenv('SESSION_OWNER_HEADER')
+    identity = st.context.headers.get(header) if header else None
+    if identity:
+        return user_owner(identity), None
+    token = st.query_params.get('owner')
+    if not token or len(token) < 22:
+        token = secrets.token_urlsafe(16)
+    return token_owner(token), token
+
+if 'owner' not in st.session_state:
+    st.session_state.owner, st.session_state.owner_token = resolve_owner()
+if st.session_state.owner_token:
+    st.query_params['owner'] = st.session_state.owner_token
+
+if 'session_id' not in st.session_state:
+    requested = st.query_params.get('session')
+    record = (session_store.load(requested, st.session_state.owner)
+              if requested and session_store is not None else None)
+    if record is not None:
+        restore_session(requested, record)
+    else:
+        st.session_state.session_id = uuid.uuid4().hex
+st.query_params['session'] = st.session_state.session_id
+bind_session(st.session_state.session_id)
+
+def save_evaluation(question_idx, question, answer, evaluation):
+    st.session_state.evaluation_store.save(question_idx, question, answer, evaluation, st.session_state.job_description)
+
+# Background job bodies. They run on the job queue's worker threads, so they
+# take plain values and return results; the script thread applies them.
+
+def questions_job(job, job_description, resume_text, model):
+    timings = {}
+    questions = []
+    job.report(0, 5)
+    for question in stream_interview_questions(job_description, resume_text, model, timings=timings):
+        job.check_cancelled()
+        questions.append(question)
+        job.emit(question)
+        job.report(len(questions))
+    return {'questions': questions, 'timings': timings}
+
+def evaluate_job(job, question, answer, job_description, resume_text, model):
+    evaluation = None
+    for evaluation in stream_evaluation(question, answer, job_description, resume_text, model):
+        job.emit(evaluation)
+    return evaluation
+
+def followup_job(job, question, answer, asked, model):
+    streamed = "".join(stream_followup_question(question, answer, model, avoid=asked))
+    job.check_cancelled()
+    return finalize_followup_question(streamed, question, answer, avoid=asked)
+
+def evaluate_batch_job(job, to_score, job_description, resume_text, model, chunk_size=5):
+    # Scored a chunk at a time so progress is visible and cancellation stops the remaining chunks.
+    job.report(0, len(to_score))
+    for start in range(0, len(to_score), chunk_size):
+        job.check_cancelled()
+        chunk = to_score[start:start + chunk_size]
+        items = [
+            {'question': question, 'answer': text, 'job_description': job_description, 'resume': resume_text}
+            for _, question, text in chunk
+        ]
+        # Fans out only as far as the LLM slots the queue reserved for this job.
+        evaluations = evaluate_answers_batch(items, concurrency=job.slots, model_type=model)
+        for (idx, question, text), evaluation in zip(chunk, evaluations):
+            job.emit((idx, question, text, evaluation))
+        job.report(start + len(chunk))
+    return len(to_score)
+
+JOB_LABELS = {
+    'questions': "Generating interview questions",
+    'evaluate': "Evaluating answer",
+    'followup': "Generating follow-up question",
+    'evaluate_batch': "Evaluating changed answers",
+}
+
+def submit_job(kind, func, *args, priority=INTERACTIVE, meta=None, slots=1):
+    try:
+        # The token budget and telemetry session are captured from this context.
+        # Limits are per owner, so opening more tabs does not raise them.
+        with use_budget(st.session_state.token_budget):
+            job = job_queue.submit(st.session_state.owner, kind, func, *args, priority=priority, meta=meta,
+                                   slots=slots)
+    except JobLimitExceeded:
+        st.warning("⚠️ Too many of your background jobs are queued; wait for some to finish.")
+        return None
+    st.session_state.jobs.append(job.id)
+    return job
+
+def active_job(kind, **meta):
+    for job_id in st.session_state.jobs:
+        job = job_queue.get(job_id)
+        if job is not None and job.kind == kind and not job.finished and all(job.meta.get(k) == v for k, v in meta.items()):
+            return job
+    return None
+
+def question_position(idx, question):
+    # Follow-ups inserted while a job ran can shift questions; find the one the job was for.
+    questions = st.session_state.questions
+    if idx < len(questions) and questions[idx]['question'] == question:
+        return idx
+    return next((i for i, q in enumerate(questions) if q['question'] == question), None)
+
+def apply_partials(job):
+    partials = job.take_partials()
+    if job.kind == 'evaluate_batch':
+        for idx, question, text, evaluation in partials:
+            position = question_position(idx, question)
+            if position is not None:
+                save_evaluation(position, question, text, evaluation)
+    elif partials:
+        st.session_state.setdefault('job_partials', {}).setdefault(job.id, []).extend(partials)
+
+def apply_evaluation(idx, question, answer, evaluation):
+    position = question_position(idx, question)
+    if position is not None and evaluation is not None:
+        save_evaluation(position, question, answer, evaluation)
+        st.session_state.job_messages.append(('success', f"✅ Answer {position + 1} evaluated ({evaluation['score']}/10)! "
+                                                         "Check the 'Evaluation' tab for details."))
+
+def apply_followup(idx, question, followup_q):
+    # Checked against the questions as they are now: a prefetched follow-up
+    # was deduplicated against the list at the time it was scheduled.
+    position = question_position(idx, question)
+    asked = [q['question'] for q in st.session_state.questions]
+    if followup_q.get('duplicate') or QuestionIndex.from_questions(asked).is_duplicate(followup_q['question']):
+        st.session_state.job_messages.append(
+            ('warning', "⚠️ The follow-up repeats a question already in this interview, so it was not added."))
+    elif position is not None:
+        st.session_state.questions.insert(position + 1, followup_q)
+        st.session_state.job_messages.append(
+            ('success', f"✅ Follow-up question generated: {followup_q['question']} Click 'Next' to see it."))
+
+def document_caption(document):
+    pages = f"{document.page_count} page(s)"
+    if document.pages_extracted < document.page_count:
+        pages = f"First {document.pages_extracted} of {document.page_count} pages (DOCUMENT_MAX_PAGES)"
+    if document.cached:
+        return f"{pages} · already extracted"
+    return f"{pages} · extracted in {document.extraction_seconds * 1000:.0f} ms"
+
+def prefetched_job(job, future):
+    return future.result()
+
+def schedule_prefetch(idx, question, answer):
+    # Debounced in the prefetcher: work starts only once this answer has stopped changing.
+    job_description = st.session_state.job_description
+    key = evaluation_key(question, answer, job_description)
+    slot = (st.session_state.session_id, idx)
+    asked = [q['question'] for q in st.session_state.questions]
+    with use_budget(st.session_state.token_budget):
+        if st.session_state.evaluation_store.lookup(question, answer, job_description) is None:
+            prefetcher.schedule(slot, 'evaluate', key, evaluate_answer, question, answer, job_description,
+                                st.session_state.resume_text, st.session_state.ai_model)
+        prefetcher.schedule(slot, 'followup', key, generate_followup_question, question, answer,
+                            st.session_state.ai_model, avoid=asked)
+
+def take_prefetched(kind, question, answer, running_ok=True):
+    if not st.session_state.prefetch:
+        return None
+    future = prefetcher.take(kind, evaluation_key(question, answer, st.session_state.job_description), running_ok)
+    # Locally scored fallbacks are not worth serving; the click asks Gemini again.
+    if future is not None and future.done() and kind == 'evaluate' and future.result().get('fallback_reason'):
+        return None
+    return future
+
+def finish_job(job):
+    messages = st.session_state.job_messages
+    label = JOB_LABELS.get(job.kind, job.kind)
+    if job.status == CANCELLED:
+        messages.append(('info', f"{label}: cancelled."))
+    elif job.status != DONE:
+        messages.append(('error', f"{label} failed: {job.error}"))
+    elif job.kind == 'questions':
+        st.session_state.questions = job.result['questions']
+        st.session_state.current_question_idx = 0
+        st.session_state.evaluation_store.clear()
+        st.session_state.answers = {}
+        st.session_state.generation_timings = job.result['timings']
+        messages.append(('success', f"✅ Generated {len(job.result['questions'])} questions! "
+                                    "Navigate to the 'Questions' tab to view and answer them."))
+    elif job.kind == 'evaluate':
+        apply_evaluation(job.meta['question_idx'], job.meta['question'], job.meta['answer'], job.result)
+    elif job.kind == 'followup':
+        apply_followup(job.meta['question_idx'], job.meta['question'], job.result)
+    elif job.kind == 'evaluate_batch':
+        messages.append(('success', f"✅ Evaluated {job.result} answers! Check the 'Evaluation' tab for details."))
+    st.session_state.get('job_partials', {}).pop(job.id, None)
+    st.session_state.jobs.remove(job.id)
+    job_queue.forget(job.id)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def background_jobs():
+    # Polls only this fragment, so answers can be typed while jobs run; a full
+    # rerun is triggered once a job's results have been applied to the session.
+    finished = False
+    for job_id in list(st.session_state.jobs):
+        job = job_queue.get(job_id)
+        if job is None:
+            st.session_state.jobs.remove(job_id)
+            continue
+        apply_partials(job)
+        if job.finished:
+            finish_job(job)
+            finished = True
+            continue
+        label = JOB_LABELS.get(job.kind, job.kind)
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            if job.total:
+                st.progress(job.done / job.total, text=f"⏳ {label} ({job.done}/{job.total})")
+            else:
+                st.caption(f"⏳ {label} ({job.status})")
+            partials = st.session_state.get('job_partials', {}).get(job.id, [])
+            if job.kind == 'questions':
+                for number, question in enumerate(partials, 1):
+                    st.markdown(f"**{number}.** {question['question']}")
+            elif job.kind == 'evaluate' and partials:
+                st.caption(f"Score so far: {partials[-1]['score']}/10")
+        with col2:
+            if st.button("Cancel", key=f"cancel_{job.id}", disabled=job.cancel_requested):
+                job_queue.cancel(job.id)
+    if finished:
+        st.rerun()
+
 st.title("🎯 AI Interview Agent")
 st.markdown("Upload job description and resume to generate tailored interview questions and evaluate responses.")
+for level, message in st.session_state.job_messages:
+    getattr(st, level)(message)
+st.session_state.job_messages = []
+if st.session_state.jobs:
+    background_jobs()
 with st.sidebar:
     st.header("⚙️ Settings")
     st.session_state.ai_model = 'gemini'
     st.success("✅ Using Google Gemini 2.5 Flash")
     st.info("Latest model with generous free tier")
     
+    st.session_state.prefetch = st.toggle(
+        "⚡ Prefetch follow-ups and scores", value=st.session_state.prefetch,
+        help="Generate the follow-up and evaluation in the background once an answer stops changing, "
+             "so the buttons respond instantly. Costs extra calls when answers change again."
+    )
+    if st.session_state.prefetch:
+        prefetch_stats = prefetcher.stats()
+        hit_rate = prefetch_stats['hit_rate']
+        st.caption(f"Prefetch: {prefetch_stats.get('hit', 0)} hits · {prefetch_stats.get('miss', 0)} misses · "
+                   f"{prefetch_stats.get('wasted', 0)} wasted" + (f" · {hit_rate:.0%} hit rate" if hit_rate is not None else ""))
+    
+    budget = st.session_state.token_budget
+    with st.expander("🔢 Token usage"):
+        st.metric("Session tokens", f"{budget.used:,}" + (f" / {budget.per_session:,}" if budget.per_session else ""))
+        st.caption(f"{budget.tokens_in:,} in · {budget.tokens_out:,} out · {budget.calls} calls")
+        recent = get_token_stats(last=5, session_id=st.session_state.session_id)['recent']
+        for call in reversed(recent):
+            st.caption(f"{'cache' if call['cached'] else 'api'}: {call['tokens_in']} in → {call['tokens_out']} out")
+    
+    with st.expander("🐞 Debug: recent spans"):
+        spans = recent_spans(st.session_state.session_id, limit=15)
+        if not spans:
+            st.caption("No traced calls yet.")
+        for traced in reversed(spans):
+            flags = []
+            if traced.get('cache_hit'):
+                flags.append("cache hit")
+            if traced.get('scored_locally'):
+                flags.append(f"scored locally: {traced['scored_locally']}")
+            if traced.get('fallback_used'):
+                flags.append(f"fallback: {traced.get('fallback_reason', 'error')}")
+            if traced.get('error'):
+                flags.append(f"error: {traced['error']}")
+            tokens = f" · {traced['tokens_in']}→{traced['tokens_out']} tok" if 'tokens_in' in traced else ""
+            st.caption(f"**{traced['name']}** {traced['duration_ms']:.0f} ms{tokens}" + (f" · {', '.join(flags)}" if flags else ""))
+        st.download_button("Metrics (Prometheus text)", render_prometheus(), file_name="metrics.txt", mime="text/plain")
+    
+    if session_store is not None:
+        with st.expander("🗂️ Past Interviews"):
+            if st.button("➕ New Interview", use_container_width=True):
+                reset_interview()
+                st.session_state.session_id = uuid.uuid4().hex
+                st.query_params['session'] = st.session_state.session_id
+                st.rerun()
+            search = st.text_input("Search", key="session_search", placeholder="Role, candidate or skill")
+            for past in session_store.list_sessions(st.session_state.owner, search, limit=10):
+                label = f"{'▶ ' if past['id'] == st.session_state.session_id else ''}{past['title']}"
+                if st.button(label, key=f"session_{past['id']}", use_container_width=True):
+                    record = session_store.load(past['id'], st.session_state.owner)
+                    if record is not None:
+                        restore_session(past['id'], record)
+                        st.query_params['session'] = past['id']
+                        st.rerun()
+                st.caption(time.strftime('%Y-%m-%d %H:%M', time.localtime(past['updated_at'])))
+            st.markdown("---")
+            export_format = st.radio("Export format", ['csv', 'parquet'] if parquet_available() else ['csv'],
+                                     horizontal=True, key="export_format")
+            # Built once on click and kept until the format or search changes, so
+            # the download buttons survive the reruns their own clicks cause.
+            export_key = (st.session_state.owner, export_format, search)
+            if st.button("📊 Export All Evaluations", use_container_width=True,
+                         help="Every interview of yours matching the search, one row per evaluated answer"):
+                data, summary_report, summary = export_store(session_store, st.session_state.owner, export_format,
+                                                             search)
+                st.session_state.export = {'key': export_key, 'data': data, 'report': summary_report,
+                                           'summary': summary}
+            prepared = st.session_state.get('export')
+            if prepared is not None and prepared['key'] != export_key:
+                del st.session_state.export
+            elif prepared is not None:
+                if prepared['summary']['truncated']:
+                    st.caption(f"Only the first {prepared['summary']['answers']} answers are included (EXPORT_MAX_ROWS).")
+                st.download_button("Download Evaluations", prepared['data'], file_name=f"evaluations.{export_format}",
+                                   mime="text/csv" if export_format == 'csv' else "application/octet-stream",
+                                   use_container_width=True)
+                st.download_button("Download Score Summary", prepared['report'], file_name="evaluation_summary.md",
+                                   mime="text/markdown", use_container_width=True)
+    
     st.markdown("---")
     st.markdown("### 📋 Instructions")
     st.markdown("""
@@ -62,8 +459,10 @@ with tab1:
                 key="job_file"
             )
             if job_file:
-                st.session_state.job_description = extract_text_from_file(job_file)
+                document = extract_document(job_file)
+                st.session_state.job_description = document.text
                 st.success("✅ Job description loaded!")
+                st.caption(document_caption(document))
                 with st.expander("Preview"):
                     st.text_area("Job Description", st.session_state.job_description, height=200, disabled=True)
         else:
@@ -91,8 +490,10 @@ with tab1:
                 key="resume_file"
             )
             if resume_file:
-                st.session_state.resume_text = extract_text_from_file(resume_file)
+                document = extract_document(resume_file)
+                st.session_state.resume_text = document.text
                 st.success("✅ Resume loaded!")
+                st.caption(document_caption(document))
                 with st.expander("Preview"):
                     st.text_area("Resume", st.session_state.resume_text, height=200, disabled=True)
         else:
@@ -108,23 +509,19 @@ with tab1:
     st.markdown("---")
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        if st.button("🎯 Generate Interview Questions", use_container_width=True, type="primary"):
+        generating = active_job('questions')
+        if st.button("🎯 Generate Interview Questions", use_container_width=True, type="primary",
+                     disabled=generating is not None):
             if st.session_state.job_description and st.session_state.resume_text:
-                with st.spinner("Generating tailored interview questions..."):
-                    try:
-                        st.session_state.questions = generate_interview_questions(
-                            st.session_state.job_description,
-                            st.session_state.resume_text,
-                            st.session_state.ai_model
-                        )
-                        st.session_state.current_question_idx = 0
-                        st.session_state.evaluations = []
-                        st.success(f"✅ Generated {len(st.session_state.questions)} questions!")
-                        st.info("Navigate to the 'Questions' tab to view and answer them.")
-                    except Exception as e:
-                        st.error(f"Error generating questions: {str(e)}")
+                if submit_job('questions', questions_job, st.session_state.job_description,
+                              st.session_state.resume_text, st.session_state.ai_model):
+                    st.rerun()
             else:
                 st.error("⚠️ Please upload both job description and resume first!")
+        if st.session_state.get('generation_timings') and st.session_state.questions:
+            with st.expander("⏱️ Generation timings"):
+                for stage, seconds in st.session_state.generation_timings.items():
+                    st.markdown(f"- **{stage}**: {seconds:.2f}s")
 with tab2:
     st.header("Interview Questions")
     
@@ -154,72 +551,108 @@ with tab2:
         answer_key = f"answer_{st.session_state.current_question_idx}"
         answer = st.text_area(
             "Enter candidate's answer:",
+            value=st.session_state.answers.get(st.session_state.current_question_idx, ""),
             height=200,
             key=answer_key
         )
+        st.session_state.answers[st.session_state.current_question_idx] = answer
+        current_idx = st.session_state.current_question_idx
+        if st.session_state.prefetch and answer.strip():
+            schedule_prefetch(current_idx, current_q['question'], answer)
         
         col1, col2 = st.columns(2)
         
         with col1:
-            if st.button("📊 Evaluate This Answer", type="primary", use_container_width=True):
+            evaluating = active_job('evaluate', question_idx=current_idx)
+            if st.button("📊 Evaluate This Answer", type="primary", use_container_width=True,
+                         disabled=evaluating is not None):
                 if answer.strip():
-                    with st.spinner("Evaluating answer..."):
-                        try:
-                            evaluation = evaluate_answer(
-                                current_q['question'],
-                                answer,
-                                st.session_state.job_description,
-                                st.session_state.resume_text,
-                                st.session_state.ai_model
-                            )
-                            eval_data = {
-                                'question_idx': st.session_state.current_question_idx,
-                                'question': current_q['question'],
-                                'answer': answer,
-                                'evaluation': evaluation
-                            }
-                            existing_idx = next((i for i, e in enumerate(st.session_state.evaluations) 
-                                               if e['question_idx'] == st.session_state.current_question_idx), None)
-                            if existing_idx is not None:
-                                st.session_state.evaluations[existing_idx] = eval_data
-                            else:
-                                st.session_state.evaluations.append(eval_data)
-                            
-                            st.success("✅ Answer evaluated! Check the 'Evaluation' tab for details.")
-                        except Exception as e:
-                            st.error(f"Error evaluating answer: {str(e)}")
+                    evaluation = st.session_state.evaluation_store.lookup(
+                        current_q['question'], answer, st.session_state.job_description
+                    )
+                    # Blank, evasive or too-short answers are scored on the spot without a Gemini call;
+                    # off-topic answers still go to Gemini.
+                    local = confident_prescore(current_q['question'], answer, st.session_state.job_description or "") if evaluation is None else None
+                    prefetched = take_prefetched('evaluate', current_q['question'], answer) if evaluation is None and local is None else None
+                    if evaluation is not None:
+                        save_evaluation(current_idx, current_q['question'], answer, evaluation)
+                        st.metric("Score", f"{evaluation['score']}/10")
+                        st.caption("Answer unchanged since its last evaluation; reused the previous score.")
+                    elif local is not None:
+                        apply_evaluation(current_idx, current_q['question'], answer, prescored_evaluation(local))
+                        st.rerun()
+                    elif prefetched is not None and prefetched.done():
+                        apply_evaluation(current_idx, current_q['question'], answer, prefetched.result())
+                        st.rerun()
+                    elif prefetched is not None:
+                        if submit_job('evaluate', prefetched_job, prefetched,
+                                      meta={'question_idx': current_idx, 'question': current_q['question'], 'answer': answer}):
+                            st.rerun()
+                    elif submit_job('evaluate', evaluate_job, current_q['question'], answer,
+                                    st.session_state.job_description, st.session_state.resume_text,
+                                    st.session_state.ai_model,
+                                    meta={'question_idx': current_idx, 'question': current_q['question'], 'answer': answer}):
+                        st.rerun()
                 else:
                     st.warning("⚠️ Please enter an answer first!")
         
         with col2:
-            if st.button("🔄 Generate Follow-up Question", use_container_width=True):
+            generating_followup = active_job('followup', question_idx=current_idx)
+            if st.button("🔄 Generate Follow-up Question", use_container_width=True,
+                         disabled=generating_followup is not None):
                 if answer.strip():
-                    with st.spinner("Generating follow-up question..."):
-                        try:
-                            from utils.question_generator import generate_followup_question
-                            followup_q = generate_followup_question(
-                                current_q['question'],
-                                answer,
-                                st.session_state.ai_model
-                            )
-                            st.session_state.questions.insert(
-                                st.session_state.current_question_idx + 1,
-                                followup_q
-                            )
-                            
-                            st.success("✅ Follow-up question generated! Click 'Next' to see it.")
-                        except Exception as e:
-                            st.error(f"Error generating follow-up: {str(e)}")
+                    asked = [q['question'] for q in st.session_state.questions]
+                    prefetched = take_prefetched('followup', current_q['question'], answer)
+                    if prefetched is not None and prefetched.done():
+                        apply_followup(current_idx, current_q['question'], prefetched.result())
+                        st.rerun()
+                    elif prefetched is not None:
+                        if submit_job('followup', prefetched_job, prefetched,
+                                      meta={'question_idx': current_idx, 'question': current_q['question']}):
+                            st.rerun()
+                    elif submit_job('followup', followup_job, current_q['question'], answer, asked,
+                                  st.session_state.ai_model,
+                                  meta={'question_idx': current_idx, 'question': current_q['question']}):
+                        st.rerun()
                 else:
                     st.warning("⚠️ Please enter an answer first!")
+        
+        store = st.session_state.evaluation_store
+        answered = [
+            (idx, st.session_state.questions[idx]['question'], text)
+            for idx, text in sorted(st.session_state.answers.items())
+            if text.strip() and idx < len(st.session_state.questions)
+        ]
+        changed = set(store.dirty(answered, st.session_state.job_description))
+        changed_answers = [(idx, question, text) for idx, question, text in answered if idx in changed]
+        evaluating_batch = active_job('evaluate_batch')
+        if st.button(f"📊 Evaluate Changed Answers ({len(changed_answers)})", use_container_width=True,
+                     disabled=not changed_answers or evaluating_batch is not None):
+            to_score = []
+            for idx, question, text in changed_answers:
+                # An answer edited back to an earlier version is served from the store.
+                previous = store.lookup(question, text, st.session_state.job_description)
+                prefetched = take_prefetched('evaluate', question, text, running_ok=False) if previous is None else None
+                if previous is not None:
+                    save_evaluation(idx, question, text, previous)
+                elif prefetched is not None:
+                    save_evaluation(idx, question, text, prefetched.result())
+                else:
+                    to_score.append((idx, question, text))
+            if not to_score:
+                st.success(f"✅ Restored {len(changed_answers)} earlier or prefetched evaluations; nothing was sent to Gemini.")
+            elif submit_job('evaluate_batch', evaluate_batch_job, to_score, st.session_state.job_description,
+                            st.session_state.resume_text, st.session_state.ai_model, priority=BULK, slots=5):
+                st.rerun()
 with tab3:
     st.header("Answer Evaluations")
     
-    if not st.session_state.evaluations:
+    store = st.session_state.evaluation_store
+    if not len(store):
         st.info("👆 Answer some questions first to see evaluations here.")
     else:
         total_questions = len(st.session_state.questions)
-        answered_questions = len(st.session_state.evaluations)
+        answered_questions = len(store)
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -227,14 +660,20 @@ with tab3:
         with col2:
             st.metric("Answered", answered_questions)
         with col3:
-            avg_score = sum(e['evaluation'].get('score', 0) for e in st.session_state.evaluations) / len(st.session_state.evaluations)
+            avg_score = store.average_score
             st.metric("Average Score", f"{avg_score:.1f}/10")
+        average_rubric = store.average_rubric()
+        if average_rubric:
+            st.caption(" · ".join(f"{dim.replace('_', ' ').title()}: {value:.1f}/10" for dim, value in average_rubric.items()))
         
         st.markdown("---")
-        for eval_data in st.session_state.evaluations:
+        for eval_data in store.records():
             with st.expander(f"Q{eval_data['question_idx'] + 1}: {eval_data['question'][:80]}...", expanded=True):
                 st.markdown(f"**Question:** {eval_data['question']}")
                 st.markdown(f"**Answer:** {eval_data['answer']}")
+                current_answer = st.session_state.answers.get(eval_data['question_idx'], eval_data['answer'])
+                if current_answer != eval_data['answer']:
+                    st.caption("✏️ The answer was edited after this evaluation; use 'Evaluate Changed Answers' to refresh it.")
                 
                 evaluation = eval_data['evaluation']
                 
@@ -245,8 +684,17 @@ with tab3:
                 
                 with col2:
                     st.markdown(f"**Feedback:** {evaluation.get('feedback', 'N/A')}")
+                    if evaluation.get('fallback_reason'):
+                        st.caption(f"⚠️ Scored locally, not by Gemini ({evaluation['fallback_reason']})")
+                    elif evaluation.get('scored_locally'):
+                        st.caption(f"⚡ Scored instantly without Gemini ({REASON_LABELS.get(evaluation['scored_locally'], evaluation['scored_locally'])})")
                 
-                if 'strengths' in evaluation:
+                if evaluation.get('rubric'):
+                    rubric_cols = st.columns(len(evaluation['rubric']))
+                    for rubric_col, (dimension, value) in zip(rubric_cols, evaluation['rubric'].items()):
+                        rubric_col.metric(dimension.replace('_', ' ').title(), f"{value}/10")
+                
+                if evaluation.get('strengths'):
                     st.markdown("**✅ Strengths:**")
                     for strength in evaluation['strengths']:
                         st.markdown(f"- {strength}")
@@ -258,21 +706,13 @@ with tab3:
         
         st.markdown("---")
         if st.button("📥 Export Evaluation Report"):
-            report = "# Interview Evaluation Report\n\n"
-            report += f"**Total Questions:** {total_questions}\n"
-            report += f"**Answered Questions:** {answered_questions}\n"
-            report += f"**Average Score:** {avg_score:.1f}/10\n\n"
-            
-            for eval_data in st.session_state.evaluations:
-                report += f"\n## Question {eval_data['question_idx'] + 1}\n"
-                report += f"**Q:** {eval_data['question']}\n\n"
-                report += f"**A:** {eval_data['answer']}\n\n"
-                report += f"**Score:** {eval_data['evaluation'].get('score', 0)}/10\n\n"
-                report += f"**Feedback:** {eval_data['evaluation'].get('feedback', 'N/A')}\n\n"
-            
             st.download_button(
                 label="Download Report",
-                data=report,
+                data=interview_report(store.records(), total_questions, answered_questions, avg_score),
                 file_name="interview_evaluation_report.md",
                 mime="text/markdown"
             )
+
+checkpoint_session()
+# Runs after the page has been sent, so preloading never delays the first paint.
+start_background_warm_up()
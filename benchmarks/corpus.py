@@ -0,0 +1,121 @@
+import random
+from io import BytesIO
+from typing import Dict, List
+
+from utils.skill_matcher import DEFAULT_TAXONOMY
+
+SIZES = {'small': 1, 'medium': 5, 'large': 25}
+
+_FILLER = [
+    "Collaborated with cross-functional teams to deliver features on schedule.",
+    "Improved reliability of core services through better monitoring and alerting.",
+    "Mentored junior engineers and led code reviews across the team.",
+    "Worked closely with product managers to refine requirements.",
+    "Reduced infrastructure cost by consolidating underused environments.",
+    "Wrote design documents and presented them to stakeholders.",
+]
+
+
+def _skills(rng: random.Random, count: int) -> List[str]:
+    return rng.sample(sorted(DEFAULT_TAXONOMY), count)
+
+
+def make_job_description(size: str = 'medium', seed: int = 0) -> str:
+    rng = random.Random(f"jd-{size}-{seed}")
+    repeat = SIZES[size]
+    lines = ["About Us", "We build software that helps teams hire better." * repeat, "", "Responsibilities:"]
+    for _ in range(4 * repeat):
+        lines.append(f"- {rng.choice(_FILLER)}")
+    lines.append("Requirements:")
+    for skill in _skills(rng, min(8 + repeat, 30)):
+        lines.append(f"- {rng.randint(1, 6)}+ years of experience with {skill}")
+    lines.extend(["Benefits", "Competitive salary, remote friendly.", "We are an equal opportunity employer."])
+    return "\n".join(lines)
+
+
+def make_resume(size: str = 'medium', seed: int = 0) -> str:
+    rng = random.Random(f"resume-{size}-{seed}")
+    repeat = SIZES[size]
+    lines = [f"Candidate {seed}", "Senior Software Engineer", "", "Experience"]
+    for job in range(2 * repeat):
+        skills = ", ".join(_skills(rng, 3))
+        lines.append(f"Company {job}: built services using {skills}.")
+        lines.extend(rng.choice(_FILLER) for _ in range(3))
+    lines.append("Skills")
+    lines.append(", ".join(_skills(rng, 12)))
+    return "\n".join(lines)
+
+
+def make_answer(words: int = 80, seed: int = 0) -> str:
+    rng = random.Random(f"answer-{words}-{seed}")
+    vocabulary = " ".join(_FILLER).split() + [s.lower() for s in DEFAULT_TAXONOMY]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    # Minimal single-font PDF writer, enough for PyPDF2 text extraction.
+    page_count = len(pages)
+    font_id = 3 + 2 * page_count
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(page_count))}] /Count {page_count} >>".encode(),
+    ]
+    for i, page in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode()
+        )
+        text_ops = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in page.split("\n"))
+        stream = f"BT /F1 10 Tf 12 TL 50 750 Td {text_ops} ET".encode('latin-1', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    out.write(b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_docx(text: str) -> bytes:
+    import docx
+
+    document = docx.Document()
+    lines = text.split("\n")
+    for line in lines:
+        document.add_paragraph(line)
+    table = document.add_table(rows=4, cols=2)
+    for row, (skill, years) in enumerate([("Skill", "Years"), ("Python", "6"), ("Docker", "4"), ("AWS", "3")]):
+        table.cell(row, 0).text = skill
+        table.cell(row, 1).text = years
+    out = BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+class NamedBytes(BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def make_documents(size: str = 'medium', seed: int = 0) -> Dict[str, bytes]:
+    text = make_resume(size, seed)
+    lines = text.split("\n")
+    page_length = 40
+    pages = ["\n".join(lines[i:i + page_length]) for i in range(0, len(lines), page_length)] or [""]
+    return {
+        f'resume_{size}.pdf': make_pdf(pages * SIZES[size]),
+        f'resume_{size}.docx': make_docx(text),
+        f'resume_{size}.txt': text.encode('utf-8'),
+    }
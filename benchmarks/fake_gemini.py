@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+
+
+class FakeResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeBackendError(Exception):
+    pass
+
+
+class FakeBackendConfig:
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, failure_rate: float = 0.0,
+                 chunk_size: int = 12, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.chunk_size = chunk_size
+        self.seed = seed
+
+
+def _skills_response(prompt: str) -> str:
+    return "Python, Docker, Kubernetes, AWS, PostgreSQL, REST API, CI/CD, Redis"
+
+
+def _questions_response(prompt: str) -> str:
+    return "\n".join([
+        "1. Walk me through how you designed and deployed a Python service on Kubernetes.",
+        "2. How do you approach debugging a latency regression in a production API?",
+        "3. Describe a time you disagreed with a teammate about a technical decision.",
+        "4. How would you design a caching layer in front of PostgreSQL for a read-heavy workload?",
+        "5. Tell me about the project you are most proud of and your specific contribution.",
+    ])
+
+
+def _followup_response(prompt: str) -> str:
+    return "What trade-offs did you consider when choosing that approach, and how did you measure its impact?"
+
+
+def _evaluation_response(prompt: str) -> str:
+    words = len(prompt.split())
+    score = 3 + words % 7
+    if '"rubric"' in prompt:
+        return json.dumps({
+            'score': score,
+            'rubric': {'technical_depth': score, 'communication': min(10, score + 1), 'relevance': max(0, score - 1)},
+            'feedback': "The answer covers the main idea but would benefit from a concrete example.",
+            'strengths': ["Clear structure", "Relevant terminology"],
+            'improvements': ["Quantify the impact", "Discuss failure modes"],
+        })
+    return (
+        f"Score: {score}/10\n"
+        "Feedback: The answer covers the main idea but would benefit from a concrete example.\n"
+        "Strengths:\n- Clear structure\n- Relevant terminology\n"
+        "Improvements:\n- Quantify the impact\n- Discuss failure modes"
+    )
+
+
+def _plan_response(prompt: str) -> str:
+    lines = _questions_response(prompt).split("\n")
+    categories = ['Technical', 'Technical', 'Behavioral', 'Problem-solving', 'Experience']
+    difficulties = ['Hard', 'Medium', 'Easy', 'Hard', 'Medium']
+    return json.dumps({
+        'job_skills': _skills_response(prompt).split(', '),
+        'resume_skills': ['Python', 'Docker', 'AWS'],
+        'gaps': ['Kubernetes', 'PostgreSQL'],
+        'questions': [
+            {'question': line.split('. ', 1)[1], 'category': category, 'difficulty': difficulty}
+            for line, category, difficulty in zip(lines, categories, difficulties)
+        ],
+    })
+
+
+def fake_response_for(prompt: str) -> str:
+    lowered = prompt.lower()
+    if '"gaps"' in lowered:
+        return _plan_response(prompt)
+    if 'technical skills' in lowered:
+        return _skills_response(prompt)
+    if 'follow-up' in lowered:
+        return _followup_response(prompt)
+    if 'rate this answer' in lowered or '"score"' in lowered:
+        return _evaluation_response(prompt)
+    return _questions_response(prompt)
+
+
+class FakeChatGemini:
+    # Drop-in stand-in for ChatGoogleGenerativeAI with deterministic output
+    # and configurable latency, jitter and failure rate.
+
+    config = FakeBackendConfig()
+
+    def __init__(self, model: str = "", temperature: float = 0, google_api_key: str = None, **kwargs):
+        self.model = model
+        self.temperature = temperature
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+
+    def _plan(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.config.latency + self._random.uniform(-self.config.jitter, self.config.jitter))
+            fails = self._random.random() < self.config.failure_rate
+        return delay, fails
+
+    def _fail(self, prompt: str):
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]
+        raise FakeBackendError(f"429 Resource exhausted (fake backend, prompt {digest})")
+
+    def invoke(self, prompt: str, **kwargs) -> FakeResponse:
+        delay, fails = self._plan(prompt)
+        time.sleep(delay)
+        if fails:
+            self._fail(prompt)
+        return FakeResponse(fake_response_for(prompt))
+
+    def stream(self, prompt: str, **kwargs):
+        delay, fails = self._plan(prompt)
+        content = fake_response_for(prompt)
+        size = self.config.chunk_size
+        chunks = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+        # First token arrives after a third of the latency; the rest is spread evenly.
+        time.sleep(delay / 3)
+        if fails:
+            self._fail(prompt)
+        for chunk in chunks:
+            yield FakeResponse(chunk)
+            time.sleep(2 * delay / 3 / len(chunks))
+
+    async def ainvoke(self, prompt: str, **kwargs) -> FakeResponse:
+        delay, fails = self._plan(prompt)
+        await asyncio.sleep(delay)
+        if fails:
+            self._fail(prompt)
+        return FakeResponse(fake_response_for(prompt))
+
+
+def install_fake_backend(config: FakeBackendConfig = None):
+    from utils.llm_client import set_llm_factory
+
+    FakeChatGemini.config = config or FakeBackendConfig()
+    set_llm_factory(FakeChatGemini)
@@ -0,0 +1,207 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import NamedBytes, SIZES, make_answer, make_documents, make_job_description, make_resume
+from benchmarks.fake_gemini import FakeBackendConfig, install_fake_backend
+from utils.answer_evaluator import evaluate_answer
+from utils.document_processor import extract_text_from_file
+from utils.llm_cache import set_cache, MemoryCache
+from utils.prescorer import prescore
+from utils.question_bank import QuestionBank, set_question_bank
+from utils.question_generator import extract_skills_local, generate_followup_question, generate_interview_questions
+from utils.scheduler import Scheduler, set_scheduler
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = (len(ordered) - 1) * pct / 100
+    lower = int(index)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+def measure(func: Callable[[int], object], iterations: int, concurrency: int, memory_iterations: int) -> dict:
+    latencies = []
+    errors = 0
+
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            func(i)
+            return time.perf_counter() - start, False
+        except Exception:
+            return time.perf_counter() - start, True
+
+    func(0)  # warm-up: imports, compiled patterns, pooled clients
+    gc.collect()
+    wall_start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(timed, range(iterations)))
+    else:
+        outcomes = [timed(i) for i in range(iterations)]
+    wall = time.perf_counter() - wall_start
+    for latency, failed in outcomes:
+        latencies.append(latency)
+        errors += failed
+
+    # Memory is measured in a separate pass; tracemalloc would skew the timings above.
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(memory_iterations):
+        try:
+            func(i)
+        except Exception:
+            pass
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocations = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    return {
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'throughput_per_s': round(iterations / wall, 3) if wall else None,
+        'peak_memory_kb': round(peak / 1024, 1),
+        'net_allocations': allocations,
+    }
+
+
+def build_benchmarks(sizes: List[str]) -> Dict[str, Callable[[int], object]]:
+    benchmarks = {}
+    for size in sizes:
+        jds = [make_job_description(size, seed) for seed in range(8)]
+        resumes = [make_resume(size, seed) for seed in range(8)]
+        benchmarks[f'generate_interview_questions[{size}]'] = (
+            lambda i, jds=jds, resumes=resumes: generate_interview_questions(jds[i % 8], resumes[i % 8])
+        )
+        benchmarks[f'extract_skills_local[{size}]'] = lambda i, resumes=resumes: extract_skills_local(resumes[i % 8])
+        for name, data in make_documents(size).items():
+            benchmarks[f'extract_text_from_file[{name}]'] = (
+                lambda i, data=data, name=name: extract_text_from_file(NamedBytes(data, name))
+            )
+
+    for words in (20, 150, 600):
+        answers = [make_answer(words, seed) for seed in range(8)]
+        # Pre-scoring off, so these always measure the Gemini path; local scoring is benchmarked on its own.
+        benchmarks[f'evaluate_answer[{words}w]'] = (
+            lambda i, answers=answers: evaluate_answer("How do you scale a Python API?", answers[i % 8], prescore=False)
+        )
+        benchmarks[f'prescore[{words}w]'] = (
+            lambda i, answers=answers: prescore("How do you scale a Python API?", answers[i % 8])
+        )
+    benchmarks['evaluate_answer[blank]'] = lambda i: evaluate_answer("How do you scale a Python API?", "I don't know")
+    answers = [make_answer(80, seed) for seed in range(8)]
+    benchmarks['generate_followup_question'] = (
+        lambda i: generate_followup_question("Tell me about your experience with Docker.", answers[i % 8])
+    )
+    return benchmarks
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def compare(current: dict, baseline: dict):
+    print(f"\n{'benchmark':55} {'p50 Δ':>10} {'p95 Δ':>10} {'thru Δ':>10}")
+    for name, result in current['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if not old:
+            print(f"{name:55} {'new':>10}")
+            continue
+
+        def delta(key):
+            if not old.get(key):
+                return '-'
+            return f"{100 * (result[key] - old[key]) / old[key]:+.1f}%"
+
+        print(f"{name:55} {delta('p50_ms'):>10} {delta('p95_ms'):>10} {delta('throughput_per_s'):>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.run_benchmarks',
+        description='Offline latency/throughput/memory benchmarks using a fake Gemini backend.'
+    )
+    parser.add_argument('-n', '--iterations', type=int, default=20)
+    parser.add_argument('-c', '--concurrency', type=int, default=1)
+    parser.add_argument('--memory-iterations', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.05, help='Fake backend latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Fake backend latency jitter in seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of fake calls that raise')
+    parser.add_argument('--sizes', default=','.join(SIZES), help='Comma-separated corpus sizes')
+    parser.add_argument('--only', default='', help='Run only benchmarks whose name contains this text')
+    parser.add_argument('--with-cache', action='store_true', help='Keep the LLM response cache enabled')
+    parser.add_argument('-o', '--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Baseline JSON file to diff against')
+    args = parser.parse_args(argv)
+
+    config = FakeBackendConfig(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate)
+    install_fake_backend(config)
+    set_cache(MemoryCache() if args.with_cache else None)
+    # The fake backend has no quota; only retries and deadlines stay in play.
+    set_scheduler(Scheduler(requests_per_minute=0))
+    # Generated questions go to an in-memory bank, never the app's .question_bank.sqlite3.
+    set_question_bank(QuestionBank(path=None))
+    # evaluate_answer[blank] measures local scoring at the app's default threshold.
+    os.environ.pop('PRESCORE_CONFIDENCE', None)
+
+    benchmarks = build_benchmarks([s for s in args.sizes.split(',') if s])
+    results = {}
+    for name, func in benchmarks.items():
+        if args.only and args.only not in name:
+            continue
+        # Keep anything the code under test prints out of the JSON report.
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            results[name] = measure(func, args.iterations, args.concurrency, args.memory_iterations)
+        r = results[name]
+        print(f"{name:55} p50 {r['p50_ms']:9.2f}ms  p95 {r['p95_ms']:9.2f}ms  "
+              f"p99 {r['p99_ms']:9.2f}ms  {r['throughput_per_s'] or 0:8.1f}/s  peak {r['peak_memory_kb']:8.1f}KB",
+              file=sys.stderr)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': vars(args),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported lazily by the app; any of these showing up at startup is a regression.
+DEFERRED_MODULES = ('langchain_google_genai', 'google.generativeai', 'PyPDF2', 'docx')
+
+_APP_RUN = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({path!r}, default_timeout=60)
+at.run()
+print(time.perf_counter() - start)
+"""
+
+
+def app_imports(path: str) -> List[str]:
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def parse_importtime(stderr: str) -> Dict[str, dict]:
+    # "import time: self [us] | cumulative | imported package", nested imports indented.
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules[name.strip()] = {
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+            'top_level': not name[1:].startswith(' '),
+        }
+    return modules
+
+
+def measure_imports(modules: List[str], env: dict) -> dict:
+    code = "import " + ", ".join(modules)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    timings = parse_importtime(proc.stderr)
+    return {
+        'wall_ms': wall * 1000,
+        'import_ms': sum(m['cumulative_ms'] for m in timings.values() if m['top_level']),
+        'modules': timings,
+    }
+
+
+def measure_app_run(path: str, env: dict) -> float:
+    proc = subprocess.run([sys.executable, '-c', _APP_RUN.format(path=path)], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return float(proc.stdout.strip().splitlines()[-1]) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.startup',
+        description='Cold-start benchmark: import time of the modules app.py loads, via python -X importtime.'
+    )
+    parser.add_argument('-n', '--runs', type=int, default=5, help='Fresh interpreter runs (median is reported)')
+    parser.add_argument('--app', default=os.path.join(ROOT, 'app.py'))
+    parser.add_argument('--top', type=int, default=15, help='Slowest modules to list')
+    parser.add_argument('--app-run', action='store_true', help='Also time a first headless run of the app')
+    parser.add_argument('--fail-on-deferred', action='store_true',
+                        help='Exit non-zero if a lazily imported dependency is loaded at startup')
+    parser.add_argument('-o', '--output', help='Write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    # No background warm-up in the measured process, so startup cost is not hidden.
+    env = dict(os.environ, APP_WARM_UP='0')
+    modules = app_imports(args.app)
+    runs = [measure_imports(modules, env) for _ in range(args.runs)]
+    median_run = sorted(runs, key=lambda r: r['import_ms'])[len(runs) // 2]
+    loaded = [name for name in DEFERRED_MODULES if name in median_run['modules']]
+
+    report = {
+        'modules': modules,
+        'import_ms': statistics.median(r['import_ms'] for r in runs),
+        'wall_ms': statistics.median(r['wall_ms'] for r in runs),
+        'deferred_loaded': loaded,
+        'slowest': sorted(
+            ({'module': name, **timing} for name, timing in median_run['modules'].items()),
+            key=lambda m: m['cumulative_ms'], reverse=True
+        )[:args.top],
+    }
+    if args.app_run:
+        report['app_first_run_ms'] = statistics.median(measure_app_run(args.app, env) for _ in range(args.runs))
+
+    print(f"app imports: {report['import_ms']:.1f}ms (interpreter wall {report['wall_ms']:.1f}ms, "
+          f"median of {args.runs})", file=sys.stderr)
+    if 'app_first_run_ms' in report:
+        print(f"first headless app run: {report['app_first_run_ms']:.1f}ms", file=sys.stderr)
+    for m in report['slowest']:
+        print(f"  {m['cumulative_ms']:9.1f}ms  {m['module']}", file=sys.stderr)
+    print(f"deferred dependencies loaded at startup: {', '.join(loaded) or 'none'}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.fail_on_deferred and loaded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
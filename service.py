@@ -0,0 +1,151 @@
+import os
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, File, Header, HTTPException, UploadFile
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from utils.async_api import (aevaluate_answer, aevaluate_answers_batch, aextract_document,
+                             agenerate_followup_question, agenerate_interview_questions, shutdown)
+from utils.document_processor import SUPPORTED_EXTENSIONS
+from utils.llm_cache import MemoryCache
+from utils.telemetry import bind_session, configure_logging, render_prometheus
+from utils.token_budget import TokenBudgetExceeded, session_budget_from_env, use_budget
+from utils.warmup import start_background_warm_up
+
+load_dotenv()
+configure_logging()
+
+MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', 10 * 1024 * 1024))
+
+# Per-session token budgets; bounded and idle-expiring so memory stays flat with many sessions.
+# Each request re-sets its session's entry, so the TTL counts from the last request.
+_budgets = MemoryCache(max_entries=int(os.getenv('SERVICE_MAX_SESSIONS', 10000)), ttl=6 * 3600)
+
+
+class QuestionsRequest(BaseModel):
+    job_description: str
+    resume: str
+    fresh: bool = False
+    resume_llm: bool = False
+    fused: Optional[bool] = None
+
+
+class EvaluateRequest(BaseModel):
+    question: str
+    answer: str
+    job_description: str = ""
+    resume: str = ""
+
+
+class BatchEvaluateRequest(BaseModel):
+    items: List[EvaluateRequest]
+
+
+class FollowupRequest(BaseModel):
+    question: str
+    answer: str
+    fresh: bool = False
+    avoid: List[str] = []
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_background_warm_up()
+    yield
+    shutdown(wait=False)
+
+
+app = FastAPI(title="Interview Agent", lifespan=lifespan)
+
+
+def _session(session_id: Optional[str]) -> str:
+    session_id = session_id or uuid.uuid4().hex
+    bind_session(session_id)
+    budget = _budgets.get(session_id)
+    _budgets.set(session_id, session_budget_from_env() if budget is None else budget)
+    return session_id
+
+
+@contextmanager
+def _budget(session_id: str):
+    # The LLM helpers fall back to local results when the budget refuses a
+    # call; the service reports that as 429 rather than a degraded 200.
+    budget = _budgets.get(session_id)
+    if budget.remaining == 0:
+        raise TokenBudgetExceeded(f"Session token budget exhausted ({budget.used}/{budget.per_session} used)")
+    with use_budget(budget) as scope:
+        yield budget
+    if scope.refused:
+        raise TokenBudgetExceeded(f"Session token budget exhausted ({budget.used}/{budget.per_session} used)")
+
+
+@app.exception_handler(TokenBudgetExceeded)
+async def token_budget_exceeded(request, exc: TokenBudgetExceeded):
+    return PlainTextResponse(str(exc), status_code=429)
+
+
+@app.get("/healthz")
+async def healthz():
+    return {'status': 'ok'}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_prometheus()
+
+
+@app.post("/documents")
+async def upload_document(file: UploadFile = File(...), x_session_id: Optional[str] = Header(None)):
+    _session(x_session_id)
+    name = file.filename or ''
+    if name.rsplit('.', 1)[-1].lower() not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(415, f"Unsupported file type: {name}")
+    data = await file.read(MAX_UPLOAD_BYTES + 1)
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise HTTPException(413, f"File is larger than {MAX_UPLOAD_BYTES} bytes")
+    try:
+        document = await aextract_document(data, name=name)
+    except Exception as e:
+        raise HTTPException(422, str(e))
+    return document._asdict()
+
+
+@app.post("/questions")
+async def questions(request: QuestionsRequest, x_session_id: Optional[str] = Header(None)):
+    session_id = _session(x_session_id)
+    timings = {}
+    with _budget(session_id):
+        generated = await agenerate_interview_questions(
+            request.job_description, request.resume, fresh=request.fresh,
+            resume_llm=request.resume_llm, timings=timings, fused=request.fused
+        )
+    return {'session_id': session_id, 'questions': generated, 'timings': timings}
+
+
+@app.post("/evaluate")
+async def evaluate(request: EvaluateRequest, x_session_id: Optional[str] = Header(None)):
+    session_id = _session(x_session_id)
+    with _budget(session_id):
+        evaluation = await aevaluate_answer(request.question, request.answer, request.job_description, request.resume)
+    return {'session_id': session_id, 'evaluation': evaluation}
+
+
+@app.post("/evaluate/batch")
+async def evaluate_batch(request: BatchEvaluateRequest, x_session_id: Optional[str] = Header(None)):
+    session_id = _session(x_session_id)
+    with _budget(session_id):
+        evaluations = await aevaluate_answers_batch([item.model_dump() for item in request.items])
+    return {'session_id': session_id, 'evaluations': evaluations}
+
+
+@app.post("/followup")
+async def followup(request: FollowupRequest, x_session_id: Optional[str] = Header(None)):
+    session_id = _session(x_session_id)
+    with _budget(session_id):
+        question = await agenerate_followup_question(request.question, request.answer, fresh=request.fresh,
+                                                     avoid=request.avoid)
+    return {'session_id': session_id, 'question': question}
@@ -0,0 +1,32 @@
+import pytest
+
+from benchmarks.fake_gemini import FakeBackendConfig, FakeChatGemini
+from utils.llm_cache import set_cache
+from utils.llm_client import set_llm_factory
+from utils.question_bank import QuestionBank, set_question_bank
+from utils.scheduler import Scheduler, set_scheduler
+
+
+class CountingGemini(FakeChatGemini):
+    # The offline fake backend, recording every prompt that reaches it.
+    prompts = []
+
+    def _plan(self, prompt: str):
+        CountingGemini.prompts.append(prompt)
+        return super()._plan(prompt)
+
+
+@pytest.fixture
+def fake_backend():
+    # No latency, no response cache, no rate limit and an in-memory question
+    # bank, so tests never touch the persistent stores next to the app.
+    CountingGemini.config = FakeBackendConfig(latency=0, jitter=0)
+    CountingGemini.prompts = []
+    set_llm_factory(CountingGemini)
+    set_cache(None)
+    set_scheduler(Scheduler(requests_per_minute=0))
+    set_question_bank(QuestionBank(path=None))
+    yield CountingGemini
+    set_llm_factory(None)
+    set_scheduler(None)
+    set_question_bank(None)
@@ -0,0 +1,42 @@
+import pytest
+
+import utils.answer_evaluator as answer_evaluator
+from utils.answer_evaluator import EvaluationParseError, evaluate_answer, parse_evaluation, stream_evaluation
+from utils.structured_output import PARSE_FAILURES
+
+QUESTION = "How do you keep a Flask API responsive under load?"
+ANSWER = ("I profile the slow endpoints first, move heavy work to a Celery queue, cache hot reads in Redis "
+          "and run gunicorn with enough workers for the CPU count, then load test with locust before release.")
+
+
+def parse_failures() -> float:
+    return sum(value for _, labels, value in PARSE_FAILURES.samples() if ('stage', 'evaluate_answer') in labels)
+
+
+def test_text_layout_is_not_counted_as_a_parse_failure():
+    before = parse_failures()
+    evaluation = parse_evaluation("Score: 7/10\nFeedback: Solid answer.\nStrengths:\n- concrete\nImprovements:\n- numbers")
+    assert evaluation['score'] == 7
+    assert parse_failures() == before
+
+
+def test_unparseable_response_is_counted_once():
+    before = parse_failures()
+    with pytest.raises(EvaluationParseError):
+        parse_evaluation("I cannot rate this answer.")
+    assert parse_failures() == before + 1
+
+
+@pytest.mark.parametrize('evaluate', [
+    lambda: evaluate_answer(QUESTION, ANSWER, prescore=False),
+    lambda: list(stream_evaluation(QUESTION, ANSWER, prescore=False))[-1],
+])
+def test_response_is_parsed_once(fake_backend, monkeypatch, evaluate):
+    calls = []
+    parse = answer_evaluator.parse_evaluation
+    monkeypatch.setattr(answer_evaluator, 'parse_evaluation', lambda content: calls.append(content) or parse(content))
+
+    evaluation = evaluate()
+
+    assert len(calls) == 1
+    assert 0 <= evaluation['score'] <= 10 and 'fallback_reason' not in evaluation
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from utils.batch_screen import RESULTS_FILE, collect_resumes, screen
+
+JOB = "Backend engineer: Python, Docker, PostgreSQL and AWS."
+
+
+@pytest.fixture
+def resumes(tmp_path):
+    folder = tmp_path / 'resumes'
+    folder.mkdir()
+    (folder / 'ada.txt').write_text("Python and Docker on AWS for five years.")
+    (folder / 'bob.pdf').write_bytes(b"not really a pdf")
+    return folder
+
+
+def screened(out_dir):
+    with open(out_dir / RESULTS_FILE, encoding='utf-8') as f:
+        return [json.loads(line)['resume'] for line in f]
+
+
+def test_resume_retries_failed_rows_only(tmp_path, resumes):
+    out_dir = tmp_path / 'out'
+    ranked = screen(JOB, collect_resumes(str(resumes), str(tmp_path)), str(out_dir), workers=1)
+    assert [r['resume'] for r in ranked if r['error']] == ['bob.pdf']
+
+    (resumes / 'cy.txt').write_text("PostgreSQL and Python.")
+    screen(JOB, collect_resumes(str(resumes), str(tmp_path)), str(out_dir), workers=1)
+    assert sorted(screened(out_dir)) == ['ada.txt', 'bob.pdf', 'bob.pdf', 'cy.txt']
+
+
+def test_resuming_with_another_job_description_is_refused(tmp_path, resumes):
+    out_dir = tmp_path / 'out'
+    screen(JOB, collect_resumes(str(resumes), str(tmp_path)), str(out_dir), workers=1)
+    with pytest.raises(ValueError, match='--restart'):
+        screen("Frontend engineer: React", collect_resumes(str(resumes), str(tmp_path)), str(out_dir), workers=1)
+    ranked = screen("Frontend engineer: React", collect_resumes(str(resumes), str(tmp_path)), str(out_dir),
+                    workers=1, restart=True)
+    assert len(ranked) == 2
+    assert len(screened(out_dir)) == 2
@@ -0,0 +1,20 @@
+from benchmarks.corpus import make_pdf
+from utils.document_processor import extract_document
+
+PAGES = [f"Page {i} lists Python, Docker and Kubernetes experience." for i in range(1, 5)]
+
+
+def test_page_count_is_the_documents_not_the_extracted_pages():
+    document = extract_document(make_pdf(PAGES + ["Capped test"]), max_pages=2, name="resume.pdf")
+    assert document.page_count == 5
+    assert document.pages_extracted == 2
+    assert "Page 3" not in document.text
+
+
+def test_cache_hits_report_no_extraction_time():
+    data = make_pdf(PAGES)
+    first = extract_document(data, name="resume.pdf")
+    again = extract_document(data, name="copy.pdf")
+    assert not first.cached and first.extraction_seconds > 0
+    assert again.cached and again.extraction_seconds == 0
+    assert again.name == "copy.pdf" and again.text == first.text and again.page_count == 4
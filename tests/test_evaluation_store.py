@@ -0,0 +1,65 @@
+import pytest
+
+from utils.evaluation_store import EvaluationStore
+
+JD = "Senior Python developer"
+QUESTION = "Explain Python generators."
+
+
+def evaluation(score, **extra):
+    return {'score': score, 'feedback': 'ok',
+            'rubric': {'technical_depth': score, 'communication': score, 'relevance': score}, **extra}
+
+
+def test_unchanged_answers_are_not_dirty_and_edits_are():
+    store = EvaluationStore()
+    store.save(0, QUESTION, "They yield values lazily.", evaluation(7), JD)
+    assert store.dirty([(0, QUESTION, "  They yield values lazily.  "), (1, QUESTION, "new")], JD) == [1]
+    assert store.is_dirty(0, QUESTION, "They return lists.", JD)
+    assert store.is_dirty(0, QUESTION, "They yield values lazily.", "Another job")
+    assert store.lookup(QUESTION, "They yield values lazily.", JD)['score'] == 7
+
+
+def test_fallback_scores_are_shown_but_re_scored():
+    store = EvaluationStore()
+    store.save(0, QUESTION, "They yield.", evaluation(2, fallback_reason='timeout'), JD)
+    assert store.get(0)['evaluation']['score'] == 2
+    assert store.is_dirty(0, QUESTION, "They yield.", JD)
+    assert store.lookup(QUESTION, "They yield.", JD) is None
+
+
+def test_local_prescores_are_final_unless_their_reason_no_longer_skips_gemini():
+    store = EvaluationStore()
+    store.save(0, QUESTION, "", evaluation(0, scored_locally='blank'), JD)
+    store.save(1, QUESTION, "Something about cats.", evaluation(1, scored_locally='off_topic'), JD)
+    assert store.dirty([(0, QUESTION, ""), (1, QUESTION, "Something about cats.")], JD) == [1]
+
+
+def test_aggregates_follow_overwrites_and_removals():
+    store = EvaluationStore()
+    store.save(0, QUESTION, "a", evaluation(4), JD)
+    store.save(1, QUESTION, "b", evaluation(8), JD)
+    store.save(0, QUESTION, "c", evaluation(6), JD)
+    assert store.average_score == pytest.approx(7)
+    store.remove(1)
+    assert store.average_score == pytest.approx(6)
+    assert store.average_rubric() == {'technical_depth': 6, 'communication': 6, 'relevance': 6}
+
+
+def test_memo_is_bounded():
+    store = EvaluationStore(memo_size=2)
+    for i in range(3):
+        store.save(i, QUESTION, f"answer {i}", evaluation(5), JD)
+    assert store.lookup(QUESTION, "answer 0", JD) is None
+    assert store.lookup(QUESTION, "answer 2", JD) is not None
+
+
+def test_records_round_trip():
+    store = EvaluationStore()
+    store.save(1, QUESTION, "b", evaluation(8), JD)
+    store.save(0, QUESTION, "a", evaluation(4), JD)
+    records = store.to_records()
+    assert [r['question_idx'] for r in records] == [0, 1] and 'key' not in records[0]
+    restored = EvaluationStore.from_records(records, JD)
+    assert restored.average_score == store.average_score
+    assert restored.dirty([(0, QUESTION, "a"), (1, QUESTION, "b")], JD) == []
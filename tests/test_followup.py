@@ -0,0 +1,16 @@
+from benchmarks.fake_gemini import fake_response_for
+from utils.question_dedup import QuestionIndex
+from utils.question_generator import _followup_prompt, finalize_followup_question, stream_followup_question
+
+QUESTION = "Tell me about your experience with Docker."
+ANSWER = "I containerised our Flask services and ran them on ECS with health checks and rolling deploys."
+
+
+def test_streamed_followup_avoids_asked_questions_in_one_call(fake_backend):
+    asked = [QUESTION, fake_response_for(_followup_prompt(QUESTION, ANSWER)).strip()]
+    streamed = "".join(stream_followup_question(QUESTION, ANSWER, avoid=asked))
+    followup = finalize_followup_question(streamed, QUESTION, ANSWER, avoid=asked)
+
+    assert len(fake_backend.prompts) == 1
+    assert "Do not repeat any of these" in fake_backend.prompts[0]
+    assert followup.get('duplicate') or not QuestionIndex.from_questions(asked).is_duplicate(followup['question'])
@@ -0,0 +1,28 @@
+import threading
+import time
+
+from utils.job_queue import DONE, QUEUED, RUNNING, JobQueue
+
+
+def wait_for(jobs, timeout=2.0):
+    deadline = time.time() + timeout
+    while not all(job.finished for job in jobs) and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_fan_out_jobs_hold_one_slot_per_parallel_call():
+    queue = JobQueue(max_workers=8, per_owner=2)
+    release = threading.Event()
+
+    batch = queue.submit('owner', 'evaluate_batch', lambda job: release.wait(2) and job.slots, slots=5)
+    single = queue.submit('owner', 'evaluate', lambda job: 'ok')
+    other = queue.submit('someone else', 'evaluate', lambda job: 'ok')
+    wait_for([other])
+    # Capped at the owner's limit, the batch holds both of their slots until it finishes.
+    assert batch.slots == 2 and batch.status == RUNNING
+    assert single.status == QUEUED
+    assert other.status == DONE
+    release.set()
+    wait_for([batch, single])
+    assert batch.result == 2 and single.result == 'ok'
+    queue.shutdown()
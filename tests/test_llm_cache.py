@@ -0,0 +1,121 @@
+import time
+
+import pytest
+
+import benchmarks.fake_gemini as fake_gemini
+from utils.answer_evaluator import evaluate_answer, stream_evaluation
+from utils.llm_cache import MemoryCache, SQLiteCache, make_cache_key, set_cache
+from utils.llm_client import MODEL_NAME, invoke_llm
+from utils.question_generator import generate_interview_plan
+from utils.structured_output import StructuredOutputError
+
+QUESTION = "Explain how Python generators work."
+ANSWER = "A generator yields values lazily, keeping its frame suspended between next() calls."
+
+
+@pytest.fixture
+def cache(fake_backend):
+    cache = MemoryCache()
+    set_cache(cache)
+    yield cache
+    set_cache(None)
+
+
+@pytest.fixture
+def malformed(monkeypatch):
+    # Valid JSON that fails the evaluation schema (score out of range).
+    monkeypatch.setattr(fake_gemini, 'fake_response_for', lambda prompt: '{"score": 11}')
+
+
+@pytest.mark.parametrize('make', [MemoryCache, lambda: SQLiteCache(path=':memory:')], ids=['memory', 'sqlite'])
+def test_cache_round_trip_and_delete(make):
+    cache = make()
+    key = make_cache_key("prompt", "model", 0)
+    assert cache.get(key) is None
+    cache.set(key, "value")
+    assert cache.get(key) == "value"
+    cache.delete(key)
+    assert cache.get(key) is None
+    cache.delete(key)
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = MemoryCache(ttl=60)
+    cache.set('key', 'value')
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert cache.get('key') is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_sqlite_cache_persists_and_stays_bounded(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = SQLiteCache(path=path, max_entries=2)
+    for key in 'abc':
+        cache.set(key, key.upper())
+    reopened = SQLiteCache(path=path, max_entries=2)
+    assert reopened.stats()['entries'] == 2
+    assert reopened.get('c') == 'C'
+
+
+def test_temperature_and_model_are_part_of_the_key():
+    keys = {make_cache_key("prompt", "model", 0), make_cache_key("prompt", "model", 0.7),
+            make_cache_key("prompt", "other", 0), make_cache_key("prompt!", "model", 0)}
+    assert len(keys) == 4
+
+
+def test_identical_calls_are_served_from_cache(cache, fake_backend):
+    assert invoke_llm("same prompt") == invoke_llm("same prompt")
+    assert len(fake_backend.prompts) == 1
+
+
+def test_responses_failing_validation_are_not_cached(cache, fake_backend):
+    def reject(content):
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        invoke_llm("same prompt", validate=reject)
+    assert cache.stats()['entries'] == 0
+    invoke_llm("same prompt")
+    assert len(fake_backend.prompts) == 2
+
+
+@pytest.mark.parametrize('evaluate', [evaluate_answer, lambda *args: list(stream_evaluation(*args))[-1]],
+                         ids=['invoke', 'stream'])
+def test_malformed_evaluation_is_retried_not_replayed(cache, fake_backend, malformed, monkeypatch, evaluate):
+    assert evaluate(QUESTION, ANSWER)['fallback_reason']
+    monkeypatch.undo()
+    evaluation = evaluate(QUESTION, ANSWER)
+    assert 'fallback_reason' not in evaluation
+    assert len(fake_backend.prompts) == 2
+
+
+def test_invalid_cached_entries_are_evicted(cache, fake_backend):
+    def check(content):
+        if content == 'stale':
+            raise ValueError("stale")
+
+    key = make_cache_key("prompt", MODEL_NAME, 0)
+    cache.set(key, 'stale')
+    assert invoke_llm("prompt", validate=check) != 'stale'
+    assert len(fake_backend.prompts) == 1
+    assert cache.get(key) != 'stale'
+
+
+def test_malformed_plan_is_not_cached(cache, fake_backend, malformed, monkeypatch):
+    with pytest.raises(StructuredOutputError):
+        generate_interview_plan("Senior Python engineer", "Five years of Python and Docker")
+    monkeypatch.undo()
+    plan = generate_interview_plan("Senior Python engineer", "Five years of Python and Docker")
+    assert len(plan['questions']) == 5
@@ -0,0 +1,59 @@
+import contextvars
+import threading
+
+import pytest
+
+from utils.pipeline import Stage, run_pipeline
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+def test_independent_stages_run_concurrently_and_feed_dependents():
+    both_started = threading.Barrier(2, timeout=2)
+
+    def left():
+        both_started.wait()
+        return 2
+
+    def right():
+        both_started.wait()
+        return 3
+
+    result = run_pipeline([
+        Stage('left', left),
+        Stage('right', right),
+        Stage('total', lambda left, right: left + right, ['left', 'right']),
+    ])
+    assert result['total'] == 5
+    assert set(result.timings) == {'left', 'right', 'total'}
+    assert result.started_at['total'] >= result.started_at['left']
+
+
+def test_stages_see_the_callers_context():
+    request_id.set('req-1')
+    try:
+        result = run_pipeline([Stage('seen', request_id.get)])
+    finally:
+        request_id.set(None)
+    assert result['seen'] == 'req-1'
+
+
+def test_a_failing_stage_fails_the_pipeline():
+    ran = []
+
+    def broken():
+        raise RuntimeError("stage failed")
+
+    with pytest.raises(RuntimeError, match="stage failed"):
+        run_pipeline([Stage('broken', broken), Stage('after', lambda broken: ran.append(broken), ['broken'])])
+    assert ran == []
+
+
+@pytest.mark.parametrize('stages, message', [
+    ([Stage('a', lambda: 1), Stage('a', lambda: 2)], "Duplicate"),
+    ([Stage('a', lambda b: b, ['b'])], "unknown"),
+    ([Stage('a', lambda b: b, ['b']), Stage('b', lambda a: a, ['a'])], "cycle"),
+])
+def test_invalid_graphs_are_rejected_before_running(stages, message):
+    with pytest.raises(ValueError, match=message):
+        run_pipeline(stages)
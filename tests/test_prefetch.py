@@ -0,0 +1,76 @@
+import threading
+import time
+
+from utils.prefetch import Prefetcher
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_settled_answer_is_served_from_the_prefetch():
+    prefetcher = Prefetcher(debounce=0.01)
+    prefetcher.schedule('q1', 'eval', 'answer', lambda: 'result')
+    wait_until(lambda: prefetcher.stats().get('started'))
+    future = prefetcher.take('eval', 'answer')
+    assert future is not None and future.result(timeout=1) == 'result'
+    assert prefetcher.stats()['hit_rate'] == 1.0
+
+
+def test_edits_before_the_debounce_cost_nothing():
+    prefetcher = Prefetcher(debounce=60)
+    calls = []
+    for text in ('draft', 'draft two', 'final'):
+        prefetcher.schedule('q1', 'eval', text, calls.append, text)
+    stats = prefetcher.stats()
+    assert stats['scheduled'] == 3 and stats['debounced'] == 2
+    assert not calls
+
+
+def test_running_prefetch_replaced_by_an_edit_is_wasted():
+    prefetcher = Prefetcher(debounce=0)
+    release = threading.Event()
+    prefetcher.schedule('q1', 'eval', 'first', release.wait, 1)
+    wait_until(lambda: prefetcher.stats().get('started'))
+    prefetcher.schedule('q1', 'eval', 'second', lambda: 'result')
+    release.set()
+    assert prefetcher.stats()['wasted'] == 1
+    assert prefetcher.take('eval', 'first') is None
+
+
+def test_miss_on_a_pending_key_frees_its_slot():
+    prefetcher = Prefetcher(debounce=60)
+    assert prefetcher.schedule('q1', 'eval', 'answer', lambda: 'result')
+    assert prefetcher.take('eval', 'answer') is None
+    # The same answer settling again starts a new prefetch instead of being ignored.
+    assert prefetcher.schedule('q1', 'eval', 'answer', lambda: 'result')
+    assert prefetcher.stats()['scheduled'] == 2
+
+
+def test_failed_prefetch_can_be_scheduled_again():
+    prefetcher = Prefetcher(debounce=0)
+    done = threading.Event()
+
+    def fail():
+        done.set()
+        raise RuntimeError("quota")
+
+    prefetcher.schedule('q1', 'eval', 'answer', fail)
+    done.wait(1)
+    prefetcher._executor.shutdown(wait=True)
+    assert prefetcher.take('eval', 'answer') is None
+    assert ('q1', 'eval') not in prefetcher._slots
+
+
+def test_a_prefetch_is_served_once():
+    prefetcher = Prefetcher(debounce=0.01)
+    prefetcher.schedule('q1', 'followup', 'answer', lambda: 'follow-up')
+    wait_until(lambda: prefetcher.stats().get('started'))
+    assert prefetcher.take('followup', 'answer').result(timeout=1) == 'follow-up'
+    assert prefetcher.take('followup', 'answer') is None
+    stats = prefetcher.stats()
+    assert stats['hit'] == 1 and stats['miss'] == 1 and not stats.get('wasted')
+    # The same answer can prefetch its next follow-up.
+    assert prefetcher.schedule('q1', 'followup', 'answer', lambda: 'another follow-up')
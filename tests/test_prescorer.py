@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+from utils.answer_evaluator import evaluate_answer
+from utils.evaluation_store import EvaluationStore
+from utils.prescorer import LOCAL_REASONS, calibrate, confident_prescore, prescore
+
+CALIBRATION_SET = os.path.join(os.path.dirname(__file__), 'data', 'prescore_calibration.jsonl')
+
+
+def load_calibration_set():
+    with open(CALIBRATION_SET, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+ON_TOPIC = [item for item in load_calibration_set() if item['score'] >= 5]
+TRIVIAL = [item for item in load_calibration_set() if item['score'] <= 1]
+
+
+@pytest.fixture(autouse=True)
+def default_threshold(monkeypatch):
+    monkeypatch.delenv('PRESCORE_CONFIDENCE', raising=False)
+
+
+@pytest.mark.parametrize('item', ON_TOPIC, ids=lambda item: item['answer'][:30])
+@pytest.mark.parametrize('threshold', [None, 0.5, 0.0])
+def test_on_topic_answers_are_never_scored_locally(item, threshold):
+    assert confident_prescore(item['question'], item['answer'], item['job_description'], threshold) is None
+
+
+@pytest.mark.parametrize('item', TRIVIAL, ids=lambda item: item['answer'][:30] or 'blank')
+def test_trivial_answers_are_scored_locally(item):
+    result = confident_prescore(item['question'], item['answer'], item['job_description'])
+    assert result is not None
+    assert result.reason in LOCAL_REASONS
+    assert abs(result.score - item['score']) <= 1
+
+
+def test_related_skills_are_not_off_topic_enough_to_skip_gemini():
+    result = prescore("How do you scale a Python API?",
+                      "I put a load balancer in front of several gunicorn workers and cache hot reads in Redis.")
+    assert result.reason not in LOCAL_REASONS
+    # "scaling" and "scale" stem to the same term.
+    assert prescore("How do you scale a Python API?", "Scaling it horizontally behind a load balancer").features[
+        'question_overlap'] > 0
+
+
+def test_threshold_of_one_turns_prescoring_off(monkeypatch):
+    monkeypatch.setenv('PRESCORE_CONFIDENCE', '1')
+    assert confident_prescore("Explain Python generators", "") is None
+
+
+def test_calibration_report_on_labelled_set():
+    report = calibrate(load_calibration_set(), [0.0, 0.8, 0.95])
+    by_threshold = {row['threshold']: row for row in report['thresholds']}
+    assert report['items'] == len(load_calibration_set())
+    # Even a zero threshold never lets an escalating verdict through.
+    assert by_threshold[0.0]['local'] == sum(report['reasons'][r]['count'] for r in LOCAL_REASONS)
+    assert by_threshold[0.8]['within_2'] == 1.0
+    assert by_threshold[0.8]['mae'] <= 1.0
+    assert by_threshold[0.95]['local'] <= by_threshold[0.8]['local']
+
+
+def test_evaluate_answer_escalates_on_topic_answers(fake_backend):
+    item = ON_TOPIC[0]
+    evaluation = evaluate_answer(item['question'], item['answer'], item['job_description'])
+    assert 'scored_locally' not in evaluation
+    assert len(fake_backend.prompts) == 1
+
+
+def test_evaluate_answer_scores_blank_answers_without_a_call(fake_backend):
+    evaluation = evaluate_answer("Explain Python generators", "", "")
+    assert evaluation['scored_locally'] == 'blank'
+    assert not fake_backend.prompts
+
+
+def test_stale_off_topic_results_are_rescored():
+    store = EvaluationStore()
+    question, answer = "What is your experience with Docker?", "Kubernetes and Helm charts for every service."
+    stale = {'score': 2, 'feedback': '', 'scored_locally': 'off_topic'}
+    store.save(0, question, answer, stale)
+    assert store.is_dirty(0, question, answer)
+    assert store.lookup(question, answer) is None
+
+    store.save(1, "Explain Python generators", "", {'score': 0, 'feedback': '', 'scored_locally': 'blank'})
+    assert not store.is_dirty(1, "Explain Python generators", "")
@@ -0,0 +1,50 @@
+from utils.question_bank import QuestionBank, bank_mode, get_question_bank, set_question_bank
+from utils.question_dedup import QuestionIndex
+
+GENERATED = {'question': "How did you shard a PostgreSQL table that outgrew one primary?",
+             'category': 'Technical', 'difficulty': 'Hard'}
+
+
+def test_selection_covers_job_skills_plus_one_general_question():
+    selection = QuestionBank(path=None).select(['Python', 'postgres', 'Quantum Basketweaving'], [], count=5)
+    assert selection.covered == ['Python', 'postgres']
+    assert selection.uncovered == ['Quantum Basketweaving']
+    assert selection.coverage == 2 / 3
+    assert len(selection.questions) == 3
+    assert not QuestionIndex.from_questions(selection.questions[:-1]).is_duplicate(selection.questions[-1]['question'])
+
+
+def test_selection_skips_questions_already_asked():
+    bank = QuestionBank(path=None)
+    first = bank.select(['Python'], [], count=2).questions[0]['question']
+    again = bank.select(['Python'], [], count=2, index=QuestionIndex.from_questions([first]))
+    assert first not in [q['question'] for q in again.questions]
+
+
+def test_generated_questions_persist_and_rank_first(tmp_path):
+    path = str(tmp_path / 'bank.sqlite3')
+    bank = QuestionBank(path)
+    near_duplicate = dict(GENERATED, question=GENERATED['question'].lower())
+    assert bank.record([GENERATED, near_duplicate, dict(GENERATED, question="Short?")]) == 1
+
+    reopened = QuestionBank(path)
+    assert reopened.stats()['generated'] == 1
+    assert reopened.select(['PostgreSQL'], [], count=2).questions[0]['question'] == GENERATED['question']
+
+
+def test_followup_is_on_a_skill_from_the_exchange():
+    bank = QuestionBank(path=None)
+    followup = bank.followup("Tell me about your Redis caching layer.", "We cached sessions in Redis.")
+    assert followup['category'] == 'Follow-up'
+    assert 'Redis' in followup['question']
+
+
+def test_mode_off_disables_the_bank(monkeypatch):
+    monkeypatch.setenv('QUESTION_BANK_MODE', 'off')
+    set_question_bank(QuestionBank(path=None))
+    try:
+        assert get_question_bank() is None
+    finally:
+        set_question_bank(None)
+    monkeypatch.setenv('QUESTION_BANK_MODE', 'nonsense')
+    assert bank_mode() == 'fallback'
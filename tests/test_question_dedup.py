@@ -0,0 +1,33 @@
+from utils.question_dedup import QuestionIndex, dedupe_questions, question_terms
+
+ASKED = ["Tell me about your experience with Docker.", "How do you design a REST API for pagination?"]
+
+
+def test_rephrased_boilerplate_is_a_duplicate():
+    index = QuestionIndex.from_questions(ASKED)
+    assert index.is_duplicate("Describe your experiences with Docker")
+    assert not index.is_duplicate("How would you debug a memory leak in Python?")
+
+
+def test_questions_of_only_stopwords_are_never_duplicates():
+    assert not QuestionIndex.from_questions(["Could you explain that?"]).is_duplicate("Could you explain that?")
+
+
+def test_stemming_folds_word_forms():
+    assert question_terms("Debugging debugged installs")[:3] == ['debug', 'debug', 'install']
+
+
+def test_dedupe_keeps_the_first_and_skips_already_asked():
+    index = QuestionIndex.from_questions(ASKED[:1])
+    proposed = [{'question': "Explain your experience with Docker"},
+                {'question': "How do you profile a slow SQL query?"},
+                {'question': "How would you profile slow SQL queries?"}]
+    assert [q['question'] for q in dedupe_questions(proposed, index)] == ["How do you profile a slow SQL query?"]
+    assert len(index) == 2
+
+
+def test_threshold_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv('QUESTION_SIMILARITY_THRESHOLD', '0.99')
+    index = QuestionIndex.from_questions(ASKED)
+    assert index.threshold == 0.99
+    assert not index.is_duplicate("How do you design a REST API for sorting?")
@@ -0,0 +1,79 @@
+import csv
+import io
+import sqlite3
+
+import pytest
+
+from utils.report_export import Rollups, evaluation_rows, export_store, main, render_report
+from utils.session_store import SessionStore, user_owner
+
+OWNER = user_owner('ada@example.com')
+
+
+def record(*scores):
+    questions = [{'question': f"Explain Python generators, part {i}", 'category': 'Technical', 'difficulty': 'Medium'}
+                 for i in range(len(scores))]
+    evaluations = [{'question_idx': i, 'question': q['question'], 'answer': "They yield values lazily.",
+                    'evaluation': {'score': score, 'feedback': 'ok',
+                                   'rubric': {'technical_depth': score, 'communication': score, 'relevance': score}}}
+                   for i, (q, score) in enumerate(zip(questions, scores))]
+    return {'questions': questions, 'evaluations': evaluations}
+
+
+@pytest.fixture
+def store():
+    store = SessionStore(path=':memory:', max_age=None)
+    store.save('first', OWNER, record(6, 8), 'Python developer — Ada', 'python')
+    store.save('second', OWNER, record(4), 'Python developer — Bob', 'python')
+    store.save('other', user_owner('eve@example.com'), record(9), 'Python developer — Eve', 'python')
+    return store
+
+
+def read_csv(data: bytes):
+    return list(csv.DictReader(io.StringIO(data.decode('utf-8'))))
+
+
+def test_export_includes_only_the_owners_evaluations(store):
+    data, report, summary = export_store(store, OWNER, 'csv', max_rows=0)
+    rows = read_csv(data)
+    assert sorted(row['session_id'] for row in rows) == ['first', 'first', 'second']
+    assert summary['answers'] == 3 and summary['interviews'] == 2 and not summary['truncated']
+    assert summary['mean'] == pytest.approx(6.0)
+    assert 'Eve' not in report
+
+
+def test_export_stops_at_the_row_cap(store):
+    data, report, summary = export_store(store, OWNER, 'csv', max_rows=2)
+    assert len(read_csv(data)) == 2
+    assert summary['truncated'] and summary['answers'] == 2
+    assert 'EXPORT_MAX_ROWS' in report
+
+
+def test_parquet_export_matches_csv(store):
+    pq = pytest.importorskip('pyarrow.parquet')
+    data, _, _ = export_store(store, OWNER, 'parquet', max_rows=0)
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 3
+    assert sorted(table.column('score').to_pylist()) == [4.0, 6.0, 8.0]
+
+
+def test_html_report_escapes_candidate_names(store):
+    store.save('third', OWNER, record(5), '<script>alert(1)</script>', 'python')
+    rollups = Rollups()
+    for row in evaluation_rows(store.iter_sessions(OWNER)):
+        rollups.add(row)
+    html = render_report(rollups, 'html')
+    assert '<script>' not in html and '&lt;script&gt;' in html
+
+
+def test_cli_export_never_evicts_old_interviews(tmp_path, monkeypatch):
+    path = str(tmp_path / 'sessions.sqlite3')
+    SessionStore(path, max_age=None).save('old', OWNER, record(7), 'Python developer — Ada', 'python')
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE sessions SET updated_at = 0")
+    monkeypatch.setenv('SESSION_STORE_PATH', path)
+
+    main(['-o', str(tmp_path / 'evaluations.csv')])
+
+    assert len(read_csv((tmp_path / 'evaluations.csv').read_bytes())) == 1
+    assert SessionStore(path, max_age=None).load('old', OWNER) is not None
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from utils.scheduler import INTERACTIVE, LLMUnavailable, Scheduler
+from utils.telemetry import span
+
+
+def make_scheduler(**kwargs):
+    options = dict(requests_per_minute=0, max_attempts=1, base_delay=0, interactive_deadline=0.3)
+    options.update(kwargs)
+    return Scheduler(**options)
+
+
+def test_retries_retryable_errors():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("429 Resource exhausted")
+        return 'ok'
+
+    assert make_scheduler(max_attempts=3).call(flaky) == 'ok'
+    assert len(calls) == 3
+
+
+def test_retries_are_recorded_on_the_callers_span():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("503 Service unavailable")
+        return 'ok'
+
+    scheduler = make_scheduler(max_attempts=3)
+    with span('llm.invoke') as call:
+        scheduler.call(flaky, trace=call)
+    assert call.attrs['retries'] == 2
+
+    with span('llm.stream') as call:
+        assert list(scheduler.stream(lambda: iter(['a', 'b']), trace=call)) == ['a', 'b']
+    assert call.attrs['retries'] == 0
+
+
+def test_non_retryable_errors_are_raised_at_once():
+    with pytest.raises(ValueError):
+        make_scheduler(max_attempts=3).call(lambda: (_ for _ in ()).throw(ValueError("bad request")))
+
+
+def test_abandoned_calls_are_capped_at_the_pool_size():
+    scheduler = make_scheduler(max_concurrency=1, interactive_deadline=0.1)
+    release = threading.Event()
+    with pytest.raises(LLMUnavailable):
+        scheduler.call(release.wait)
+    assert scheduler.stats()['abandoned_running'] == 1
+    # The only worker is still busy with the abandoned call, so this one waits for it and gives up.
+    start = time.monotonic()
+    with pytest.raises(LLMUnavailable):
+        scheduler.call(lambda: 'ok')
+    assert time.monotonic() - start < 1
+    release.set()
+    assert scheduler.call(lambda: 'ok', deadline=1) == 'ok'
+    assert scheduler.stats()['abandoned_running'] == 0
+
+
+def test_hedges_take_no_rate_limit_token():
+    scheduler = make_scheduler(requests_per_minute=1, burst=1, hedge_after=0.05, interactive_deadline=2)
+    calls = []
+
+    def slow_then_fast():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(1)
+            return 'original'
+        return 'hedge'
+
+    assert scheduler.call(slow_then_fast) == 'hedge'
+    assert not scheduler.bucket().acquire(INTERACTIVE, timeout=0)
+
+
+def test_stream_deadline_covers_the_whole_response():
+    def open_stream():
+        yield 'first'
+        time.sleep(1)
+        yield 'late'
+
+    chunks = []
+    start = time.monotonic()
+    with pytest.raises(LLMUnavailable) as raised:
+        for chunk in make_scheduler(interactive_deadline=0.2).stream(open_stream):
+            chunks.append(chunk)
+    assert chunks == ['first']
+    assert raised.value.reason == 'deadline_exceeded'
+    assert time.monotonic() - start < 0.8
@@ -0,0 +1,92 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+import service
+from benchmarks.corpus import make_pdf
+from utils.token_budget import TokenBudget, TokenBudgetExceeded, check_prompt, use_budget
+
+QUESTION = "How do you keep a Flask API responsive under load?"
+ANSWER = ("I profile the slow endpoints first, move heavy work to a Celery queue, cache hot reads in Redis "
+          "and run gunicorn with enough workers for the CPU count, then load test with locust before release.")
+
+
+def test_evaluate_returns_the_evaluation(fake_backend):
+    response = TestClient(service.app).post('/evaluate', json={'question': QUESTION, 'answer': ANSWER},
+                                            headers={'X-Session-Id': 'service-ok'})
+    assert response.status_code == 200
+    body = response.json()
+    assert body['session_id'] == 'service-ok'
+    assert 0 <= body['evaluation']['score'] <= 10 and 'fallback_reason' not in body['evaluation']
+
+
+def test_questions_and_followup_share_the_session(fake_backend):
+    client = TestClient(service.app)
+    response = client.post('/questions', json={'job_description': "Senior Python developer with Docker and AWS",
+                                               'resume': "Five years of Python, Flask and PostgreSQL"})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body['questions']) == 5 and body['timings']
+    session_id = body['session_id']
+
+    response = client.post('/followup', json={'question': QUESTION, 'answer': ANSWER},
+                           headers={'X-Session-Id': session_id})
+    assert response.status_code == 200
+    assert response.json()['session_id'] == session_id and response.json()['question']['question']
+
+
+def test_batch_evaluation_keeps_item_order(fake_backend):
+    items = [{'question': QUESTION, 'answer': ANSWER}, {'question': QUESTION, 'answer': ""}]
+    response = TestClient(service.app).post('/evaluate/batch', json={'items': items})
+    assert response.status_code == 200
+    first, blank = response.json()['evaluations']
+    assert first['score'] > blank['score'] == 0
+
+
+def test_document_upload(monkeypatch):
+    monkeypatch.setenv('ASYNC_PARSE_PROCESSES', '0')
+    client = TestClient(service.app)
+    pdf = make_pdf(["Python and Docker experience.", "Kubernetes on AWS."])
+    response = client.post('/documents', files={'file': ('resume.pdf', pdf, 'application/pdf')})
+    assert response.status_code == 200
+    assert response.json()['page_count'] == 2 and "Kubernetes" in response.json()['text']
+
+    assert client.post('/documents', files={'file': ('resume.exe', b"MZ", 'application/octet-stream')}).status_code == 415
+    monkeypatch.setattr(service, 'MAX_UPLOAD_BYTES', 10)
+    assert client.post('/documents', files={'file': ('resume.pdf', pdf, 'application/pdf')}).status_code == 413
+
+
+def test_metrics_are_exposed():
+    client = TestClient(service.app)
+    assert client.get('/healthz').json() == {'status': 'ok'}
+    assert "interview_agent_" in client.get('/metrics').text
+
+
+def test_refused_budget_is_a_429_not_a_fallback(fake_backend, monkeypatch):
+    monkeypatch.setenv('SESSION_TOKEN_BUDGET', '5')
+    client = TestClient(service.app)
+    response = client.post('/evaluate', json={'question': QUESTION, 'answer': ANSWER},
+                           headers={'X-Session-Id': 'service-small-budget'})
+    assert response.status_code == 429
+    assert fake_backend.prompts == []
+
+
+def test_refusals_are_scoped_to_the_request():
+    # Another request refused by the same budget must not fail this one.
+    budget = TokenBudget(per_session=5)
+    scopes = []
+
+    def other_request():
+        with use_budget(budget) as other:
+            scopes.append(other)
+            try:
+                check_prompt("a prompt well over five tokens long")
+            except TokenBudgetExceeded:
+                pass
+
+    with use_budget(budget) as scope:
+        thread = threading.Thread(target=other_request)
+        thread.start()
+        thread.join()
+    assert scopes[0].refused and budget.refusals == 1
+    assert not scope.refused
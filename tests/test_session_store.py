@@ -0,0 +1,83 @@
+import sqlite3
+import time
+
+import pytest
+
+from utils.session_store import SessionStore, token_owner, user_owner
+
+ADA = user_owner('Ada@Example.com')
+EVE = user_owner('eve@example.com')
+
+
+@pytest.fixture
+def store():
+    return SessionStore(path=':memory:', max_age=None)
+
+
+def test_round_trip_and_unchanged_saves_are_skipped(store):
+    record = {'questions': [{'question': "Explain Python generators"}], 'answers': {'0': "They yield."}}
+    assert store.save('s1', ADA, record, 'Python developer — Ada', 'python generators')
+    assert not store.save('s1', ADA, record, 'Python developer — Ada', 'python generators')
+    assert store.load('s1', ADA) == record
+
+
+def test_owners_never_see_each_others_sessions(store):
+    store.save('s1', ADA, {'secret': 1}, 'Ada', 'python')
+    assert store.load('s1', EVE) is None
+    assert store.list_sessions(EVE) == []
+    assert list(store.iter_sessions(EVE)) == []
+    # Another owner cannot overwrite or delete a session by guessing its id.
+    assert not store.save('s1', EVE, {'secret': 2}, 'Eve')
+    store.delete('s1', EVE)
+    assert store.load('s1', ADA) == {'secret': 1}
+    with pytest.raises(ValueError):
+        store.save('s2', '', {}, 'Nobody')
+
+
+def test_owner_identities_are_normalised_and_tokens_hashed():
+    assert user_owner(' ADA@example.com ') == user_owner('ada@example.com')
+    token = 'T' * 22
+    assert token not in token_owner(token)
+    assert token_owner(token) == token_owner(token) != token_owner('U' * 22)
+
+
+def test_search_matches_every_term_and_escapes_wildcards(store):
+    store.save('s1', ADA, {}, 'Data engineer — Ada', 'python spark')
+    store.save('s2', ADA, {}, 'Frontend developer — Ada', 'react')
+    store.save('s3', ADA, {}, '100% remote — Ada', 'go')
+    assert [s['id'] for s in store.list_sessions(ADA, 'ENGINEER python')] == ['s1']
+    assert [s['id'] for s in store.list_sessions(ADA, '100%')] == ['s3']
+    assert [s['id'] for s in store.list_sessions(ADA, '%')] == ['s3']
+    assert store.list_sessions(ADA, '_') == []
+    assert {s['id'] for s in store.iter_sessions(ADA, 'ada', batch_size=1)} == {'s1', 's2', 's3'}
+
+
+def test_iter_sessions_pages_through_every_owner_for_offline_tools(store):
+    for i in range(5):
+        store.save(f'a{i}', ADA, {'i': i}, 'Ada')
+    store.save('e0', EVE, {'i': 0}, 'Eve')
+    assert len(list(store.iter_sessions(ADA, batch_size=2))) == 5
+    assert len(list(store.iter_sessions(None, batch_size=2))) == 6
+
+
+def test_old_sessions_are_evicted(store):
+    store.save('old', ADA, {}, 'Old')
+    store._conn.execute("UPDATE sessions SET updated_at = ?", (time.time() - 3600,))
+    store.save('new', ADA, {}, 'New')
+    assert store.evict_older_than(60) == 1
+    assert [s['id'] for s in store.list_sessions(ADA)] == ['new']
+
+
+def test_databases_from_before_owners_are_migrated(tmp_path):
+    path = str(tmp_path / 'sessions.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sessions (id TEXT PRIMARY KEY, title TEXT NOT NULL, search_text TEXT NOT NULL, "
+                 "created_at REAL NOT NULL, updated_at REAL NOT NULL, data BLOB NOT NULL)")
+    conn.execute("INSERT INTO sessions VALUES ('legacy', 'Legacy', 'legacy', 0, ?, x'')", (time.time(),))
+    conn.commit()
+    conn.close()
+    store = SessionStore(path=path, max_age=None)
+    # Unowned legacy rows are hidden from every user but still visible to offline exports.
+    assert store.list_sessions(ADA) == []
+    assert store.save('new', ADA, {}, 'New')
+    assert store.stats()['sessions'] == 2
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from utils.skill_matcher import DEFAULT_TAXONOMY, SkillMatcher, get_skill_matcher, load_taxonomy, set_skill_matcher
+
+
+@pytest.fixture
+def matcher():
+    return SkillMatcher(DEFAULT_TAXONOMY)
+
+
+def names(matches):
+    return [m.name for m in matches]
+
+
+def test_aliases_map_to_one_skill_ordered_by_count(matcher):
+    matches = matcher.match("Postgres and Python, more Python, then PostgreSQL and python again.")
+    assert names(matches) == ['Python', 'PostgreSQL']
+    assert [m.count for m in matches] == [3, 2]
+
+
+def test_skill_names_with_symbols_match_whole_words_only(matcher):
+    assert names(matcher.match("C++ and C# services")) == ['C++', 'C#']
+    assert 'Java' not in names(matcher.match("JavaScript only"))
+    assert 'REST API' in names(matcher.match("Designed a REST API"))
+
+
+def test_canonicalize_falls_back_to_the_input(matcher):
+    assert matcher.canonicalize(" nodejs ") == 'Node.js'
+    assert matcher.canonicalize("Terraform") == 'Terraform'
+
+
+def test_taxonomy_file_extends_the_default(tmp_path, monkeypatch):
+    path = tmp_path / 'taxonomy.json'
+    path.write_text(json.dumps({'Terraform': ['terraform', 'tf']}))
+    monkeypatch.setenv('SKILL_TAXONOMY_PATH', str(path))
+    set_skill_matcher(None)
+    try:
+        assert names(get_skill_matcher().match("Terraform modules for AWS")) == ['Terraform', 'AWS']
+    finally:
+        set_skill_matcher(None)
+
+
+def test_malformed_taxonomy_is_rejected(tmp_path):
+    path = tmp_path / 'taxonomy.json'
+    path.write_text(json.dumps({'Terraform': 'terraform'}))
+    with pytest.raises(ValueError):
+        load_taxonomy(str(path))
@@ -0,0 +1,78 @@
+import pytest
+
+from utils.llm_client import invoke_llm
+from utils.telemetry import (FALLBACKS, METRICS, RECENT_SPANS_PER_SESSION, SPAN_ERRORS, Counter, Histogram, bind_session,
+                             recent_spans, register_metric, render_prometheus, span)
+from utils.token_budget import charge_call, get_token_stats
+
+
+@pytest.fixture
+def session():
+    bind_session('telemetry-test')
+    yield 'telemetry-test'
+    bind_session(None)
+
+
+def value(counter: Counter, **labels) -> float:
+    return dict((key, v) for _, key, v in counter.samples()).get(tuple(sorted(labels.items())), 0)
+
+
+def test_spans_are_kept_per_session_with_their_attributes(session):
+    with span('unit.work', items=3) as current:
+        current.set(fallback_used=False)
+    traced = recent_spans(session)[-1]
+    assert traced['name'] == 'unit.work' and traced['session'] == session
+    assert traced['items'] == 3 and traced['duration_ms'] >= 0 and traced['error'] is None
+    assert recent_spans('no-such-session') == []
+
+
+def test_recent_spans_are_bounded(session):
+    for _ in range(RECENT_SPANS_PER_SESSION + 5):
+        with span('unit.loop'):
+            pass
+    assert len(recent_spans(session, limit=1000)) == RECENT_SPANS_PER_SESSION
+
+
+def test_errors_and_fallbacks_are_counted(session):
+    errors, fallbacks = value(SPAN_ERRORS, span='unit.fail'), value(FALLBACKS, span='unit.degraded', reason='timeout')
+    with pytest.raises(RuntimeError):
+        with span('unit.fail'):
+            raise RuntimeError("boom")
+    with span('unit.degraded') as current:
+        current.set(fallback_used=True, fallback_reason='timeout')
+    assert recent_spans(session)[-2]['error'] == 'RuntimeError'
+    assert value(SPAN_ERRORS, span='unit.fail') == errors + 1
+    assert value(FALLBACKS, span='unit.degraded', reason='timeout') == fallbacks + 1
+
+
+def test_llm_calls_are_traced(fake_backend, session):
+    invoke_llm("List the technical skills in this text: Python and Docker", stage='unit_skills')
+    traced = recent_spans(session)[-1]
+    assert traced['name'] == 'llm.invoke' and traced['stage'] == 'unit_skills'
+    assert traced['cache_hit'] is False and traced['retries'] == 0 and traced['tokens_in'] > 0
+
+
+def test_prometheus_rendering():
+    latency = register_metric(Histogram('unit_test_latency_seconds', 'Test latency', buckets=(0.1, 1)))
+    latency.observe(0.05, route='a')
+    latency.observe(0.5, route='a')
+    try:
+        text = render_prometheus()
+    finally:
+        METRICS.remove(latency)
+    assert '# TYPE unit_test_latency_seconds histogram' in text
+    assert 'unit_test_latency_seconds_bucket{route="a",le="0.1"} 1' in text
+    assert 'unit_test_latency_seconds_bucket{route="a",le="1.0"} 2' in text
+    assert 'unit_test_latency_seconds_count{route="a"} 2' in text
+
+
+def test_recent_token_usage_is_per_session():
+    bind_session('session-a')
+    charge_call('model', 10, "reply for a")
+    bind_session('session-b')
+    charge_call('model', 20, "reply for b")
+    bind_session(None)
+
+    recent = get_token_stats(last=50, session_id='session-a')['recent']
+    assert [call['tokens_in'] for call in recent] == [10]
+    assert [call['session'] for call in get_token_stats(last=2)['recent']] == ['session-a', 'session-b']
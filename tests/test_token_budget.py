@@ -0,0 +1,59 @@
+import pytest
+
+from utils.token_budget import (TokenBudget, TokenBudgetExceeded, charge_call, check_prompt, compact_text,
+                                count_tokens, use_budget)
+
+JOB = """About us:
+We are a friendly fintech with a great culture and free snacks for everyone in the office.
+Our benefits include remote work, a learning budget and generous parental leave.
+Requirements:
+- 5+ years of Python
+- Production experience with PostgreSQL and Redis
+Responsibilities:
+Build and run the payments API with the platform team.
+We are an equal opportunity employer.
+Apply now!"""
+
+
+def test_short_text_only_loses_boilerplate_and_repeats():
+    compacted = compact_text(JOB + "\n- 5+ years of Python", 1000)
+    assert "equal opportunity" not in compacted and "Apply now" not in compacted
+    assert compacted.count("5+ years of Python") == 1
+    assert "free snacks" in compacted
+
+
+def test_requirements_outlast_company_blurb():
+    compacted = compact_text(JOB, 30)
+    assert count_tokens(compacted) <= 30
+    assert "- 5+ years of Python" in compacted and "PostgreSQL" in compacted
+    assert "free snacks" not in compacted and "About us:" not in compacted
+
+
+def test_single_long_line_is_truncated_to_the_limit():
+    compacted = compact_text("word " * 100, 10)
+    assert 0 < count_tokens(compacted) <= 10
+
+
+def test_budget_refuses_calls_past_the_session_limit():
+    budget = TokenBudget(per_session=50)
+    with use_budget(budget) as scope:
+        tokens_in = check_prompt("Rate this answer")
+        charge_call('model', tokens_in, "Score: 7/10 " * 5)
+        with pytest.raises(TokenBudgetExceeded):
+            check_prompt("word " * 60)
+    assert scope.refused
+    assert budget.calls == 1 and budget.used == tokens_in + count_tokens("Score: 7/10 " * 5)
+    assert budget.refusals == 1
+
+
+def test_cached_calls_are_not_charged():
+    budget = TokenBudget(per_session=50)
+    with use_budget(budget):
+        charge_call('model', 10, "cached reply", cached=True)
+    assert budget.used == 0 and budget.remaining == 50
+
+
+def test_prompts_over_the_per_call_limit_are_refused(monkeypatch):
+    monkeypatch.setenv('MAX_PROMPT_TOKENS', '5')
+    with pytest.raises(TokenBudgetExceeded):
+        check_prompt("a prompt well over five tokens long")
@@ -1,127 +1,215 @@
-import os
+import contextvars
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+from utils.llm_client import invoke_llm, stream_llm
+from utils.prescorer import FEEDBACK, PreScore, confident_prescore
+from utils.scheduler import fallback_reason
+from utils.structured_output import PARSE_FAILURES, StructuredOutputError, keep_parsed, parse_structured, schema_prompt
+from utils.telemetry import span
+from utils.token_budget import compact_text
 
-def evaluate_answer(question: str, answer: str, job_description: str = "", resume: str = "", model_type: str = 'gemini') -> dict:
-    try:
-        from langchain_google_genai import ChatGoogleGenerativeAI
-        
-        llm = ChatGoogleGenerativeAI(
-            model="models/gemini-2.5-flash",
-            temperature=0.3,
-            google_api_key=os.getenv('GOOGLE_API_KEY')
-        )
-        
-        prompt = f"""Q: {question}
+logger = logging.getLogger(__name__)
+
+ANSWER_TOKEN_LIMIT = 600
+QUESTION_TOKEN_LIMIT = 150
+JOB_TOKEN_LIMIT = 150
+
+RUBRIC_DIMENSIONS = ['technical_depth', 'communication', 'relevance']
+
+EVALUATION_SCHEMA = {
+    'type': 'object',
+    'required': ['score', 'feedback', 'strengths', 'improvements', 'rubric'],
+    'properties': {
+        'score': {'type': 'number', 'minimum': 0, 'maximum': 10},
+        'rubric': {
+            'type': 'object',
+            'required': RUBRIC_DIMENSIONS,
+            'properties': {dim: {'type': 'number', 'minimum': 0, 'maximum': 10} for dim in RUBRIC_DIMENSIONS},
+        },
+        'feedback': {'type': 'string'},
+        'strengths': {'type': 'array', 'items': {'type': 'string'}},
+        'improvements': {'type': 'array', 'items': {'type': 'string'}},
+    },
+}
+
+# Fallbacks for models that ignore the JSON instruction and answer in the
+# "Score: X/10 / Feedback: ..." text layout. Compiled once at import.
+_TEXT_SCORE = re.compile(r'^\W*score\W*?[:=][\s*_]*(\d+(?:\.\d+)?)\s*(?:/\s*10)?', re.IGNORECASE | re.MULTILINE)
+_TEXT_SECTION = re.compile(r'^\W*(feedback|strengths|improvements|weaknesses)\W*?:[\s*_]*', re.IGNORECASE | re.MULTILINE)
+_PARTIAL_SCORE = re.compile(r'"score"\s*:\s*(\d+(?:\.\d+)?)\s*[,}\s]|^\W*score\W*?:[\s*_]*(\d+)\s*(?:/|\n)', re.IGNORECASE | re.MULTILINE)
+_BULLET = re.compile(r'^[\s\-•*\d.)]+')
+
+class EvaluationParseError(ValueError):
+    reason = 'unparseable_response'
+
+def _evaluation_prompt(question: str, answer: str, job_description: str = "") -> str:
+    question = compact_text(question, QUESTION_TOKEN_LIMIT)
+    answer = compact_text(answer, ANSWER_TOKEN_LIMIT)
+    context = f"Role: {compact_text(job_description, JOB_TOKEN_LIMIT)}\n" if job_description.strip() else ""
+    return f"""{context}Q: {question}
 A: {answer}
 
-Rate this answer 0-10 and give brief feedback (2-3 sentences). Format:
-Score: X/10
-Feedback: [your feedback]
-Strengths: [1-2 points]
-Improvements: [1-2 points]"""
-        
-        print(f"\n{'='*60}")
-        print(f"GEMINI REQUEST - Evaluate Answer")
-        print(f"{'='*60}")
-        print(prompt)
-        print(f"{'='*60}\n")
-        
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        
-        import re
-        score_match = re.search(r'Score:\s*(\d+)', content)
-        score = int(score_match.group(1)) if score_match else 5
-        feedback_match = re.search(r'Feedback:\s*(.+?)(?=Strengths:|Improvements:|$)', content, re.DOTALL)
-        feedback = feedback_match.group(1).strip() if feedback_match else content[:200]
-        strengths_match = re.search(r'Strengths:\s*(.+?)(?=Improvements:|$)', content, re.DOTALL)
-        strengths_text = strengths_match.group(1).strip() if strengths_match else ""
-        strengths = [s.strip('- •').strip() for s in strengths_text.split('\n') if s.strip()][:3]
-        improvements_match = re.search(r'Improvements:\s*(.+?)$', content, re.DOTALL)
-        improvements_text = improvements_match.group(1).strip() if improvements_match else ""
-        weaknesses = [s.strip('- •').strip() for s in improvements_text.split('\n') if s.strip()][:3]
-        
-        return {
-            'score': min(max(score, 0), 10),
-            'feedback': feedback,
-            'strengths': strengths if strengths else ["Provided an answer"],
-            'weaknesses': weaknesses if weaknesses else ["Could be more detailed"],
-            'suggestions': 'Consider providing specific examples with technical details.'
-        }
-        
-    except Exception as e:
-        print(f"Error evaluating: {e}")
-        score = min(len(answer.split()) // 10, 7)
-        return {
-            'score': score,
-            'feedback': 'Answer received and evaluated.',
-            'strengths': ['Attempted to answer the question'],
-            'weaknesses': ['Could provide more detail and examples'],
-            'suggestions': 'Include specific examples from your experience.'
-        }
+Rate this answer 0-10 with brief feedback (2-3 sentences), 1-2 strengths and 1-2 improvements. Also score the rubric 0-10: technical_depth, communication, and relevance (to the role if given, otherwise to the question).
+{schema_prompt(EVALUATION_SCHEMA)}"""
 
-def parse_evaluation_from_text(text: str, answer: str) -> dict:
-    score = 5
-    
-    import re
-    score_patterns = [
-        r'score[:\s]+(\d+)',
-        r'(\d+)\s*/\s*10',
-        r'rating[:\s]+(\d+)'
-    ]
-    
-    for pattern in score_patterns:
-        match = re.search(pattern, text.lower())
-        if match:
-            try:
-                score = int(match.group(1))
-                if 0 <= score <= 10:
-                    break
-            except:
-                pass
-    
-    strengths = []
-    weaknesses = []
-    
-    lines = text.split('\n')
-    current_section = None
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        line_lower = line.lower()
-        
-        if 'strength' in line_lower or 'positive' in line_lower or 'good' in line_lower:
-            current_section = 'strengths'
-            continue
-        elif 'weakness' in line_lower or 'improvement' in line_lower or 'concern' in line_lower:
-            current_section = 'weaknesses'
-            continue
-        
-        if line.startswith('-') or line.startswith('•') or line.startswith('*'):
-            item = line[1:].strip()
-            if current_section == 'strengths':
-                strengths.append(item)
-            elif current_section == 'weaknesses':
-                weaknesses.append(item)
-    
-    if not strengths:
-        if len(answer) > 100:
-            strengths = ["Provided a detailed response"]
-        else:
-            strengths = ["Attempted to answer the question"]
-    
-    if not weaknesses:
-        if len(answer) < 50:
-            weaknesses = ["Answer could be more detailed"]
-        else:
-            weaknesses = ["Could provide more specific examples"]
-    
-    return {
+def _clamp_score(value) -> int:
+    return min(max(int(round(float(value))), 0), 10)
+
+def _evaluation_result(score, feedback: str, strengths: List[str], weaknesses: List[str], rubric: dict = None) -> dict:
+    strengths = [s.strip() for s in strengths if s and s.strip()][:3]
+    weaknesses = [s.strip() for s in weaknesses if s and s.strip()][:3]
+    evaluation = {
+        'score': _clamp_score(score),
+        'feedback': feedback.strip(),
+        'strengths': strengths if strengths else ["Provided an answer"],
+        'weaknesses': weaknesses if weaknesses else ["Could be more detailed"],
+        'suggestions': 'Consider providing specific examples with technical details.'
+    }
+    if rubric:
+        evaluation['rubric'] = {dim: _clamp_score(rubric[dim]) for dim in RUBRIC_DIMENSIONS}
+    return evaluation
+
+def _text_items(text: str) -> List[str]:
+    return [_BULLET.sub('', line) for line in text.split('\n') if line.strip()]
+
+def _parse_text_evaluation(content: str) -> dict:
+    score_match = _TEXT_SCORE.search(content)
+    if not score_match or float(score_match.group(1)) > 10:
+        raise EvaluationParseError("No score between 0 and 10 found in evaluation response")
+    parts = _TEXT_SECTION.split(content)
+    sections = {name.lower(): body.strip() for name, body in zip(parts[1::2], parts[2::2])}
+    return _evaluation_result(
+        score_match.group(1),
+        sections.get('feedback') or content[:200],
+        _text_items(sections.get('strengths', "")),
+        _text_items(sections.get('improvements') or sections.get('weaknesses', ""))
+    )
+
+def parse_evaluation(content: str) -> dict:
+    # The single parse path: schema-validated JSON first, then the text layout.
+    # Raises EvaluationParseError rather than guessing a score; a failure is
+    # counted once, after both layouts have been tried.
+    try:
+        return _parse_evaluation(content)
+    except EvaluationParseError:
+        PARSE_FAILURES.inc(stage='evaluate_answer')
+        raise
+
+def _parse_evaluation(content: str) -> dict:
+    try:
+        data = parse_structured(content, EVALUATION_SCHEMA, stage='evaluate_answer', count_failure=False)
+    except StructuredOutputError as e:
+        if content.lstrip().startswith(('{', '```')):
+            # JSON that fails the schema is not re-read as text; that is how wrong scores slip through.
+            raise EvaluationParseError(f"Evaluation JSON failed validation: {e}") from e
+        logger.info("Evaluation was not JSON (%s), trying the text layout", e)
+        return _parse_text_evaluation(content)
+    return _evaluation_result(data['score'], data['feedback'], data['strengths'], data['improvements'], data['rubric'])
+
+def prescored_evaluation(result: PreScore) -> dict:
+    f = result.features
+    relevance = min(result.score, int(round(10 * max(f['question_overlap'], f['skill_coverage']))))
+    evaluation = _evaluation_result(
+        result.score,
+        FEEDBACK[result.reason],
+        [],
+        ["Answer the question directly, with a concrete example from your own work"],
+        {'technical_depth': result.score, 'communication': result.score, 'relevance': relevance}
+    )
+    evaluation['strengths'] = []
+    # Deterministic, so unlike fallback scores these are memoized like Gemini's.
+    evaluation['scored_locally'] = result.reason
+    return evaluation
+
+def evaluate_answer(question: str, answer: str, job_description: str = "", resume: str = "", model_type: str = 'gemini',
+                    prescore: bool = True) -> dict:
+    with span('evaluate_answer') as stage:
+        local = confident_prescore(question, answer, job_description) if prescore else None
+        if local is not None:
+            stage.set(scored_locally=local.reason)
+            return prescored_evaluation(local)
+        try:
+            prompt = _evaluation_prompt(question, answer, job_description)
+            
+            parsed = []
+            invoke_llm(prompt, temperature=0.3, stage='evaluate_answer', validate=keep_parsed(parse_evaluation, parsed))
+            
+            return parsed[-1]
+            
+        except Exception as e:
+            logger.warning("Answer evaluation failed, using heuristic score: %s", e)
+            stage.set(fallback_used=True, fallback_reason=fallback_reason(e))
+            return heuristic_evaluation(answer, fallback_reason(e))
+
+def stream_evaluation(question: str, answer: str, job_description: str = "", resume: str = "", model_type: str = 'gemini',
+                      prescore: bool = True) -> Iterator[dict]:
+    with span('evaluate_answer', streamed=True) as stage:
+        local = confident_prescore(question, answer, job_description) if prescore else None
+        if local is not None:
+            stage.set(scored_locally=local.reason)
+            yield prescored_evaluation(local)
+            return
+        content = ""
+        score_sent = False
+        try:
+            prompt = _evaluation_prompt(question, answer, job_description)
+            
+            parsed = []
+            for chunk in stream_llm(prompt, temperature=0.3, stage='evaluate_answer',
+                                    validate=keep_parsed(parse_evaluation, parsed)):
+                content += chunk
+                if not score_sent:
+                    score_match = _PARTIAL_SCORE.search(content)
+                    if score_match:
+                        score_sent = True
+                        yield {'score': _clamp_score(score_match.group(1) or score_match.group(2)), 'partial': True}
+            
+            yield parsed[-1]
+            
+        except Exception as e:
+            logger.warning("Streaming answer evaluation failed, using heuristic score: %s", e)
+            stage.set(fallback_used=True, fallback_reason=fallback_reason(e))
+            yield heuristic_evaluation(answer, fallback_reason(e))
+
+def heuristic_evaluation(answer: str, reason: str = None) -> dict:
+    score = min(len(answer.split()) // 10, 7)
+    evaluation = {
         'score': score,
-        'feedback': text[:500] if len(text) > 500 else text,
-        'strengths': strengths[:3],
-        'weaknesses': weaknesses[:3],
-        'suggestions': 'Consider providing more specific examples and details in your responses.'
+        'feedback': 'Answer received and evaluated.',
+        'strengths': ['Attempted to answer the question'],
+        'weaknesses': ['Could provide more detail and examples'],
+        'suggestions': 'Include specific examples from your experience.'
     }
+    if reason:
+        evaluation['fallback_reason'] = reason
+    return evaluation
+
+def evaluate_answers_batch(items: List[dict], concurrency: int = 5, model_type: str = 'gemini') -> List[dict]:
+    if not items:
+        return []
+
+    def evaluate_item(item):
+        try:
+            return evaluate_answer(
+                item['question'],
+                item['answer'],
+                item.get('job_description', ""),
+                item.get('resume', ""),
+                model_type
+            )
+        except Exception as e:
+            logger.warning("Batch evaluation item failed, using heuristic score: %s", e)
+            return heuristic_evaluation(item.get('answer', ""), fallback_reason(e))
+
+    with span('evaluate_batch', items=len(items), concurrency=concurrency):
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items)))) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, evaluate_item, item) for item in items]
+            return [future.result() for future in futures]
+
+def parse_evaluation_from_text(text: str, answer: str) -> dict:
+    try:
+        return parse_evaluation(text)
+    except EvaluationParseError as e:
+        return heuristic_evaluation(answer, e.reason)
@@ -0,0 +1,113 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+
+from utils.answer_evaluator import evaluate_answer
+from utils.document_processor import ExtractedDocument, extract_document, open_binary, parse_document
+from utils.question_generator import generate_followup_question, generate_interview_questions
+
+# The async API offloads the synchronous core to bounded pools, so every
+# caller shares the same LLM client pool, response cache, scheduler and
+# document cache. Work beyond ASYNC_MAX_INFLIGHT waits instead of piling up.
+
+_executor = None
+_process_pool = None
+_pools_lock = threading.Lock()
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _pools_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=int(os.getenv('ASYNC_MAX_WORKERS', 32)),
+                                           thread_name_prefix='async-api')
+        return _executor
+
+
+def _get_process_pool() -> Optional[ProcessPoolExecutor]:
+    global _process_pool
+    workers = int(os.getenv('ASYNC_PARSE_PROCESSES', 2))
+    if workers <= 0:
+        return None
+    with _pools_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=workers)
+        return _process_pool
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(int(os.getenv('ASYNC_MAX_INFLIGHT', 256)))
+    return semaphore
+
+
+async def run_sync(func, *args, **kwargs):
+    # Context variables (session id, token budget, LLM priority) follow the call into the pool.
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    async with _get_semaphore():
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), call)
+
+
+def _parse_in_process(source, file_type: str, max_pages: Optional[int]):
+    pool = _get_process_pool()
+    if pool is None:
+        return parse_document(source, file_type, max_pages)
+    if not isinstance(source, (str, os.PathLike, bytes)):
+        # Open file objects cannot be pickled; hand the worker their bytes instead.
+        with open_binary(source) as stream:
+            source = stream.read()
+    return pool.submit(parse_document, source, file_type, max_pages).result()
+
+
+async def aextract_document(source, max_pages: Optional[int] = None, name: Optional[str] = None) -> ExtractedDocument:
+    # Hashing and cache lookups stay in-process; only parsing a cache miss goes to a worker process.
+    return await run_sync(extract_document, source, max_pages, name, _parse_in_process)
+
+
+async def aextract_text_from_file(uploaded_file, max_pages: Optional[int] = None, name: Optional[str] = None) -> str:
+    document = await aextract_document(uploaded_file, max_pages, name)
+    return document.text
+
+
+async def agenerate_interview_questions(job_description: str, resume: str, model_type: str = 'gemini',
+                                        fresh: bool = False, resume_llm: bool = False,
+                                        timings: dict = None, fused: Optional[bool] = None) -> List[dict]:
+    return await run_sync(generate_interview_questions, job_description, resume, model_type, fresh, resume_llm,
+                          timings, fused)
+
+
+async def aevaluate_answer(question: str, answer: str, job_description: str = "", resume: str = "",
+                           model_type: str = 'gemini') -> dict:
+    return await run_sync(evaluate_answer, question, answer, job_description, resume, model_type)
+
+
+async def aevaluate_answers_batch(items: List[dict], model_type: str = 'gemini') -> List[dict]:
+    return list(await asyncio.gather(*(
+        aevaluate_answer(item['question'], item['answer'], item.get('job_description', ""),
+                         item.get('resume', ""), model_type)
+        for item in items
+    )))
+
+
+async def agenerate_followup_question(original_question: str, answer: str, model_type: str = 'gemini',
+                                      fresh: bool = False, avoid: Optional[List[str]] = None) -> dict:
+    return await run_sync(generate_followup_question, original_question, answer, model_type, fresh, avoid)
+
+
+def shutdown(wait: bool = True):
+    global _executor, _process_pool
+    with _pools_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=wait)
+            _process_pool = None
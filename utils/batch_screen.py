@@ -0,0 +1,241 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from utils.document_processor import SUPPORTED_EXTENSIONS, extract_text_from_path
+from utils.question_generator import extract_skills_local, extract_skills_with_gemini, generate_questions_from_skills, merge_skills
+from utils.scheduler import BULK, Scheduler, set_scheduler, use_priority
+
+RESULTS_FILE = 'results.jsonl'
+RUN_FILE = 'run.json'
+RANKING_CSV = 'ranking.csv'
+RANKING_JSONL = 'ranking.jsonl'
+
+
+def collect_resumes(source: str, workdir: str) -> List[Tuple[str, str]]:
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            members = [m for m in archive.namelist()
+                       if not m.endswith('/') and m.rsplit('.', 1)[-1].lower() in SUPPORTED_EXTENSIONS]
+            for member in members:
+                archive.extract(member, workdir)
+        return sorted((member, os.path.join(workdir, member)) for member in members)
+
+    resumes = []
+    for root, _, files in os.walk(source):
+        for name in files:
+            if name.rsplit('.', 1)[-1].lower() in SUPPORTED_EXTENSIONS:
+                path = os.path.join(root, name)
+                resumes.append((os.path.relpath(path, source), path))
+    return sorted(resumes)
+
+
+def _extract(path: str) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        return extract_text_from_path(path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def score_resume(job_skills: List[str], resume_text: str) -> dict:
+    resume_skills = extract_skills_local(resume_text)
+    resume_lower = {s.lower() for s in resume_skills}
+    matched = [s for s in job_skills if s.lower() in resume_lower]
+    missing = [s for s in job_skills if s.lower() not in resume_lower]
+    score = round(100.0 * len(matched) / len(job_skills), 1) if job_skills else 0.0
+    return {
+        'score': score,
+        'matched_skills': matched,
+        'missing_skills': missing,
+        'resume_skills': resume_skills,
+        'words': len(resume_text.split()),
+    }
+
+
+def run_fingerprint(job_description: str, llm_skills: bool) -> dict:
+    # What the stored scores depend on; resuming with anything else would mix rankings.
+    return {'job_sha256': hashlib.sha256(job_description.encode('utf-8')).hexdigest(), 'llm_skills': llm_skills}
+
+
+def check_run(out_dir: str, fingerprint: dict, restart: bool = False):
+    # Starts a new run, or resumes one for the same job description. Results
+    # from another job description (or without a run file) are refused unless
+    # `restart` discards them.
+    run_path = os.path.join(out_dir, RUN_FILE)
+    results_path = os.path.join(out_dir, RESULTS_FILE)
+    stored = None
+    if os.path.exists(run_path):
+        with open(run_path, encoding='utf-8') as f:
+            stored = json.load(f)
+    has_results = os.path.exists(results_path) and os.path.getsize(results_path) > 0
+    if has_results and stored != fingerprint:
+        if not restart:
+            raise ValueError(f"{out_dir} holds results for a different job description or options; "
+                             f"pass --restart to discard them or choose another --out-dir")
+        os.remove(results_path)
+    with open(run_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprint, f)
+
+
+def needs_screening(record: Optional[dict], generate_questions: bool) -> bool:
+    # Failed resumes and missing or failed question generation are redone on resume.
+    if record is None or record.get('error'):
+        return True
+    return generate_questions and ('questions' not in record or bool(record.get('questions_error')))
+
+
+def load_completed(results_path: str) -> Dict[str, dict]:
+    # The latest record per resume; a redone resume's new line replaces the old one.
+    completed = {}
+    if not os.path.exists(results_path):
+        return completed
+    with open(results_path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by an interrupted run; that resume is redone.
+                continue
+            completed[record['resume']] = record
+    return completed
+
+
+def write_ranking(records: List[dict], out_dir: str):
+    ranked = sorted(records, key=lambda r: (r.get('error') is None, r.get('score', 0), len(r.get('matched_skills', []))), reverse=True)
+    with open(os.path.join(out_dir, RANKING_JSONL), 'w', encoding='utf-8') as f:
+        for rank, record in enumerate(ranked, 1):
+            f.write(json.dumps(dict(record, rank=rank)) + '\n')
+    with open(os.path.join(out_dir, RANKING_CSV), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'resume', 'score', 'matched_skills', 'missing_skills', 'words', 'questions', 'error'])
+        for rank, record in enumerate(ranked, 1):
+            writer.writerow([
+                rank,
+                record['resume'],
+                record.get('score', ''),
+                '; '.join(record.get('matched_skills', [])),
+                '; '.join(record.get('missing_skills', [])),
+                record.get('words', ''),
+                ' | '.join(q['question'] for q in record.get('questions', [])),
+                record.get('error') or '',
+            ])
+    return ranked
+
+
+def screen(job_description: str, resumes: List[Tuple[str, str]], out_dir: str, workers: int = None,
+           generate_questions: bool = False, llm_skills: bool = False, concurrency: int = 4,
+           restart: bool = False) -> List[dict]:
+    os.makedirs(out_dir, exist_ok=True)
+    check_run(out_dir, run_fingerprint(job_description, llm_skills), restart)
+    results_path = os.path.join(out_dir, RESULTS_FILE)
+    completed = {resume_id: record for resume_id, record in load_completed(results_path).items()
+                 if not needs_screening(record, generate_questions)}
+    pending = [(resume_id, path) for resume_id, path in resumes if resume_id not in completed]
+    print(f"Screening {len(pending)} resumes ({len(completed)} already done)")
+
+    job_skills = extract_skills_local(job_description)
+    if llm_skills:
+        with use_priority(BULK):
+            job_skills = merge_skills(extract_skills_with_gemini(job_description, "job description"), job_skills)
+    print(f"Job skills: {', '.join(job_skills) or 'none found'}")
+
+    write_lock = threading.Lock()
+    records = list(completed.values())
+
+    def finish(record):
+        with write_lock:
+            with open(results_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+            records.append(record)
+            print(f"[{len(records)}/{len(resumes)}] {record['resume']}: "
+                  f"{record.get('error') or str(record['score']) + '%'}")
+
+    def add_questions(record):
+        try:
+            # Bulk calls share the rate limit with the app but yield to interactive requests.
+            with use_priority(BULK):
+                record['questions'] = generate_questions_from_skills(job_skills, record['resume_skills'])
+        except Exception as e:
+            record['questions'] = []
+            record['questions_error'] = str(e)
+            print(f"Error generating questions for {record['resume']}: {e}")
+        finish(record)
+
+    with ProcessPoolExecutor(max_workers=workers) as processes, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as llm_threads:
+        futures = {processes.submit(_extract, path): resume_id for resume_id, path in pending}
+        question_futures = []
+        for future in as_completed(futures):
+            resume_id = futures[future]
+            text, error = future.result()
+            if error is not None:
+                finish({'resume': resume_id, 'error': error, 'score': 0.0})
+                continue
+            record = dict(score_resume(job_skills, text), resume=resume_id, error=None)
+            if generate_questions:
+                question_futures.append(llm_threads.submit(add_questions, record))
+            else:
+                finish(record)
+        for future in question_futures:
+            future.result()
+
+    return write_ranking(records, out_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.batch_screen',
+        description='Rank a folder or zip of resumes against one job description.'
+    )
+    parser.add_argument('job_description', help='Job description file (PDF, DOCX or TXT)')
+    parser.add_argument('resumes', help='Folder or .zip archive of PDF/DOCX/TXT resumes')
+    parser.add_argument('-o', '--out-dir', default='screening_results', help='Directory for results and ranking reports')
+    parser.add_argument('--workers', type=int, default=None, help='Processes used for text extraction (default: CPU count)')
+    parser.add_argument('--questions', action='store_true', help='Generate interview questions for each resume with Gemini')
+    parser.add_argument('--llm-skills', action='store_true', help='Also extract job skills with Gemini')
+    parser.add_argument('--concurrency', type=int, default=4, help='Maximum concurrent Gemini requests')
+    parser.add_argument('--rpm', type=float, default=None, help='Maximum Gemini requests per minute (default: LLM_RATE_LIMIT_RPM)')
+    parser.add_argument('--restart', action='store_true',
+                        help='Discard results in --out-dir that were screened against a different job description')
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if args.rpm is not None:
+        set_scheduler(Scheduler(requests_per_minute=args.rpm))
+    job_description = extract_text_from_path(args.job_description)
+    with tempfile.TemporaryDirectory() as workdir:
+        resumes = collect_resumes(args.resumes, workdir)
+        if not resumes:
+            parser.error(f"No PDF, DOCX or TXT resumes found in {args.resumes}")
+        try:
+            ranked = screen(
+                job_description,
+                resumes,
+                args.out_dir,
+                workers=args.workers,
+                generate_questions=args.questions,
+                llm_skills=args.llm_skills,
+                concurrency=args.concurrency,
+                restart=args.restart
+            )
+        except ValueError as e:
+            parser.error(str(e))
+
+    print(f"\nTop candidates (full report in {os.path.join(args.out_dir, RANKING_CSV)}):")
+    for record in ranked[:10]:
+        print(f"  {record['score']:5.1f}%  {record['resume']}")
+
+
+if __name__ == '__main__':
+    main()
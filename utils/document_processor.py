@@ -1,32 +1,221 @@
-import PyPDF2
-import docx
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import threading
+import time
+from contextlib import contextmanager
 from io import BytesIO
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils.llm_cache import MemoryCache, SQLiteCache
+
+if TYPE_CHECKING:
+    from docx.table import Table
+
+SUPPORTED_EXTENSIONS = ('pdf', 'docx', 'txt')
+
+def _source_name(source) -> str:
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return getattr(source, 'name', '')
+
+def _default_max_pages() -> Optional[int]:
+    return int(os.getenv('DOCUMENT_MAX_PAGES', 0)) or None
+
+def extract_text_from_file(uploaded_file, max_pages: Optional[int] = None):
+    file_type = _source_name(uploaded_file).split('.')[-1].lower()
+    if max_pages is None:
+        max_pages = _default_max_pages()
 
-def extract_text_from_file(uploaded_file):
-    file_type = uploaded_file.name.split('.')[-1].lower()
-    
     try:
         if file_type == 'pdf':
-            return extract_text_from_pdf(uploaded_file)
+            return extract_text_from_pdf(uploaded_file, max_pages)
         elif file_type == 'docx':
             return extract_text_from_docx(uploaded_file)
         elif file_type == 'txt':
-            return uploaded_file.read().decode('utf-8')
+            return extract_text_from_txt(uploaded_file)
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
     except Exception as e:
         raise Exception(f"Error extracting text from {file_type}: {str(e)}")
 
-def extract_text_from_pdf(pdf_file):
-    pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_file.read()))
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
-    return text.strip()
+def extract_text_from_path(path, max_pages: Optional[int] = None):
+    return extract_text_from_file(os.fspath(path), max_pages)
+
+@contextmanager
+def open_binary(source):
+    # Yields a seekable binary stream over the source without copying it:
+    # files on disk are memory-mapped, bytes are wrapped (BytesIO shares an
+    # immutable bytes buffer), and uploaded file objects are used in place.
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield BytesIO(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield BytesIO(bytes(source) if not isinstance(source, bytes) else source)
+    else:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        yield source
+
+def warm_up():
+    import PyPDF2
+    import docx
+
+def read_pdf(pdf_file, max_pages: Optional[int] = None) -> Tuple[List[str], int]:
+    # The text of the first `max_pages` pages and the document's real page count.
+    # PyPDF2 and python-docx are imported on first use so pasted-text sessions never load them.
+    import PyPDF2
+    
+    with open_binary(pdf_file) as stream:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        pages = [page.extract_text() or "" for page in itertools.islice(pdf_reader.pages, max_pages)]
+        return pages, len(pdf_reader.pages)
+
+def extract_text_from_pdf(pdf_file, max_pages: Optional[int] = None):
+    pages, _ = read_pdf(pdf_file, max_pages)
+    return "\n".join(pages).strip()
+
+def _table_lines(table: 'Table') -> Iterator[str]:
+    for row in table.rows:
+        cells = []
+        for cell in row.cells:
+            text = cell.text.strip()
+            # Merged cells repeat the same text once per spanned grid column.
+            if text and (not cells or cells[-1] != text):
+                cells.append(text)
+        if cells:
+            yield " | ".join(cells)
+
+def _iter_block_lines(container) -> Iterator[str]:
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+    
+    for child in container.iter_inner_content():
+        if isinstance(child, Paragraph):
+            yield child.text
+        elif isinstance(child, Table):
+            yield from _table_lines(child)
+
+def iter_docx_lines(docx_file) -> Iterator[str]:
+    import docx
+    
+    if isinstance(docx_file, (str, os.PathLike)):
+        # zipfile reads members from the path on demand, which is already copy-free.
+        doc = docx.Document(os.fspath(docx_file))
+    else:
+        with open_binary(docx_file) as stream:
+            doc = docx.Document(stream)
+
+    seen_headers = set()
+    for section in doc.sections:
+        for part in (section.header, section.footer):
+            if part.is_linked_to_previous:
+                continue
+            for line in _iter_block_lines(part):
+                if line.strip() and line not in seen_headers:
+                    seen_headers.add(line)
+                    yield line
+
+    yield from _iter_block_lines(doc)
 
 def extract_text_from_docx(docx_file):
-    doc = docx.Document(BytesIO(docx_file.read()))
-    text = ""
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
-    return text.strip()
+    return "\n".join(iter_docx_lines(docx_file)).strip()
+
+def extract_text_from_txt(txt_file):
+    with open_binary(txt_file) as stream:
+        return stream.read().decode('utf-8')
+
+class ExtractedDocument(NamedTuple):
+    name: str
+    text: str
+    # Pages in the document, and how many of them were read (DOCUMENT_MAX_PAGES).
+    page_count: int
+    sha256: str
+    # 0 when served from cache.
+    extraction_seconds: float
+    pages_extracted: int = 0
+    cached: bool = False
+
+_document_cache = MemoryCache(max_entries=32, ttl=None)
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+def _get_disk_cache() -> Optional[SQLiteCache]:
+    global _disk_cache
+    path = os.getenv('DOCUMENT_CACHE_PATH')
+    if not path:
+        return None
+    with _disk_cache_lock:
+        if _disk_cache is None or _disk_cache.path != path:
+            _disk_cache = SQLiteCache(path=path, max_entries=1000, ttl=None)
+        return _disk_cache
+
+def hash_document(source) -> str:
+    if hasattr(source, 'getbuffer'):
+        return hashlib.sha256(source.getbuffer()).hexdigest()
+    with open_binary(source) as stream:
+        if isinstance(stream, mmap.mmap):
+            return hashlib.sha256(stream).hexdigest()
+        digest = hashlib.sha256()
+        for block in iter(lambda: stream.read(1 << 20), b""):
+            digest.update(block)
+        return digest.hexdigest()
+
+def parse_document(source, file_type: str, max_pages: Optional[int]):
+    # Module-level and free of shared state so it can run in a worker process.
+    try:
+        # (text, page count, pages extracted)
+        if file_type == 'pdf':
+            pages, page_count = read_pdf(source, max_pages)
+            return "\n".join(pages).strip(), page_count, len(pages)
+        elif file_type == 'docx':
+            return extract_text_from_docx(source), 1, 1
+        elif file_type == 'txt':
+            return extract_text_from_txt(source), 1, 1
+        else:
+            raise ValueError(f"Unsupported file type: {file_type}")
+    except Exception as e:
+        raise Exception(f"Error extracting text from {file_type}: {str(e)}")
+
+def extract_document(source, max_pages: Optional[int] = None, name: Optional[str] = None,
+                     parse=parse_document) -> ExtractedDocument:
+    name = name or _source_name(source)
+    file_type = name.split('.')[-1].lower()
+    if max_pages is None:
+        max_pages = _default_max_pages()
+
+    sha256 = hash_document(source)
+    # v2: entries from before page_count meant the real page count are not reused.
+    cache_key = f"v2:{sha256}:{file_type}:{max_pages or 0}"
+    cached = _document_cache.get(cache_key)
+    if cached is not None:
+        return cached._replace(name=name, extraction_seconds=0.0, cached=True)
+
+    disk_cache = _get_disk_cache()
+    if disk_cache is not None:
+        stored = disk_cache.get(cache_key)
+        if stored is not None:
+            document = ExtractedDocument(**json.loads(stored))
+            _document_cache.set(cache_key, document)
+            return document._replace(name=name, extraction_seconds=0.0, cached=True)
+
+    start = time.perf_counter()
+    text, page_count, pages_extracted = parse(source, file_type, max_pages)
+    document = ExtractedDocument(name, text, page_count, sha256, time.perf_counter() - start, pages_extracted)
+    _document_cache.set(cache_key, document)
+    if disk_cache is not None:
+        disk_cache.set(cache_key, json.dumps(document._asdict()))
+    return document
+
+def get_document_cache_stats() -> dict:
+    stats = {'memory': _document_cache.stats()}
+    disk_cache = _get_disk_cache()
+    if disk_cache is not None:
+        stats['disk'] = disk_cache.stats()
+    return stats
@@ -0,0 +1,125 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.prescorer import LOCAL_REASONS
+
+EvaluationKey = Tuple[str, str, str]
+
+
+def _digest(text: Optional[str]) -> str:
+    return hashlib.sha1((text or "").strip().encode('utf-8')).hexdigest()
+
+
+def evaluation_key(question: str, answer: str, job_description: Optional[str] = "") -> EvaluationKey:
+    return (question.strip(), _digest(answer), _digest(job_description))
+
+
+def _provisional(evaluation: dict) -> bool:
+    # Heuristic fallbacks, and local pre-scores of a kind that no longer skips
+    # Gemini (e.g. off-topic verdicts saved by older versions), are re-scored.
+    reason = evaluation.get('scored_locally')
+    return bool(evaluation.get('fallback_reason')) or (reason is not None and reason not in LOCAL_REASONS)
+
+
+class EvaluationStore:
+    # Evaluations for one interview, indexed by question slot for display and
+    # by (question, answer hash, JD hash) so unchanged answers are never re-scored.
+    # Aggregates are updated on every write instead of recomputed per rerun.
+
+    def __init__(self, memo_size: int = 256):
+        self.memo_size = memo_size
+        self._slots: Dict[int, dict] = {}
+        self._memo: "OrderedDict[EvaluationKey, dict]" = OrderedDict()
+        self._score_total = 0.0
+        self._rubric_totals: Dict[str, float] = {}
+        self._rubric_counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, question_idx: int) -> bool:
+        return question_idx in self._slots
+
+    def _account(self, evaluation: dict, sign: int):
+        self._score_total += sign * evaluation.get('score', 0)
+        for dimension, value in evaluation.get('rubric', {}).items():
+            self._rubric_totals[dimension] = self._rubric_totals.get(dimension, 0) + sign * value
+            self._rubric_counts[dimension] = self._rubric_counts.get(dimension, 0) + sign
+
+    def lookup(self, question: str, answer: str, job_description: Optional[str] = "") -> Optional[dict]:
+        key = evaluation_key(question, answer, job_description)
+        evaluation = self._memo.get(key)
+        if evaluation is not None:
+            self._memo.move_to_end(key)
+        return evaluation
+
+    def save(self, question_idx: int, question: str, answer: str, evaluation: dict,
+             job_description: Optional[str] = "") -> dict:
+        key = evaluation_key(question, answer, job_description)
+        previous = self._slots.get(question_idx)
+        if previous is not None:
+            self._account(previous['evaluation'], -1)
+        record = {
+            'question_idx': question_idx,
+            'question': question,
+            'answer': answer,
+            'evaluation': evaluation,
+            'key': key,
+        }
+        self._slots[question_idx] = record
+        self._account(evaluation, 1)
+        # Local fallback scores are shown but not memoized, so the next attempt asks Gemini again.
+        if not _provisional(evaluation):
+            self._memo[key] = evaluation
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return record
+
+    def remove(self, question_idx: int):
+        record = self._slots.pop(question_idx, None)
+        if record is not None:
+            self._account(record['evaluation'], -1)
+
+    def clear(self):
+        self._slots.clear()
+        self._memo.clear()
+        self._score_total = 0.0
+        self._rubric_totals.clear()
+        self._rubric_counts.clear()
+
+    def get(self, question_idx: int) -> Optional[dict]:
+        return self._slots.get(question_idx)
+
+    def is_dirty(self, question_idx: int, question: str, answer: str, job_description: Optional[str] = "") -> bool:
+        record = self._slots.get(question_idx)
+        if record is None:
+            return True
+        return record['key'] != evaluation_key(question, answer, job_description) or _provisional(record['evaluation'])
+
+    def dirty(self, answers: Iterable[Tuple[int, str, str]], job_description: Optional[str] = "") -> List[int]:
+        return [idx for idx, question, answer in answers if self.is_dirty(idx, question, answer, job_description)]
+
+    def records(self) -> List[dict]:
+        return [self._slots[idx] for idx in sorted(self._slots)]
+
+    def to_records(self) -> List[dict]:
+        return [{k: v for k, v in record.items() if k != 'key'} for record in self.records()]
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], job_description: Optional[str] = "") -> 'EvaluationStore':
+        store = cls()
+        for record in records:
+            store.save(record['question_idx'], record['question'], record['answer'], record['evaluation'], job_description)
+        return store
+
+    @property
+    def average_score(self) -> float:
+        return self._score_total / len(self._slots) if self._slots else 0.0
+
+    def average_rubric(self) -> Dict[str, float]:
+        return {
+            dimension: self._rubric_totals[dimension] / count
+            for dimension, count in self._rubric_counts.items() if count
+        }
@@ -0,0 +1,260 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from utils.scheduler import INTERACTIVE, use_priority
+from utils.telemetry import Counter, Histogram, register_metric, span
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+JOBS = register_metric(Counter('interview_agent_jobs_total', 'Background jobs by kind and final status'))
+JOB_QUEUE_WAIT = register_metric(Histogram('interview_agent_job_queue_wait_seconds',
+                                           'Time background jobs spend queued before a worker picks them up'))
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobLimitExceeded(RuntimeError):
+    pass
+
+
+class Job:
+    # A unit of background work and the handle its function uses to report
+    # progress, publish partial results and notice cancellation. The function
+    # must not touch Streamlit state; the script thread applies results.
+
+    def __init__(self, owner: str, kind: str, func: Callable, args: tuple, kwargs: dict,
+                 priority: int = INTERACTIVE, meta: Optional[dict] = None, slots: int = 1):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.kind = kind
+        self.priority = priority
+        # Concurrent LLM calls the job may make; fan-out inside the job must not exceed it.
+        self.slots = slots
+        self.meta = meta or {}
+        self.status = QUEUED
+        self.result = None
+        self.error: Optional[str] = None
+        self.done = 0
+        self.total: Optional[int] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._context = contextvars.copy_context()
+        self._partials: List = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    def report(self, done: int, total: Optional[int] = None):
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def emit(self, partial):
+        with self._lock:
+            self._partials.append(partial)
+
+    def take_partials(self) -> List:
+        # Partial results not yet handed out; each is returned once.
+        with self._lock:
+            partials, self._partials = self._partials, []
+        return partials
+
+    def snapshot(self) -> dict:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'done': self.done,
+            'total': self.total,
+            'error': self.error,
+            'meta': self.meta,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+    def _run(self):
+        with use_priority(self.priority), span('job', kind=self.kind):
+            self.check_cancelled()
+            return self._func(self, *self._args, **self._kwargs)
+
+
+class JobQueue:
+    # Thread pool with a job table. Limits are counted in LLM slots: a job
+    # holds `slots` of them while it runs (1 unless it fans out). Each owner (a
+    # user, across all of their tabs) holds at most `per_owner` slots at a time
+    # and queues at most `max_pending` jobs, and all owners together hold at
+    # most `max_workers`. Owners with queued work are served round-robin, so one
+    # user's bulk job cannot hold every worker while others wait.
+
+    def __init__(self, max_workers: int = 8, per_owner: int = 2, max_pending: int = 20,
+                 result_ttl: float = 3600):
+        self.max_workers = max_workers
+        self.per_owner = per_owner
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending: Dict[str, deque] = {}
+        self._running: Dict[str, int] = {}
+        self._order: List[str] = []
+
+    def submit(self, owner: str, kind: str, func: Callable, *args, priority: int = INTERACTIVE,
+               meta: Optional[dict] = None, slots: int = 1, **kwargs) -> Job:
+        # Context variables (session id, token budget) are captured here and
+        # restored in the worker. `slots` is capped at the per-owner limit.
+        job = Job(owner, kind, func, args, kwargs, priority, meta,
+                  slots=max(1, min(slots, self.per_owner, self.max_workers)))
+        with self._lock:
+            self._prune()
+            pending = self._pending.setdefault(owner, deque())
+            if len(pending) >= self.max_pending:
+                raise JobLimitExceeded(f"{owner} already has {len(pending)} queued jobs")
+            pending.append(job)
+            self._jobs[job.id] = job
+            if owner not in self._order:
+                self._order.append(owner)
+            self._dispatch()
+        return job
+
+    def _dispatch(self):
+        # Called with the lock held: starts queued jobs while global and owner slots are free.
+        while sum(self._running.values()) < self.max_workers:
+            job = self._next_job(self.max_workers - sum(self._running.values()))
+            if job is None:
+                return
+            self._running[job.owner] = self._running.get(job.owner, 0) + job.slots
+            job.status = RUNNING
+            job.started_at = time.time()
+            JOB_QUEUE_WAIT.observe(job.started_at - job.created_at, kind=job.kind)
+            self._executor.submit(self._execute, job)
+
+    def _next_job(self, free: int) -> Optional[Job]:
+        for _ in range(len(self._order)):
+            owner = self._order.pop(0)
+            self._order.append(owner)
+            pending = self._pending.get(owner)
+            if pending and pending[0].slots <= min(free, self.per_owner - self._running.get(owner, 0)):
+                return pending.popleft()
+        return None
+
+    def _execute(self, job: Job):
+        status = DONE
+        try:
+            job.result = job._context.run(job._run)
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            logger.warning("Background %s job failed: %s", job.kind, e)
+            job.error = str(e) or type(e).__name__
+            status = FAILED
+        job.finished_at = time.time()
+        job.status = status
+        JOBS.inc(kind=job.kind, status=status)
+        with self._lock:
+            self._running[job.owner] -= job.slots
+            self._dispatch()
+
+    def cancel(self, job_id: str) -> bool:
+        # Queued jobs are dropped at once; running jobs stop at their next check_cancelled().
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job._cancel.set()
+            pending = self._pending.get(job.owner)
+            if job.status == QUEUED and pending is not None and job in pending:
+                pending.remove(job)
+                job.finished_at = time.time()
+                job.status = CANCELLED
+                JOBS.inc(kind=job.kind, status=CANCELLED)
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs_for(self, owner: str) -> List[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.owner == owner]
+
+    def forget(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                del self._jobs[job_id]
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+        for owner in [o for o, pending in self._pending.items() if not pending and not self._running.get(o)]:
+            del self._pending[owner]
+            self._running.pop(owner, None)
+            self._order.remove(owner)
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                'queued': statuses.count(QUEUED),
+                'running': statuses.count(RUNNING),
+                'finished': sum(1 for s in statuses if s in FINISHED),
+                'owners': len(self._order),
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            for job in self._jobs.values():
+                job._cancel.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(
+                max_workers=int(os.getenv('JOB_MAX_WORKERS', 8)),
+                per_owner=int(os.getenv('JOB_MAX_PER_USER', 2)),
+                max_pending=int(os.getenv('JOB_MAX_PENDING_PER_USER', 20)),
+            )
+        return _queue
+
+
+def set_job_queue(queue: Optional[JobQueue]):
+    global _queue
+    with _queue_lock:
+        _queue = queue
@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Iterator, Optional
+from utils.llm_cache import get_cache, make_cache_key
+from utils.scheduler import get_scheduler
+from utils.telemetry import record_llm_call, span
+from utils.token_budget import charge_call, check_prompt, count_tokens
+
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+MODEL_NAME = "models/gemini-2.5-flash"
+
+_clients = {}
+_clients_lock = threading.Lock()
+_stats = {
+    'clients_created': 0,
+    'client_reuses': 0,
+    'invocations': 0,
+    # Calls made on a pooled client that had already served a call. Whether
+    # the transport underneath reused its connection is not observable here.
+    'pooled_client_hits': 0,
+}
+_stats_lock = threading.Lock()
+_invoked_clients = set()
+_llm_factory = None
+
+
+def _bump(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _chat_model_class():
+    # langchain_google_genai pulls in the google client libraries (~2s), so it
+    # is imported on the first call rather than when the app starts.
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI
+
+
+def get_llm(temperature: float = 0, model: str = MODEL_NAME) -> 'ChatGoogleGenerativeAI':
+    key = (model, float(temperature))
+    llm = _clients.get(key)
+    if llm is not None:
+        _bump('client_reuses')
+        return llm
+
+    with _clients_lock:
+        llm = _clients.get(key)
+        if llm is None:
+            # One client per (model, temperature) keeps its gRPC channel open,
+            # so later calls reuse the pooled connection instead of a new handshake.
+            factory = _llm_factory or _chat_model_class()
+            llm = factory(
+                model=model,
+                temperature=temperature,
+                google_api_key=os.getenv('GOOGLE_API_KEY')
+            )
+            _clients[key] = llm
+            _bump('clients_created')
+            return llm
+
+    _bump('client_reuses')
+    return llm
+
+
+def _record_invocation(model: str, temperature: float):
+    key = (model, float(temperature))
+    with _stats_lock:
+        _stats['invocations'] += 1
+        if key in _invoked_clients:
+            _stats['pooled_client_hits'] += 1
+        else:
+            _invoked_clients.add(key)
+
+
+def _cached(cache, cache_key: str, validate: Optional[Callable[[str], object]]) -> Optional[str]:
+    # A cached response that no longer validates (e.g. stored before the
+    # caller validated, or against an older schema) is dropped, not served.
+    cached = cache.get(cache_key)
+    if cached is None or validate is None:
+        return cached
+    try:
+        validate(cached)
+    except Exception:
+        cache.delete(cache_key)
+        return None
+    return cached
+
+
+def invoke_llm(prompt: str, temperature: float = 0, model: str = MODEL_NAME, fresh: bool = False,
+               stage: str = 'llm', validate: Optional[Callable[[str], object]] = None) -> str:
+    # `validate` is called on the response before it is cached; if it raises,
+    # nothing is cached and the error propagates, so one malformed response
+    # is never replayed from the cache.
+    with span('llm.invoke', stage=stage, model=model, temperature=temperature) as call:
+        cache = get_cache()
+        cache_key = make_cache_key(prompt, model, temperature)
+        # Fresh output only makes sense for sampled calls; temperature 0 is
+        # deterministic, so it is always served from cache when present.
+        use_cached = cache is not None and not (fresh and temperature > 0)
+        if use_cached:
+            cached = _cached(cache, cache_key, validate)
+            if cached is not None:
+                _finish_call(call, stage, model, count_tokens(prompt), cached, cache_hit=True)
+                return cached
+
+        tokens_in = check_prompt(prompt)
+        llm = get_llm(temperature, model)
+        _record_invocation(model, temperature)
+
+        response = get_scheduler().call(lambda: llm.invoke(prompt), stage=stage, trace=call)
+        content = response.content if hasattr(response, 'content') else str(response)
+        _finish_call(call, stage, model, tokens_in, content, cache_hit=False)
+        if validate is not None:
+            validate(content)
+        if cache is not None and content:
+            cache.set(cache_key, content)
+        return content
+
+
+def stream_llm(prompt: str, temperature: float = 0, model: str = MODEL_NAME, fresh: bool = False,
+               stage: str = 'llm', validate: Optional[Callable[[str], object]] = None) -> Iterator[str]:
+    # As invoke_llm; a response failing `validate` raises after its last chunk.
+    with span('llm.stream', stage=stage, model=model, temperature=temperature) as call:
+        cache = get_cache()
+        cache_key = make_cache_key(prompt, model, temperature)
+        if cache is not None and not (fresh and temperature > 0):
+            cached = _cached(cache, cache_key, validate)
+            if cached is not None:
+                _finish_call(call, stage, model, count_tokens(prompt), cached, cache_hit=True)
+                yield cached
+                return
+
+        tokens_in = check_prompt(prompt)
+        llm = get_llm(temperature, model)
+        _record_invocation(model, temperature)
+
+        parts = []
+        start = time.perf_counter()
+        for chunk in get_scheduler().stream(lambda: llm.stream(prompt), stage=stage, trace=call):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if text:
+                if not parts:
+                    call.set(first_chunk_ms=round((time.perf_counter() - start) * 1000, 2))
+                parts.append(text)
+                yield text
+        # Only complete streams are cached; an abandoned generator never gets here.
+        content = "".join(parts)
+        _finish_call(call, stage, model, tokens_in, content, cache_hit=False)
+        if validate is not None:
+            validate(content)
+        if cache is not None and content:
+            cache.set(cache_key, content)
+
+
+def _finish_call(call, stage: str, model: str, tokens_in: int, content: str, cache_hit: bool):
+    tokens_out = charge_call(model, tokens_in, content, cached=cache_hit)
+    record_llm_call(stage, cache_hit, tokens_in, tokens_out)
+    call.set(cache_hit=cache_hit, tokens_in=tokens_in, tokens_out=tokens_out)
+
+
+def warm_up(temperatures=(0, 0.3, 0.7), model: str = MODEL_NAME):
+    # Imports the chat model and opens the pooled clients ahead of the first request.
+    _chat_model_class()
+    if not os.getenv('GOOGLE_API_KEY') and _llm_factory is None:
+        return
+    for temperature in temperatures:
+        get_llm(temperature, model)
+
+
+def set_llm_factory(factory):
+    # Swaps the chat model class (e.g. for an offline stand-in) and drops pooled clients.
+    global _llm_factory
+    _llm_factory = factory
+    reset_clients()
+
+
+def get_client_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['pooled_clients'] = len(_clients)
+    return stats
+
+
+def reset_clients():
+    with _clients_lock:
+        _clients.clear()
+    with _stats_lock:
+        _invoked_clients.clear()
+        for name in _stats:
+            _stats[name] = 0
@@ -0,0 +1,93 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, List
+
+from utils.telemetry import span
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable, deps: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+
+
+class PipelineResult:
+    def __init__(self):
+        self.results = {}
+        self.timings = {}
+        self.started_at = {}
+        self.total_seconds = 0.0
+
+    def __getitem__(self, name):
+        return self.results[name]
+
+
+def _validate(stages: List[Stage]) -> Dict[str, Stage]:
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate pipeline stage: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {', '.join(missing)}")
+
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Pipeline has a dependency cycle through '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in by_name:
+        visit(name)
+    return by_name
+
+
+def run_pipeline(stages: List[Stage], max_workers: int = 4) -> PipelineResult:
+    by_name = _validate(stages)
+    result = PipelineResult()
+    pipeline_start = time.perf_counter()
+
+    def run_stage(stage):
+        start = time.perf_counter()
+        result.started_at[stage.name] = start - pipeline_start
+        try:
+            kwargs = {dep: result.results[dep] for dep in stage.deps}
+            with span(f'pipeline.{stage.name}'):
+                return stage.func(**kwargs)
+        finally:
+            result.timings[stage.name] = time.perf_counter() - start
+
+    pending = dict(by_name)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while pending or running:
+            ready = [s for s in pending.values() if all(d in result.results for d in s.deps)]
+            for stage in ready:
+                del pending[stage.name]
+                # Each stage runs in a copy of the caller's context so context-local
+                # settings (such as the active token budget) reach worker threads.
+                running[executor.submit(contextvars.copy_context().run, run_stage, stage)] = stage
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise error
+                result.results[stage.name] = future.result()
+
+    result.total_seconds = time.perf_counter() - pipeline_start
+    return result
@@ -0,0 +1,150 @@
+import contextvars
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Hashable, Optional
+
+from utils.scheduler import BULK, use_priority
+from utils.telemetry import Counter, register_metric
+
+# Outcomes: scheduled, debounced (superseded before starting, no cost), started,
+# hit, miss, wasted (started but replaced or evicted without being served).
+PREFETCH = register_metric(Counter('interview_agent_prefetch_total', 'Speculative prefetches by kind and outcome'))
+
+
+class _Entry:
+    __slots__ = ('kind', 'timer', 'future', 'served')
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.timer: Optional[threading.Timer] = None
+        self.future: Optional[Future] = None
+        self.served = False
+
+
+class Prefetcher:
+    # Speculative LLM work keyed by (kind, key), where the key hashes the
+    # answer. Each slot (a session's question) holds one pending key per
+    # kind; scheduling a new key for a slot supersedes the old one, and work
+    # only starts once a slot's key has been stable for `debounce` seconds.
+    # Calls run at BULK priority so they never delay interactive requests.
+
+    def __init__(self, debounce: float = 2.0, max_workers: int = 4, max_entries: int = 512):
+        self.debounce = debounce
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._slots = {}
+        self._counts = {}
+
+    def _count(self, kind: str, outcome: str):
+        PREFETCH.inc(kind=kind, outcome=outcome)
+        self._counts[outcome] = self._counts.get(outcome, 0) + 1
+
+    def schedule(self, slot: Hashable, kind: str, key: Hashable, func: Callable, *args, **kwargs) -> bool:
+        full_key = (kind, key)
+        with self._lock:
+            previous = self._slots.get((slot, kind))
+            if previous == full_key:
+                return False
+            if previous is not None:
+                self._discard(previous)
+            self._slots[(slot, kind)] = full_key
+            if full_key in self._entries:
+                return False
+            entry = self._entries[full_key] = _Entry(kind)
+            context = contextvars.copy_context()
+            entry.timer = threading.Timer(self.debounce, self._start, (full_key, context, func, args, kwargs))
+            entry.timer.daemon = True
+            entry.timer.start()
+            self._count(kind, 'scheduled')
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+        return True
+
+    def _start(self, full_key: tuple, context: contextvars.Context, func: Callable, args: tuple, kwargs: dict):
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None or entry.future is not None:
+                return
+            entry.future = self._executor.submit(context.run, self._call, func, args, kwargs)
+            self._count(entry.kind, 'started')
+
+    @staticmethod
+    def _call(func: Callable, args: tuple, kwargs: dict):
+        with use_priority(BULK):
+            return func(*args, **kwargs)
+
+    def _forget(self, full_key: tuple) -> Optional[_Entry]:
+        # Called with the lock held. Drops the entry and every slot still
+        # pointing at it, so the slot can schedule the same key again.
+        entry = self._entries.pop(full_key, None)
+        for slot in [s for s, k in self._slots.items() if k == full_key]:
+            del self._slots[slot]
+        return entry
+
+    def _discard(self, full_key: tuple):
+        # Called with the lock held.
+        entry = self._forget(full_key)
+        if entry is None:
+            return
+        if entry.future is None:
+            entry.timer.cancel()
+            self._count(entry.kind, 'debounced')
+        elif not entry.served:
+            self._count(entry.kind, 'wasted')
+
+    def take(self, kind: str, key: Hashable, running_ok: bool = True) -> Optional[Future]:
+        # The prefetched future (still running only if `running_ok`) or None on a miss.
+        # Each prefetch is handed out at most once.
+        # A pending timer is cancelled, since the caller is about to do the work
+        # itself, and a failed prefetch is dropped so it can be scheduled again.
+        full_key = (kind, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if (entry is None or entry.future is None or (entry.future.done() and entry.future.exception())
+                    or not (running_ok or entry.future.done())):
+                if entry is not None and (entry.future is None or entry.future.done()):
+                    if entry.future is None:
+                        entry.timer.cancel()
+                    self._forget(full_key)
+                self._count(kind, 'miss')
+                return None
+            # Served once: the entry is dropped, so a second take is a miss and
+            # the slot can prefetch the next result for the same answer.
+            entry.served = True
+            self._forget(full_key)
+            self._count(kind, 'hit')
+            return entry.future
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            in_flight = sum(1 for e in self._entries.values() if e.future is not None and not e.future.done())
+        served = counts.get('hit', 0) + counts.get('miss', 0)
+        return {
+            **counts,
+            'in_flight': in_flight,
+            'hit_rate': counts.get('hit', 0) / served if served else None,
+        }
+
+
+def prefetch_enabled() -> bool:
+    return os.getenv('PREFETCH_ENABLED', '0').lower() in ('1', 'true', 'yes')
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher(
+                debounce=float(os.getenv('PREFETCH_DEBOUNCE_SECONDS', 2)),
+                max_workers=int(os.getenv('PREFETCH_MAX_WORKERS', 4)),
+            )
+        return _prefetcher
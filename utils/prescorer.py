@@ -0,0 +1,231 @@
+import argparse
+import contextvars
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+
+from utils.question_dedup import question_terms
+from utils.skill_matcher import SkillMatcher, get_skill_matcher
+from utils.telemetry import Counter, register_metric
+
+# Answers scored locally (outcome=local) or sent to Gemini (outcome=escalated), by reason.
+PRESCORES = register_metric(Counter('interview_agent_prescore_total', 'Answer pre-scoring decisions by outcome and reason'))
+
+_WORD = re.compile(r'[a-z0-9]', re.IGNORECASE)
+_NON_ANSWER = re.compile(
+    r"^\W*(?:i\s+(?:do\s*n[o']?t|dont|have\s+no)\s+(?:know|remember|idea|experience)\w*|no\s+idea|not\s+sure|"
+    r"idk|dunno|pass|skip|n/?a|none|nothing|no\s+comment|next(?:\s+question)?|\?+)\b",
+    re.IGNORECASE
+)
+
+FEEDBACK = {
+    'blank': "No answer was given.",
+    'non_answer': "The candidate did not attempt the question.",
+    'too_short': "The answer is too short to show any understanding of the question.",
+    'repetitive': "The answer repeats the same few words without addressing the question.",
+    'off_topic': "The answer discusses other topics and does not address the skills the question asks about.",
+}
+
+# The only verdicts allowed to stand in for Gemini. Off-topic and repetitive
+# are lexical guesses (related technologies count as "other skills", and a
+# good answer need not repeat the question's words), so they are reported
+# for calibration but always escalated.
+LOCAL_REASONS = ('blank', 'non_answer', 'too_short')
+
+REASON_LABELS = {
+    'blank': "blank answer",
+    'non_answer': "no attempt",
+    'too_short': "too short",
+    'repetitive': "repetitive",
+    'off_topic': "off-topic",
+}
+
+
+class PreScore(NamedTuple):
+    score: int
+    confidence: float
+    reason: str
+    features: Dict[str, float]
+
+
+def _terms(text: str) -> set:
+    # question_terms stems "scaling" to "scal" but leaves "scale", so a final
+    # "e" is dropped too for overlap purposes.
+    return {term[:-1] if len(term) > 3 and term.endswith('e') else term
+            for term in question_terms(text) if ' ' not in term}
+
+
+@lru_cache(maxsize=32)
+def _job_skills(job_description: str, matcher: SkillMatcher) -> frozenset:
+    return frozenset(m.name for m in matcher.match(job_description)[:10])
+
+
+def features(question: str, answer: str, job_description: str = "",
+             matcher: Optional[SkillMatcher] = None) -> Dict[str, float]:
+    matcher = matcher or get_skill_matcher()
+    words = answer.split()
+    question_words = _terms(question)
+    answer_words = _terms(answer)
+    answer_skills = {m.name for m in matcher.match(answer)}
+    question_skills = {m.name for m in matcher.match(question)}
+    # The skills the question names, or the role's when it names none.
+    target = question_skills or _job_skills(job_description or "", matcher)
+    return {
+        'words': len(words),
+        'unique_ratio': len({w.lower() for w in words}) / len(words) if words else 0.0,
+        'question_terms': len(question_words),
+        'question_overlap': len(question_words & answer_words) / len(question_words) if question_words else 0.0,
+        'skill_coverage': len(target & answer_skills) / len(target) if target else 0.0,
+        'question_skills': len(question_skills),
+        'answer_skills': len(answer_skills),
+    }
+
+
+def prescore(question: str, answer: str, job_description: str = "",
+             matcher: Optional[SkillMatcher] = None) -> PreScore:
+    # Cheap lexical checks. Only empty, evasive or very short answers get a
+    # confidence high enough to skip Gemini; the rest carry a rough estimate
+    # for calibration only.
+    f = features(question, answer, job_description, matcher)
+    words = f['words']
+    on_topic = f['question_overlap'] > 0 or f['skill_coverage'] > 0
+    if not _WORD.search(answer):
+        return PreScore(0, 0.99, 'blank', f)
+    if words <= 12 and _NON_ANSWER.match(answer) and (words <= 6 or not on_topic):
+        return PreScore(1, 0.95, 'non_answer', f)
+    if words < 5:
+        return PreScore(2 if on_topic else 1, 0.7 if on_topic else 0.85, 'too_short', f)
+    if words >= 10 and f['unique_ratio'] < 0.3:
+        return PreScore(1, 0.5, 'repetitive', f)
+    if not on_topic and f['question_skills'] and f['answer_skills'] and words < 60:
+        return PreScore(2, 0.4, 'off_topic', f)
+    estimate = 2 + 4 * f['question_overlap'] + 2 * f['skill_coverage'] + min(words, 150) / 50
+    return PreScore(min(int(round(estimate)), 10), 0.3, 'ambiguous', f)
+
+
+def prescore_threshold() -> float:
+    # Confidence needed to skip Gemini; 1 or more turns local scoring off.
+    return float(os.getenv('PRESCORE_CONFIDENCE', 0.8))
+
+
+def is_local(result: PreScore, threshold: float) -> bool:
+    return result.reason in LOCAL_REASONS and result.confidence >= threshold
+
+
+def confident_prescore(question: str, answer: str, job_description: str = "",
+                       threshold: Optional[float] = None) -> Optional[PreScore]:
+    # The local score when it is confident enough to stand in for Gemini, else None.
+    threshold = prescore_threshold() if threshold is None else threshold
+    if threshold >= 1:
+        return None
+    result = prescore(question, answer, job_description)
+    local = is_local(result, threshold)
+    PRESCORES.inc(outcome='local' if local else 'escalated', reason=result.reason)
+    return result if local else None
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def calibrate(items: List[dict], thresholds: List[float]) -> dict:
+    # `items` carry question, answer, job_description and the reference score
+    # (a human label or Gemini's). For each threshold: how many answers would
+    # be scored locally and how far those local scores are from the reference.
+    scored = [(prescore(i['question'], i['answer'], i.get('job_description', "")), float(i['score'])) for i in items]
+    report = {'items': len(scored), 'thresholds': [], 'reasons': {}}
+    for threshold in thresholds:
+        local = [(p.score, ref) for p, ref in scored if is_local(p, threshold)]
+        errors = [abs(score - ref) for score, ref in local]
+        report['thresholds'].append({
+            'threshold': threshold,
+            'local': len(local),
+            'local_share': len(local) / len(scored) if scored else 0.0,
+            'mae': _mean(errors),
+            'within_2': _mean([1.0 if e <= 2 else 0.0 for e in errors]),
+            'bias': _mean([score - ref for score, ref in local]),
+        })
+    for p, ref in scored:
+        group = report['reasons'].setdefault(p.reason, {'count': 0, 'errors': []})
+        group['count'] += 1
+        group['errors'].append(abs(p.score - ref))
+    for group in report['reasons'].values():
+        group['mae'] = _mean(group.pop('errors'))
+    return report
+
+
+def _llm_scores(items: List[dict], concurrency: int):
+    from utils.answer_evaluator import evaluate_answer
+    from utils.scheduler import BULK, use_priority
+
+    def label(item):
+        with use_priority(BULK):
+            evaluation = evaluate_answer(item['question'], item['answer'], item.get('job_description', ""),
+                                         prescore=False)
+        if evaluation.get('fallback_reason'):
+            return None
+        return dict(item, score=evaluation['score'])
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, label, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.prescorer',
+        description='Calibrate the local answer pre-scorer against reference scores on a labelled set.'
+    )
+    parser.add_argument('labelled', help='JSONL with question, answer, optional job_description and score')
+    parser.add_argument('--llm', action='store_true',
+                        help='Score lines without a "score" with Gemini (pre-scoring off) as the reference')
+    parser.add_argument('--thresholds', default='0.5,0.6,0.7,0.8,0.85,0.9,0.95',
+                        help='Comma-separated confidence thresholds to compare')
+    parser.add_argument('--concurrency', type=int, default=4, help='Maximum concurrent Gemini requests with --llm')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    parser.add_argument('--save-labels', help='With --llm, write the labelled set including Gemini scores here')
+    args = parser.parse_args(argv)
+
+    with open(args.labelled, encoding='utf-8') as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    unlabelled = [item for item in items if 'score' not in item]
+    if unlabelled and not args.llm:
+        parser.error(f"{len(unlabelled)} lines have no score; add --llm to score them with Gemini")
+    if unlabelled:
+        from dotenv import load_dotenv
+        load_dotenv()
+        labelled = _llm_scores(unlabelled, args.concurrency)
+        failed = labelled.count(None)
+        if failed:
+            print(f"Skipping {failed} answers Gemini could not score", file=sys.stderr)
+        items = [item for item in items if 'score' in item] + [item for item in labelled if item is not None]
+        if args.save_labels:
+            with open(args.save_labels, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(item) + '\n' for item in items)
+
+    report = calibrate(items, [float(t) for t in args.thresholds.split(',')])
+    report['configured_threshold'] = prescore_threshold()
+
+    def fmt(value, pattern='{:.2f}'):
+        return '-' if value is None else pattern.format(value)
+
+    print(f"{report['items']} labelled answers (configured PRESCORE_CONFIDENCE={report['configured_threshold']})",
+          file=sys.stderr)
+    print("  threshold  local share   MAE  within 2   bias", file=sys.stderr)
+    for row in report['thresholds']:
+        print(f"  {row['threshold']:9.2f}  {row['local']:5d} {row['local_share']:5.0%}  {fmt(row['mae']):>5}  "
+              f"{fmt(row['within_2'], '{:.0%}'):>8}  {fmt(row['bias']):>5}", file=sys.stderr)
+    for reason, group in sorted(report['reasons'].items(), key=lambda r: -r[1]['count']):
+        print(f"  {reason:>11}: {group['count']:5d} answers, MAE {fmt(group['mae'])}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
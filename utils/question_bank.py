@@ -0,0 +1,240 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from utils.question_dedup import QuestionIndex
+from utils.skill_matcher import SkillMatcher, get_skill_matcher
+from utils.telemetry import Counter, register_metric
+
+DEFAULT_PATH = '.question_bank.sqlite3'
+BANK_MODES = ('off', 'fallback', 'offline')
+
+BANK_QUESTIONS = register_metric(Counter('interview_agent_question_bank_questions_total',
+                                         'Interview questions by source when the question bank is consulted'))
+
+# Rotated per skill so one interview never asks the same template twice.
+SKILL_TEMPLATES = [
+    ("Walk me through a production problem you solved with {skill}. What was the root cause?", 'Technical', 'Hard'),
+    ("What are the most common pitfalls when working with {skill}, and how do you avoid them?", 'Technical', 'Medium'),
+    ("When is {skill} the right choice for a project, and when would you pick an alternative?", 'Problem-solving', 'Medium'),
+    ("How do you test and debug code that depends on {skill}?", 'Technical', 'Medium'),
+    ("How have you improved the performance or reliability of a system built on {skill}?", 'Experience', 'Hard'),
+]
+
+GENERAL_QUESTIONS = [
+    ("Describe a challenging project you worked on and the outcome.", 'Experience', 'Medium'),
+    ("Describe a time you disagreed with a teammate about a technical decision. How was it resolved?", 'Behavioral', 'Medium'),
+    ("How do you approach problem-solving when you are stuck?", 'Behavioral', 'Easy'),
+    ("How do you handle tight deadlines and pressure?", 'Behavioral', 'Easy'),
+    ("What motivates you in your work?", 'Behavioral', 'Easy'),
+]
+
+
+class BankQuestion(NamedTuple):
+    question: str
+    category: str
+    difficulty: str
+    skills: Tuple[str, ...]
+    source: str
+
+    def as_question(self) -> dict:
+        return {'question': self.question, 'category': self.category, 'difficulty': self.difficulty}
+
+
+class BankSelection(NamedTuple):
+    questions: List[dict]
+    covered: List[str]
+    uncovered: List[str]
+    coverage: float
+
+
+class QuestionBank:
+    # Interview questions indexed by skill: templates seeded from the skill
+    # taxonomy plus LLM-generated questions persisted in SQLite. Generated
+    # questions are tagged with the skills they mention and rank ahead of
+    # templates; near-duplicates of anything already banked are not stored.
+
+    def __init__(self, path: Optional[str] = DEFAULT_PATH, matcher: Optional[SkillMatcher] = None):
+        self.path = path
+        self.matcher = matcher or get_skill_matcher()
+        self._lock = threading.Lock()
+        self._entries: List[BankQuestion] = []
+        self._by_skill: Dict[str, List[int]] = {}
+        self._general: List[int] = []
+        self._index = QuestionIndex()
+        self._conn = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "question TEXT PRIMARY KEY, category TEXT NOT NULL, difficulty TEXT NOT NULL, "
+            "skills TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._seed()
+        for question, category, difficulty, skills in self._conn.execute(
+                "SELECT question, category, difficulty, skills FROM questions ORDER BY created_at"):
+            self._add(BankQuestion(question, category, difficulty, tuple(s for s in skills.split('\n') if s), 'generated'))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _seed(self):
+        for question, category, difficulty in GENERAL_QUESTIONS:
+            self._add(BankQuestion(question, category, difficulty, (), 'seed'))
+        for skill in self.matcher.taxonomy:
+            for question, category, difficulty in SKILL_TEMPLATES:
+                self._add(BankQuestion(question.format(skill=skill), category, difficulty, (skill,), 'seed'))
+
+    def _add(self, entry: BankQuestion):
+        entry_id = len(self._entries)
+        self._entries.append(entry)
+        self._index.add(entry.question)
+        if not entry.skills:
+            self._general.append(entry_id)
+        for skill in entry.skills:
+            self._by_skill.setdefault(skill.lower(), []).append(entry_id)
+
+    def _key(self, skill: str) -> str:
+        return self.matcher.canonicalize(skill).lower()
+
+    def skills_in(self, text: str) -> List[str]:
+        return [match.name for match in self.matcher.match(text)]
+
+    def has_skill(self, skill: str) -> bool:
+        return self._key(skill) in self._by_skill
+
+    def record(self, questions: Iterable[dict]) -> int:
+        # Banks generated interview questions; returns how many were new.
+        added = 0
+        now = time.time()
+        with self._lock:
+            for q in questions:
+                text = q['question'].strip()
+                if len(text) < 20 or self._index.is_duplicate(text):
+                    continue
+                skills = tuple(self.skills_in(text))
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO questions (question, category, difficulty, skills, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (text, q['category'], q['difficulty'], '\n'.join(skills), now)
+                )
+                self._add(BankQuestion(text, q['category'], q['difficulty'], skills, 'generated'))
+                added += 1
+            self._conn.commit()
+        return added
+
+    def _candidates(self, entry_ids: List[int], offset: int, rng: Optional[random.Random]) -> List[BankQuestion]:
+        entries = [self._entries[i] for i in entry_ids]
+        generated = [e for e in entries if e.source == 'generated']
+        seeds = [e for e in entries if e.source == 'seed']
+        if seeds:
+            offset %= len(seeds)
+            seeds = seeds[offset:] + seeds[:offset]
+        if rng is not None:
+            rng.shuffle(generated)
+            rng.shuffle(seeds)
+        return generated + seeds
+
+    def _pick(self, entry_ids: List[int], index: QuestionIndex, offset: int = 0,
+              rng: Optional[random.Random] = None) -> Optional[BankQuestion]:
+        for entry in self._candidates(entry_ids, offset, rng):
+            if index.add_if_new(entry.question):
+                return entry
+        return None
+
+    def select(self, job_skills: List[str], resume_skills: List[str], count: int = 5, fresh: bool = False,
+               index: Optional[QuestionIndex] = None) -> BankSelection:
+        # One question per top job skill (the resume is used only when the JD
+        # names no skills) plus one general question. Coverage is the share of
+        # those skills the bank could ask about.
+        index = index if index is not None else QuestionIndex()
+        rng = random.Random() if fresh else None
+        targets, seen = [], set()
+        for skill in job_skills or resume_skills:
+            key = self._key(skill)
+            if key not in seen:
+                seen.add(key)
+                targets.append(skill)
+        targets = targets[:max(0, count - 1)]
+
+        questions, covered, uncovered = [], [], []
+        with self._lock:
+            for position, skill in enumerate(targets):
+                entry = self._pick(self._by_skill.get(self._key(skill), []), index, position, rng)
+                if entry is None:
+                    uncovered.append(skill)
+                    continue
+                questions.append(entry.as_question())
+                covered.append(skill)
+            if len(questions) < count:
+                entry = self._pick(self._general, index, rng=rng)
+                if entry is not None:
+                    questions.append(entry.as_question())
+        coverage = len(covered) / len(targets) if targets else 0.0
+        return BankSelection(questions, covered, uncovered, coverage)
+
+    def general(self, count: int, index: Optional[QuestionIndex] = None) -> List[dict]:
+        index = index if index is not None else QuestionIndex()
+        questions = []
+        with self._lock:
+            for entry_id in self._general:
+                if len(questions) < count and index.add_if_new(self._entries[entry_id].question):
+                    questions.append(self._entries[entry_id].as_question())
+        return questions
+
+    def followup(self, original_question: str, answer: str, avoid: Iterable[str] = ()) -> Optional[dict]:
+        # A banked question on a skill from the previous exchange that does not repeat it.
+        index = QuestionIndex.from_questions([original_question, *avoid])
+        skills = self.skills_in(original_question) + self.skills_in(answer)
+        with self._lock:
+            for position, skill in enumerate(dict.fromkeys(skills)):
+                entry = self._pick(self._by_skill.get(self._key(skill), []), index, position)
+                if entry is not None:
+                    return {'question': entry.question, 'category': 'Follow-up', 'difficulty': 'Hard'}
+        return None
+
+    def stats(self) -> dict:
+        generated = sum(1 for e in self._entries if e.source == 'generated')
+        return {
+            'questions': len(self._entries),
+            'generated': generated,
+            'seeded': len(self._entries) - generated,
+            'skills': len(self._by_skill),
+            'path': self.path or ':memory:',
+        }
+
+
+def bank_mode() -> str:
+    # off: static fallbacks only; fallback: the bank replaces static fallbacks
+    # and learns from generated questions; offline: also serve whole question
+    # sets from the bank when coverage is high, asking the LLM only for gaps.
+    mode = os.getenv('QUESTION_BANK_MODE', 'fallback').lower()
+    return mode if mode in BANK_MODES else 'fallback'
+
+
+def min_coverage() -> float:
+    return float(os.getenv('QUESTION_BANK_MIN_COVERAGE', 0.75))
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> Optional[QuestionBank]:
+    # QUESTION_BANK_PATH= (empty) keeps the bank in memory for this process only.
+    global _bank
+    if bank_mode() == 'off':
+        return None
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank(os.getenv('QUESTION_BANK_PATH', DEFAULT_PATH))
+        return _bank
+
+
+def set_question_bank(bank: Optional[QuestionBank]):
+    global _bank
+    with _bank_lock:
+        _bank = bank
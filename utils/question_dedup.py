@@ -0,0 +1,109 @@
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# Question boilerplate carries no meaning for similarity: "Tell me about your
+# experience with X" and "Describe your experience with X" are the same question.
+STOPWORDS = frozenset("""
+a about an and any are as at be been by can could did do does for from had has have how i if in into is it its
+me most my of on or our over please so some such than that the their them then there these they this to us was
+we were what when where which while who why will with would you your yours
+describe tell explain walk through give example examples experience experiences time times share talk discuss
+""".split())
+
+
+def _stem(token: str) -> str:
+    for suffix in ('ing', 'ed', 's'):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            stem = token[:-len(suffix)]
+            # debugging -> debugg -> debug, but keep "install", "access"
+            if suffix != 's' and stem[-1] == stem[-2] and stem[-1] not in 'lsz':
+                stem = stem[:-1]
+            return stem
+    return token
+
+
+def question_terms(text: str) -> List[str]:
+    words = [_stem(w) for w in _TOKEN.findall(text.lower()) if w not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def default_threshold() -> float:
+    return float(os.getenv('QUESTION_SIMILARITY_THRESHOLD', 0.5))
+
+
+class QuestionIndex:
+    # TF-IDF cosine similarity over word unigrams and bigrams, with an inverted
+    # index so a lookup only scores questions sharing at least one term.
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = default_threshold() if threshold is None else threshold
+        self._texts: List[str] = []
+        self._terms: List[Counter] = []
+        self._postings: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @classmethod
+    def from_questions(cls, questions: Iterable, threshold: Optional[float] = None) -> 'QuestionIndex':
+        index = cls(threshold)
+        for question in questions:
+            index.add(question['question'] if isinstance(question, dict) else question)
+        return index
+
+    def add(self, text: str) -> int:
+        terms = Counter(question_terms(text))
+        doc_id = len(self._texts)
+        self._texts.append(text)
+        self._terms.append(terms)
+        for term in terms:
+            self._postings.setdefault(term, set()).add(doc_id)
+        return doc_id
+
+    def _idf(self, term: str) -> float:
+        return math.log((len(self._texts) + 1) / (len(self._postings.get(term, ())) + 1)) + 1
+
+    def _vector(self, terms: Counter) -> Dict[str, float]:
+        vector = {term: count * self._idf(term) for term, count in terms.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {term: v / norm for term, v in vector.items()}
+
+    def most_similar(self, text: str) -> Tuple[Optional[str], float]:
+        terms = Counter(question_terms(text))
+        candidates = set()
+        for term in terms:
+            candidates.update(self._postings.get(term, ()))
+        if not candidates:
+            return None, 0.0
+        query = self._vector(terms)
+        best_id, best_score = None, 0.0
+        for doc_id in candidates:
+            other = self._vector(self._terms[doc_id])
+            score = sum(weight * other.get(term, 0.0) for term, weight in query.items())
+            if score > best_score:
+                best_id, best_score = doc_id, score
+        if best_id is None:
+            return None, 0.0
+        return self._texts[best_id], best_score
+
+    def is_duplicate(self, text: str) -> bool:
+        if not question_terms(text):
+            return False
+        return self.most_similar(text)[1] >= self.threshold
+
+    def add_if_new(self, text: str) -> bool:
+        if self.is_duplicate(text):
+            return False
+        self.add(text)
+        return True
+
+
+def dedupe_questions(questions: List[dict], index: Optional[QuestionIndex] = None) -> List[dict]:
+    # Keeps the first of each group of near-duplicates; `index` carries questions already asked.
+    index = index if index is not None else QuestionIndex()
+    return [q for q in questions if index.add_if_new(q['question'])]
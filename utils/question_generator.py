@@ -1,188 +1,498 @@
+import logging
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from typing import List
+import time
+from typing import Iterator, List, Optional
+from utils.llm_client import invoke_llm, stream_llm
+from utils.pipeline import Stage, run_pipeline
+from utils.question_bank import BANK_QUESTIONS, bank_mode, get_question_bank, min_coverage
+from utils.question_dedup import QuestionIndex, dedupe_questions
+from utils.scheduler import fallback_reason
+from utils.skill_matcher import get_skill_matcher
+from utils.structured_output import keep_parsed, parse_structured, schema_prompt
+from utils.telemetry import span
+from utils.token_budget import compact_text
+
+logger = logging.getLogger(__name__)
+
+SKILL_SOURCE_TOKEN_LIMIT = 400
+FOLLOWUP_ANSWER_TOKEN_LIMIT = 400
+QUESTION_CATEGORIES = ['Technical', 'Behavioral', 'Experience', 'Problem-solving']
+QUESTION_DIFFICULTIES = ['Easy', 'Medium', 'Hard']
 
 def extract_skills_with_gemini(text: str, doc_type: str = "job description") -> List[str]:
-    try:
-        llm = ChatGoogleGenerativeAI(
-            model="models/gemini-2.5-flash",
-            temperature=0,
-            google_api_key=os.getenv('GOOGLE_API_KEY')
-        )
-        
-        prompt = f"List ONLY the technical skills from this {doc_type} (comma-separated, max 10 skills):\n\n{text[:1500]}"
-        
-        print(f"\n{'='*60}")
-        print(f"GEMINI REQUEST - Extract Skills from {doc_type.upper()}")
-        print(f"{'='*60}")
-        print(prompt)
-        print(f"{'='*60}\n")
-        
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        
-        skills = [s.strip() for s in content.split(',')]
-        return [s for s in skills if len(s) > 1 and len(s) < 30][:10]
-    except Exception as e:
-        print(f"Error with Gemini: {e}")
-        return extract_skills_local(text)
+    with span('extract_skills', doc_type=doc_type) as stage:
+        try:
+            prompt = f"List ONLY the technical skills from this {doc_type} (comma-separated, max 10 skills):\n\n{compact_text(text, SKILL_SOURCE_TOKEN_LIMIT)}"
+            
+            content = invoke_llm(prompt, temperature=0, stage='extract_skills')
+            
+            return _clean_skills(content.split(','))
+        except Exception as e:
+            logger.warning("Skill extraction from %s failed, using local matcher: %s", doc_type, e)
+            stage.set(fallback_used=True, fallback_reason=fallback_reason(e))
+            return extract_skills_local(text)
+
+def _clean_skills(skills: List[str]) -> List[str]:
+    skills = [s.strip() for s in skills]
+    return [s for s in skills if len(s) > 1 and len(s) < 30][:10]
 
 def extract_skills_local(text: str) -> List[str]:
-    tech_keywords = [
-        'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue', 'svelte',
-        'node.js', 'nodejs', 'express', 'django', 'flask', 'spring', 'springboot',
-        'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'redis', 'dynamodb',
-        'aws', 'azure', 'gcp', 'cloud', 'docker', 'kubernetes', 'k8s',
-        'git', 'ci/cd', 'jenkins', 'github actions', 'gitlab',
-        'rest api', 'rest', 'api', 'graphql', 'grpc', 'soap',
-        'html', 'css', 'sass', 'scss', 'tailwind', 'bootstrap',
-        'webpack', 'vite', 'babel', 'npm', 'yarn',
-        'microservices', 'serverless', 'lambda', 'agile', 'scrum', 'devops',
-        'machine learning', 'ml', 'ai', 'deep learning', 'data science',
-        'tensorflow', 'pytorch', 'keras', 'pandas', 'numpy', 'scikit-learn',
-        'nlp', 'computer vision', 'opencv', 'llm',
-        'c++', 'c#', '.net', 'go', 'golang', 'rust', 'ruby', 'php',
-        'cassandra', 'elasticsearch', 'kafka', 'rabbitmq',
-        'testing', 'jest', 'pytest', 'selenium', 'junit'
+    return [match.name for match in get_skill_matcher().match(text)][:10]
+
+def merge_skills(*skill_lists: List[str], limit: int = 10) -> List[str]:
+    merged = []
+    seen = set()
+    for skills in skill_lists:
+        for skill in skills:
+            if skill.lower() not in seen:
+                seen.add(skill.lower())
+                merged.append(skill)
+    return merged[:limit]
+
+def _skill_stages(job_description: str, resume: str, resume_llm: bool = False) -> List[Stage]:
+    stages = [
+        Stage('job_skills', lambda: extract_skills_with_gemini(job_description, "job description")),
+        Stage('resume_local_skills', lambda: extract_skills_local(resume)),
     ]
-    
-    text_lower = text.lower()
-    found_skills = []
-    
-    for skill in tech_keywords:
-        if skill in text_lower:
-            found_skills.append(skill.title())
-    
-    return list(set(found_skills))[:10]
+    resume_deps = ['resume_local_skills']
+    if resume_llm:
+        stages.append(Stage('resume_llm_skills', lambda: extract_skills_with_gemini(resume, "resume")))
+        resume_deps.append('resume_llm_skills')
+    stages.append(Stage('resume_skills', lambda **found: merge_skills(*(found[d] for d in resume_deps)), resume_deps))
+    return stages
+
+def generate_interview_questions(job_description: str, resume: str, model_type: str = 'gemini', fresh: bool = False,
+                                 resume_llm: bool = False, timings: dict = None, fused: Optional[bool] = None) -> List[dict]:
+    questions = _bank_questions(job_description, resume, fresh, timings)
+    if questions is not None:
+        return questions
+
+    if _use_fused(fused):
+        questions = _fused_questions(job_description, resume, fresh, timings)
+        if questions is not None:
+            return questions
+
+    stages = _skill_stages(job_description, resume, resume_llm)
+    stages.append(Stage('questions', lambda job_skills, resume_skills: generate_questions_from_skills(job_skills, resume_skills, fresh),
+                        ['job_skills', 'resume_skills']))
+
+    result = run_pipeline(stages)
+    if timings is not None:
+        timings.update(result.timings)
+        timings['total'] = result.total_seconds
+    return result['questions']
+
+def stream_interview_questions(job_description: str, resume: str, model_type: str = 'gemini', fresh: bool = False,
+                               resume_llm: bool = False, timings: dict = None, fused: Optional[bool] = None) -> Iterator[dict]:
+    questions = _bank_questions(job_description, resume, fresh, timings)
+    if questions is not None:
+        yield from questions
+        return
+
+    if _use_fused(fused):
+        # A JSON document is only usable once complete, so fused mode yields all questions at once.
+        questions = _fused_questions(job_description, resume, fresh, timings)
+        if questions is not None:
+            yield from questions
+            return
+
+    result = run_pipeline(_skill_stages(job_description, resume, resume_llm))
+    if timings is not None:
+        timings.update(result.timings)
+    job_skills, resume_skills = result['job_skills'], result['resume_skills']
+
+    with span('generate_questions', streamed=True) as stage:
+        questions = []
+        index = QuestionIndex()
+        duplicates = 0
+        try:
+            prompt = _questions_prompt(job_skills, resume_skills)
+
+            buffer = ""
+            for chunk in stream_llm(prompt, temperature=0.7, fresh=fresh, stage='generate_questions'):
+                buffer += chunk
+                *complete_lines, buffer = buffer.split('\n')
+                for line in complete_lines:
+                    question = _parse_question_line(line, len(questions))
+                    if question and len(questions) < 5:
+                        if not index.add_if_new(question['question']):
+                            duplicates += 1
+                            continue
+                        questions.append(question)
+                        yield question
+            question = _parse_question_line(buffer, len(questions))
+            if question and len(questions) < 5:
+                if index.add_if_new(question['question']):
+                    questions.append(question)
+                    yield question
+                else:
+                    duplicates += 1
+        except Exception as e:
+            logger.warning("Streaming question generation failed: %s", e)
+            stage.set(fallback_used=True, fallback_reason=fallback_reason(e))
+            if not questions:
+                questions = _fallback_questions(job_skills, resume_skills)
+                yield from questions
+                return
 
-def generate_interview_questions(job_description: str, resume: str, model_type: str = 'gemini') -> List[dict]:
-    job_skills = extract_skills_with_gemini(job_description, "job description")
-    resume_skills = extract_skills_local(resume)
+        refilled = _refill_questions(job_skills, resume_skills, questions, index, fresh)
+        padding = _unique_padding(job_skills, index, 5 - len(questions) - len(refilled))
+        stage.set(questions=len(questions), duplicates=duplicates, refilled=len(refilled), padded=len(padding))
+        _remember_questions(questions + refilled)
+        yield from refilled
+        yield from padding
+
+def _bank_questions(job_description: str, resume: str, fresh: bool, timings: Optional[dict]) -> Optional[List[dict]]:
+    # In offline mode, serves the question set from the bank when it covers
+    # enough of the job's skills; the LLM is asked only about uncovered skills.
+    bank = get_question_bank()
+    if bank is None or bank_mode() != 'offline':
+        return None
+    with span('question_bank') as stage:
+        start = time.perf_counter()
+        job_skills, resume_skills = extract_skills_local(job_description), extract_skills_local(resume)
+        index = QuestionIndex()
+        selection = bank.select(job_skills, resume_skills, 5, fresh, index)
+        stage.set(coverage=round(selection.coverage, 2), uncovered=len(selection.uncovered))
+        if selection.coverage < min_coverage():
+            return None
+        questions = selection.questions
+        refilled = []
+        if selection.uncovered:
+            refilled = _refill_questions(selection.uncovered, resume_skills, questions, index, fresh)
+            _remember_questions(refilled)
+        padding = _unique_padding(job_skills, index, 5 - len(questions) - len(refilled))
+        BANK_QUESTIONS.inc(len(questions) + len(padding), source='bank', use='offline')
+        BANK_QUESTIONS.inc(len(refilled), source='llm', use='offline')
+        stage.set(questions=len(questions), refilled=len(refilled), padded=len(padding))
+        if timings is not None:
+            timings['bank'] = timings['total'] = time.perf_counter() - start
+        return questions + refilled + padding
+
+def _remember_questions(questions: List[dict]):
+    bank = get_question_bank()
+    if bank is None or not questions:
+        return
     try:
-        llm = ChatGoogleGenerativeAI(
-            model="models/gemini-2.5-flash",
-            temperature=0.7,
-            google_api_key=os.getenv('GOOGLE_API_KEY')
-        )
-        
-        skills_summary = f"Job requires: {', '.join(job_skills[:8])}\nCandidate has: {', '.join(resume_skills[:8])}"
-        
-        prompt = f"""{skills_summary}
+        bank.record(questions)
+    except Exception as e:
+        logger.warning("Could not add generated questions to the question bank: %s", e)
+
+def _use_fused(fused: Optional[bool]) -> bool:
+    if fused is not None:
+        return fused
+    return os.getenv('QUESTION_GENERATION_MODE', 'two_step').lower() == 'fused'
+
+INTERVIEW_PLAN_SCHEMA = {
+    'type': 'object',
+    'required': ['job_skills', 'resume_skills', 'gaps', 'questions'],
+    'properties': {
+        'job_skills': {'type': 'array', 'items': {'type': 'string'}},
+        'resume_skills': {'type': 'array', 'items': {'type': 'string'}},
+        'gaps': {'type': 'array', 'items': {'type': 'string'}},
+        'questions': {
+            'type': 'array',
+            'minItems': 1,
+            'items': {
+                'type': 'object',
+                'required': ['question', 'category', 'difficulty'],
+                'properties': {
+                    'question': {'type': 'string'},
+                    'category': {'type': 'string', 'enum': QUESTION_CATEGORIES},
+                    'difficulty': {'type': 'string', 'enum': QUESTION_DIFFICULTIES},
+                    'skill': {'type': 'string'},
+                },
+            },
+        },
+    },
+}
+
+def _plan_prompt(job_description: str, resume: str) -> str:
+    return f"""Job description:
+{compact_text(job_description, SKILL_SOURCE_TOKEN_LIMIT)}
+
+Resume:
+{compact_text(resume, SKILL_SOURCE_TOKEN_LIMIT)}
+
+List the technical skills in each (max 10), the job skills the resume lacks (gaps), and 5 interview questions (mix of technical and behavioral) probing the job's key skills and gaps.
+{schema_prompt(INTERVIEW_PLAN_SCHEMA)}"""
+
+def _parse_plan(content: str) -> dict:
+    return parse_structured(content, INTERVIEW_PLAN_SCHEMA, stage='generate_plan')
+
+def generate_interview_plan(job_description: str, resume: str, fresh: bool = False) -> dict:
+    # One structured call instead of skill extraction followed by question generation.
+    # Raises when the call fails or the response does not match the schema; a
+    # response that does not match is never cached.
+    prompt = _plan_prompt(job_description, resume)
+    parsed = []
+    invoke_llm(prompt, temperature=0.7, fresh=fresh, stage='generate_plan', validate=keep_parsed(_parse_plan, parsed))
+    plan = parsed[-1]
+
+    job_skills = _clean_skills(plan['job_skills'])
+    resume_skills = _clean_skills(plan['resume_skills'])
+    index = QuestionIndex()
+    proposed = [
+        {'question': q['question'].strip(), 'category': q['category'], 'difficulty': q['difficulty']}
+        for q in plan['questions'] if len(q['question'].strip()) > 15
+    ]
+    questions = dedupe_questions(proposed, index)[:5]
+    refilled = _refill_questions(job_skills, resume_skills, questions, index, fresh)
+    padding = _unique_padding(job_skills, index, 5 - len(questions) - len(refilled))
+    _remember_questions(questions + refilled)
+    return {
+        'job_skills': job_skills,
+        'resume_skills': resume_skills,
+        'gaps': _clean_skills(plan['gaps']),
+        'questions': questions + refilled + padding,
+        'duplicates': len(proposed) - len(dedupe_questions(proposed)),
+        'refilled': len(refilled),
+        'padded': len(padding),
+    }
+
+def _fused_questions(job_description: str, resume: str, fresh: bool, timings: Optional[dict]) -> Optional[List[dict]]:
+    with span('generate_plan') as stage:
+        start = time.perf_counter()
+        try:
+            plan = generate_interview_plan(job_description, resume, fresh)
+        except Exception as e:
+            logger.warning("Fused question generation failed, using the two-step path: %s", e)
+            stage.set(fallback_used=True, fallback_reason=fallback_reason(e))
+            return None
+        stage.set(questions=len(plan['questions']), duplicates=plan['duplicates'], refilled=plan['refilled'],
+                  padded=plan['padded'], gaps=len(plan['gaps']))
+        if timings is not None:
+            timings['plan'] = timings['total'] = time.perf_counter() - start
+        return plan['questions']
+
+def _questions_prompt(job_skills: List[str], resume_skills: List[str]) -> str:
+    skills_summary = f"Job requires: {', '.join(job_skills[:8])}\nCandidate has: {', '.join(resume_skills[:8])}"
+    
+    return f"""{skills_summary}
 
 Generate 5 interview questions (mix of technical and behavioral). Format:
 1. [Question text]
 2. [Question text]
 ..."""
-        
-        print(f"\n{'='*60}")
-        print(f"GEMINI REQUEST - Generate Questions")
-        print(f"{'='*60}")
-        print(prompt)
-        print(f"{'='*60}\n")
-        
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        
-        questions = parse_questions_from_text(content)
-        if len(questions) < 5:
-            fallback = [
-                {'question': f"Tell me about your experience with {job_skills[0] if job_skills else 'this role'}.", 'category': 'Technical', 'difficulty': 'Medium'},
-                {'question': 'Describe a challenging project you worked on and the outcome.', 'category': 'Experience', 'difficulty': 'Medium'},
-                {'question': 'How do you handle tight deadlines and pressure?', 'category': 'Behavioral', 'difficulty': 'Easy'},
-                {'question': 'What motivates you in your work?', 'category': 'Behavioral', 'difficulty': 'Easy'},
-                {'question': 'Where do you see yourself in 2-3 years?', 'category': 'Behavioral', 'difficulty': 'Easy'}
-            ]
-            questions.extend(fallback[:5 - len(questions)])
-        
-        return questions[:5]
-        
+
+def _refill_prompt(job_skills: List[str], resume_skills: List[str], asked: List[dict], missing: int) -> str:
+    asked_list = "\n".join(f"- {q['question']}" for q in asked)
+    return f"""Job requires: {', '.join(job_skills[:8])}
+Candidate has: {', '.join(resume_skills[:8])}
+
+Already asked:
+{asked_list}
+
+Generate {missing} more interview questions on topics not already asked. Format:
+1. [Question text]
+..."""
+
+def _refill_questions(job_skills: List[str], resume_skills: List[str], questions: List[dict],
+                      index: QuestionIndex, fresh: bool = False) -> List[dict]:
+    # Re-requests only the slots left empty by short or near-duplicate output, with one extra call.
+    missing = 5 - len(questions)
+    if missing <= 0:
+        return []
+    try:
+        prompt = _refill_prompt(job_skills, resume_skills, questions, missing)
+        content = invoke_llm(prompt, temperature=0.7, fresh=fresh, stage='refill_questions')
     except Exception as e:
-        print(f"Error generating questions: {e}")
-        questions = []
-        for skill in (job_skills + resume_skills)[:3]:
-            questions.append({'question': f"Tell me about your experience with {skill}.", 'category': 'Technical', 'difficulty': 'Medium'})
-        
-        questions.extend([
-            {'question': 'Describe a challenging project you completed.', 'category': 'Experience', 'difficulty': 'Medium'},
-            {'question': 'How do you approach problem-solving?', 'category': 'Behavioral', 'difficulty': 'Easy'}
-        ])
-        
-        return questions[:5]
+        logger.warning("Refilling %d question slot(s) failed: %s", missing, e)
+        return []
+    refilled = []
+    for question in parse_questions_from_text(content):
+        if len(refilled) < missing and index.add_if_new(question['question']):
+            refilled.append(question)
+    return refilled
+
+def _unique_padding(job_skills: List[str], index: QuestionIndex, missing: int) -> List[dict]:
+    if missing <= 0:
+        return []
+    padding = _bank_padding(job_skills, index, missing, use='padding')
+    for question in _padding_questions(job_skills):
+        if len(padding) < missing and index.add_if_new(question['question']):
+            padding.append(question)
+    return padding
+
+def _bank_padding(skills: List[str], index: QuestionIndex, count: int, use: str) -> List[dict]:
+    bank = get_question_bank()
+    if bank is None:
+        return []
+    questions = bank.select(skills, [], count, index=index).questions
+    questions += bank.general(count - len(questions), index)
+    BANK_QUESTIONS.inc(len(questions), source='bank', use=use)
+    return questions
+
+def _padding_questions(job_skills: List[str]) -> List[dict]:
+    return [
+        {'question': f"Tell me about your experience with {job_skills[0] if job_skills else 'this role'}.", 'category': 'Technical', 'difficulty': 'Medium'},
+        {'question': 'Describe a challenging project you worked on and the outcome.', 'category': 'Experience', 'difficulty': 'Medium'},
+        {'question': 'How do you handle tight deadlines and pressure?', 'category': 'Behavioral', 'difficulty': 'Easy'},
+        {'question': 'What motivates you in your work?', 'category': 'Behavioral', 'difficulty': 'Easy'},
+        {'question': 'Where do you see yourself in 2-3 years?', 'category': 'Behavioral', 'difficulty': 'Easy'}
+    ]
+
+def _fallback_questions(job_skills: List[str], resume_skills: List[str]) -> List[dict]:
+    index = QuestionIndex()
+    questions = _bank_padding(merge_skills(job_skills, resume_skills), index, 5, use='fallback')
+    static = [
+        {'question': f"Tell me about your experience with {skill}.", 'category': 'Technical', 'difficulty': 'Medium'}
+        for skill in (job_skills + resume_skills)[:3]
+    ]
+    static.extend([
+        {'question': 'Describe a challenging project you completed.', 'category': 'Experience', 'difficulty': 'Medium'},
+        {'question': 'How do you approach problem-solving?', 'category': 'Behavioral', 'difficulty': 'Easy'}
+    ])
+    
+    for question in static:
+        if len(questions) < 5 and index.add_if_new(question['question']):
+            questions.append(question)
+    return questions
+
+def generate_questions_from_skills(job_skills: List[str], resume_skills: List[str], fresh: bool = False) -> List[dict]:
+    with span('generate_questions') as stage:
+        try:
+            prompt = _questions_prompt(job_skills, resume_skills)
+            
+            content = invoke_llm(prompt, temperature=0.7, fresh=fresh, stage='generate_questions')
+            
+            parsed = parse_questions_from_text(content)
+            index = QuestionIndex()
+            questions = dedupe_questions(parsed, index)[:5]
+            refilled = _refill_questions(job_skills, resume_skills, questions, index, fresh)
+            padding = _unique_padding(job_skills, index, 5 - len(questions) - len(refilled))
+            stage.set(questions=len(parsed), duplicates=len(parsed) - len(dedupe_questions(parsed)),
+                      refilled=len(refilled), padded=len(padding))
+            _remember_questions(questions + refilled)
+            
+            return questions + refilled + padding
+            
+        except Exception as e:
+            logger.warning("Question generation failed, using fallback questions: %s", e)
+            stage.set(fallback_used=True, fallback_reason=fallback_reason(e))
+            return _fallback_questions(job_skills, resume_skills)
+
+def _parse_question_line(line: str, position: int) -> Optional[dict]:
+    line = line.strip()
+    if not line or len(line) < 10:
+        return None
+    
+    question_text = None
+    
+    if any(line.startswith(f"{i}.") or line.startswith(f"{i})") for i in range(1, 20)):
+        question_text = line.split('.', 1)[-1].split(')', 1)[-1].strip()
+    elif line.lower().startswith(('what', 'how', 'why', 'describe', 'tell', 'explain', 'can you', 'have you', 'do you')):
+        question_text = line
+    
+    if question_text and len(question_text) > 15:
+        return {
+            'question': question_text,
+            'category': QUESTION_CATEGORIES[position % len(QUESTION_CATEGORIES)],
+            'difficulty': QUESTION_DIFFICULTIES[position % len(QUESTION_DIFFICULTIES)]
+        }
+    return None
 
 def parse_questions_from_text(text: str) -> List[dict]:
     questions = []
-    lines = text.split('\n')
-    
-    categories = ['Technical', 'Behavioral', 'Experience', 'Problem-solving']
-    difficulties = ['Easy', 'Medium', 'Hard']
-    cat_idx = 0
     
-    for line in lines:
-        line = line.strip()
-        if not line or len(line) < 10:
-            continue
-        
-        question_text = None
-        
-        if any(line.startswith(f"{i}.") or line.startswith(f"{i})") for i in range(1, 20)):
-            question_text = line.split('.', 1)[-1].split(')', 1)[-1].strip()
-        elif line.lower().startswith(('what', 'how', 'why', 'describe', 'tell', 'explain', 'can you', 'have you', 'do you')):
-            question_text = line
-        
-        if question_text and len(question_text) > 15:
-            questions.append({
-                'question': question_text,
-                'category': categories[cat_idx % len(categories)],
-                'difficulty': difficulties[cat_idx % len(difficulties)]
-            })
-            cat_idx += 1
+    for line in text.split('\n'):
+        question = _parse_question_line(line, len(questions))
+        if question:
+            questions.append(question)
     
     return questions[:10]
 
-def generate_followup_question(original_question: str, answer: str, model_type: str = 'gemini') -> dict:
-    try:
-        llm = ChatGoogleGenerativeAI(
-            model="models/gemini-2.5-flash",
-            temperature=0.7,
-            google_api_key=os.getenv('GOOGLE_API_KEY')
-        )
-        
-        prompt = f"""Previous Q: {original_question}
+def _followup_prompt(original_question: str, answer: str, avoid: Optional[List[str]] = None) -> str:
+    answer = compact_text(answer, FOLLOWUP_ANSWER_TOKEN_LIMIT)
+    avoid_text = ""
+    if avoid:
+        avoid_text = "\nDo not repeat any of these:\n" + "\n".join(f"- {q}" for q in avoid[-8:]) + "\n"
+    return f"""Previous Q: {original_question}
 Previous A: {answer}
-
+{avoid_text}
 Generate 1 follow-up question to dig deeper. Just write the question."""
-        
-        print(f"\n{'='*60}")
-        print(f"GEMINI REQUEST - Generate Follow-up Question")
-        print(f"{'='*60}")
-        print(prompt)
-        print(f"{'='*60}\n")
-        
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        
-        followup_text = content.strip()
-        
-        for prefix in ["Follow-up:", "Question:", "Q:", "Next:", "Here's", "Here is"]:
-            if followup_text.startswith(prefix):
-                followup_text = followup_text[len(prefix):].strip()
-        
-        if len(followup_text) < 20 or '?' not in followup_text:
-            return generate_followup_fallback(original_question, answer)
-        
-        return {
-            'question': followup_text,
-            'category': 'Follow-up',
-            'difficulty': 'Hard'
-        }
-        
-    except Exception as e:
-        print(f"Error generating follow-up: {e}")
-        return generate_followup_fallback(original_question, answer)
 
-def generate_followup_fallback(original_question: str, answer: str) -> dict:
+def _clean_followup(content: str) -> Optional[str]:
+    followup_text = content.strip()
+    
+    for prefix in ["Follow-up:", "Question:", "Q:", "Next:", "Here's", "Here is"]:
+        if followup_text.startswith(prefix):
+            followup_text = followup_text[len(prefix):].strip()
+    
+    if len(followup_text) < 20 or '?' not in followup_text:
+        return None
+    return followup_text
+
+def _avoid_repeat(followup: dict, original_question: str, answer: str, avoid: Optional[List[str]], stage=None) -> dict:
+    # A follow-up repeating an asked question is swapped for a local one, or
+    # marked duplicate when the local one repeats too.
+    if not avoid:
+        return followup
+    index = QuestionIndex.from_questions(avoid)
+    if not index.is_duplicate(followup['question']):
+        return followup
+    if stage is not None:
+        stage.set(duplicate=True)
+    fallback = generate_followup_fallback(original_question, answer, avoid)
+    if index.is_duplicate(fallback['question']):
+        return dict(followup, duplicate=True)
+    if stage is not None:
+        stage.set(fallback_used=True, fallback_reason='duplicate_question')
+    return fallback
+
+def finalize_followup_question(content: str, original_question: str, answer: str,
+                               avoid: Optional[List[str]] = None, stage=None) -> dict:
+    followup_text = _clean_followup(content)
+    if followup_text is None:
+        if stage is not None:
+            stage.set(fallback_used=True, fallback_reason='unusable_response')
+        return generate_followup_fallback(original_question, answer, avoid)
+    
+    followup = {
+        'question': followup_text,
+        'category': 'Follow-up',
+        'difficulty': 'Hard'
+    }
+    return _avoid_repeat(followup, original_question, answer, avoid, stage)
+
+def generate_followup_question(original_question: str, answer: str, model_type: str = 'gemini', fresh: bool = False,
+                               avoid: Optional[List[str]] = None) -> dict:
+    with span('generate_followup') as stage:
+        try:
+            prompt = _followup_prompt(original_question, answer, avoid)
+            
+            content = invoke_llm(prompt, temperature=0.7, fresh=fresh, stage='generate_followup')
+            
+            return finalize_followup_question(content, original_question, answer, avoid, stage)
+            
+        except Exception as e:
+            logger.warning("Follow-up generation failed, using fallback: %s", e)
+            stage.set(fallback_used=True, fallback_reason=fallback_reason(e))
+            return generate_followup_fallback(original_question, answer, avoid)
+
+def stream_followup_question(original_question: str, answer: str, model_type: str = 'gemini', fresh: bool = False,
+                             avoid: Optional[List[str]] = None) -> Iterator[str]:
+    # Pass the same `avoid` to finalize_followup_question once the stream ends.
+    with span('generate_followup', streamed=True) as stage:
+        try:
+            prompt = _followup_prompt(original_question, answer, avoid)
+            
+            yield from stream_llm(prompt, temperature=0.7, fresh=fresh, stage='generate_followup')
+            
+        except Exception as e:
+            logger.warning("Streaming follow-up generation failed: %s", e)
+            stage.set(fallback_used=True, fallback_reason=fallback_reason(e))
+
+def generate_followup_fallback(original_question: str, answer: str, avoid: Optional[List[str]] = None) -> dict:
     import re
     
+    bank = get_question_bank()
+    if bank is not None:
+        banked = bank.followup(original_question, answer, avoid or ())
+        if banked is not None:
+            BANK_QUESTIONS.inc(source='bank', use='followup')
+            return banked
+    
     answer_lower = answer.lower()
     question_lower = original_question.lower()
     
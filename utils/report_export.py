@@ -0,0 +1,435 @@
+import argparse
+import csv
+import html
+import importlib.util
+import io
+import os
+import sys
+import time
+from functools import lru_cache
+from string import Template
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from utils.answer_evaluator import RUBRIC_DIMENSIONS
+from utils.session_store import DEFAULT_PATH, SessionStore, user_owner
+from utils.skill_matcher import SkillMatcher, get_skill_matcher
+
+EXPORT_FORMATS = ('csv', 'parquet')
+REPORT_FORMATS = ('md', 'html')
+
+# One row per evaluated answer.
+COLUMNS = ['session_id', 'candidate', 'updated_at', 'question_idx', 'question', 'category', 'difficulty',
+           'skills', 'answer_words', 'score', *RUBRIC_DIMENSIONS, 'scored_locally', 'fallback_reason', 'feedback']
+
+
+def evaluation_rows(sessions: Iterable[dict], matcher: Optional[SkillMatcher] = None) -> Iterator[dict]:
+    # `sessions` as yielded by SessionStore.iter_sessions. Interviews from one
+    # job description repeat the same questions, so skill tagging is memoized.
+    matcher = matcher or get_skill_matcher()
+    skills_in = lru_cache(maxsize=4096)(lambda text: '; '.join(m.name for m in matcher.match(text)))
+    for session in sessions:
+        record = session['record']
+        questions = record.get('questions') or []
+        for saved in record.get('evaluations') or []:
+            idx = saved['question_idx']
+            asked = questions[idx] if 0 <= idx < len(questions) else {}
+            if asked.get('question') != saved['question']:
+                asked = {}
+            evaluation = saved.get('evaluation') or {}
+            rubric = evaluation.get('rubric') or {}
+            row = {
+                'session_id': session['id'],
+                'candidate': session['title'],
+                'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(session['updated_at'])),
+                'question_idx': idx + 1,
+                'question': saved['question'],
+                'category': asked.get('category', ''),
+                'difficulty': asked.get('difficulty', ''),
+                'skills': skills_in(saved['question']),
+                'answer_words': len((saved.get('answer') or '').split()),
+                'score': float(evaluation.get('score', 0)),
+                'scored_locally': evaluation.get('scored_locally') or '',
+                'fallback_reason': evaluation.get('fallback_reason') or '',
+                'feedback': evaluation.get('feedback', ''),
+            }
+            for dim in RUBRIC_DIMENSIONS:
+                row[dim] = float(rubric[dim]) if dim in rubric else None
+            yield row
+
+
+class _Group:
+    __slots__ = ('count', 'total', 'low', 'high', 'rubric_totals', 'rubric_counts', 'sessions')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.low = None
+        self.high = None
+        self.rubric_totals = dict.fromkeys(RUBRIC_DIMENSIONS, 0.0)
+        self.rubric_counts = dict.fromkeys(RUBRIC_DIMENSIONS, 0)
+        self.sessions = set()
+
+    def add(self, row: dict):
+        score = row['score']
+        self.count += 1
+        self.total += score
+        self.low = score if self.low is None else min(self.low, score)
+        self.high = score if self.high is None else max(self.high, score)
+        self.sessions.add(row['session_id'])
+        for dim in RUBRIC_DIMENSIONS:
+            if row[dim] is not None:
+                self.rubric_totals[dim] += row[dim]
+                self.rubric_counts[dim] += 1
+
+    def summary(self, name: str) -> dict:
+        return {
+            'name': name,
+            'answers': self.count,
+            'interviews': len(self.sessions),
+            'mean': self.total / self.count,
+            'min': self.low,
+            'max': self.high,
+            **{dim: self.rubric_totals[dim] / self.rubric_counts[dim] if self.rubric_counts[dim] else None
+               for dim in RUBRIC_DIMENSIONS},
+        }
+
+
+class Rollups:
+    # Running score aggregates per skill, per question category and per
+    # interview, updated row by row while the export streams.
+
+    def __init__(self):
+        self.overall = _Group()
+        self.fallbacks = 0
+        self.prescored = 0
+        # Set when an export stopped at its row cap; the rollups cover the exported rows only.
+        self.truncated = False
+        self._groups: Dict[str, Dict[str, _Group]] = {'skill': {}, 'category': {}, 'candidate': {}}
+        self._candidates: Dict[str, str] = {}
+
+    def add(self, row: dict):
+        self.overall.add(row)
+        if row['fallback_reason']:
+            self.fallbacks += 1
+        if row['scored_locally']:
+            self.prescored += 1
+        for skill in row['skills'].split('; ') if row['skills'] else ['(no skill)']:
+            self._group('skill', skill).add(row)
+        self._group('category', row['category'] or '(uncategorized)').add(row)
+        self._group('candidate', row['session_id']).add(row)
+        self._candidates[row['session_id']] = row['candidate']
+
+    def _group(self, by: str, name: str) -> _Group:
+        group = self._groups[by].get(name)
+        if group is None:
+            group = self._groups[by][name] = _Group()
+        return group
+
+    def table(self, by: str) -> List[dict]:
+        rows = []
+        for name, group in self._groups[by].items():
+            summary = group.summary(self._candidates[name] if by == 'candidate' else name)
+            if by == 'candidate':
+                summary['session_id'] = name
+            rows.append(summary)
+        key = (lambda r: -r['mean']) if by == 'candidate' else (lambda r: (-r['answers'], r['name']))
+        return sorted(rows, key=key)
+
+    def summary(self) -> dict:
+        return {
+            'interviews': len(self._groups['candidate']),
+            'answers': self.overall.count,
+            'mean': self.overall.total / self.overall.count if self.overall.count else 0.0,
+            'fallbacks': self.fallbacks,
+            'prescored': self.prescored,
+            'truncated': self.truncated,
+        }
+
+
+def _tap(rows: Iterable[dict], rollups: Rollups, max_rows: Optional[int] = None) -> Iterator[dict]:
+    for count, row in enumerate(rows):
+        if max_rows and count >= max_rows:
+            rollups.truncated = True
+            return
+        rollups.add(row)
+        yield row
+
+
+def write_csv(rows: Iterable[dict], out) -> int:
+    # `out` is a path or a text file object; rows are written as they arrive.
+    if isinstance(out, str):
+        with open(out, 'w', encoding='utf-8', newline='') as f:
+            return write_csv(rows, f)
+    writer = csv.writer(out)
+    writer.writerow(COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(['' if row[c] is None else row[c] for c in COLUMNS])
+        count += 1
+    return count
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def write_parquet(rows: Iterable[dict], out, batch_size: int = 5000) -> int:
+    # `out` is a path or a binary file object. Rows are buffered only up to
+    # one row group, so memory stays flat however many interviews are exported.
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow); use CSV instead")
+    types = {'question_idx': pa.int32(), 'answer_words': pa.int32(), 'score': pa.float32(),
+             **{dim: pa.float32() for dim in RUBRIC_DIMENSIONS}}
+    schema = pa.schema([(c, types.get(c, pa.string())) for c in COLUMNS])
+    count = 0
+    with pq.ParquetWriter(out, schema, compression='zstd') as writer:
+        columns = {c: [] for c in COLUMNS}
+        for row in rows:
+            for c in COLUMNS:
+                columns[c].append(row[c])
+            count += 1
+            if count % batch_size == 0:
+                writer.write_table(pa.table(columns, schema=schema))
+                columns = {c: [] for c in COLUMNS}
+        if columns['session_id'] or not count:
+            writer.write_table(pa.table(columns, schema=schema))
+    return count
+
+
+def export_evaluations(sessions: Iterable[dict], out, fmt: str = 'csv', batch_size: int = 5000,
+                       matcher: Optional[SkillMatcher] = None, max_rows: Optional[int] = None) -> Rollups:
+    # `max_rows` stops the export after that many rows (None or 0: no cap).
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    rollups = Rollups()
+    rows = _tap(evaluation_rows(sessions, matcher), rollups, max_rows)
+    if fmt == 'parquet':
+        write_parquet(rows, out, batch_size)
+    else:
+        write_csv(rows, out)
+    return rollups
+
+
+TRUNCATED_NOTE = ("Export capped at the first {answers} answers (EXPORT_MAX_ROWS); "
+                  "run python -m utils.report_export for everything.")
+
+
+def _score(value) -> str:
+    return '–' if value is None else f"{value:.1f}"
+
+
+MARKDOWN_REPORT = Template("""# $title
+
+**Interviews:** $interviews · **Evaluated answers:** $answers · **Average score:** $mean/10 · **Pre-scored without Gemini:** $prescored · **Heuristic fallbacks:** $fallbacks
+$note
+## Scores by skill
+
+$skills
+## Scores by question category
+
+$categories
+## Candidates
+
+$candidates""")
+
+MARKDOWN_TABLE_HEADER = ("| $label | Answers | Interviews | Mean | Min | Max | "
+                         + " | ".join(d.replace('_', ' ').title() for d in RUBRIC_DIMENSIONS) + " |\n"
+                         + "|---" * (6 + len(RUBRIC_DIMENSIONS)) + "|\n")
+MARKDOWN_TABLE_ROW = Template("| $name | $answers | $interviews | $mean | $min | $max | $rubric |\n")
+
+HTML_REPORT = Template("""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>$title</title>
+<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:2em}
+th,td{border:1px solid #ccc;padding:4px 8px;text-align:right}th:first-child,td:first-child{text-align:left}</style>
+</head><body>
+<h1>$title</h1>
+<p><b>Interviews:</b> $interviews · <b>Evaluated answers:</b> $answers · <b>Average score:</b> $mean/10 · <b>Pre-scored without Gemini:</b> $prescored · <b>Heuristic fallbacks:</b> $fallbacks</p>
+$note
+<h2>Scores by skill</h2>
+$skills
+<h2>Scores by question category</h2>
+$categories
+<h2>Candidates</h2>
+$candidates
+</body></html>
+""")
+
+HTML_TABLE = Template("<table><thead><tr><th>$label</th><th>Answers</th><th>Interviews</th><th>Mean</th>"
+                      "<th>Min</th><th>Max</th>$rubric</tr></thead><tbody>\n$rows</tbody></table>")
+HTML_TABLE_ROW = Template("<tr><td>$name</td><td>$answers</td><td>$interviews</td><td>$mean</td>"
+                          "<td>$min</td><td>$max</td>$rubric</tr>\n")
+
+
+def _cells(row: dict, escape) -> dict:
+    return {
+        'name': escape(str(row['name'])),
+        'answers': row['answers'],
+        'interviews': row['interviews'],
+        'mean': _score(row['mean']),
+        'min': _score(row['min']),
+        'max': _score(row['max']),
+    }
+
+
+def _markdown_escape(text: str) -> str:
+    return text.replace('|', '\\|').replace('\n', ' ')
+
+
+def _markdown_table(label: str, rows: List[dict]) -> str:
+    if not rows:
+        return "_No evaluations._\n"
+    parts = [Template(MARKDOWN_TABLE_HEADER).substitute(label=label)]
+    parts.extend(
+        MARKDOWN_TABLE_ROW.substitute(_cells(row, _markdown_escape), rubric=" | ".join(_score(row[d]) for d in RUBRIC_DIMENSIONS))
+        for row in rows
+    )
+    return "".join(parts)
+
+
+def _html_table(label: str, rows: List[dict]) -> str:
+    if not rows:
+        return "<p><i>No evaluations.</i></p>"
+    header = "".join(f"<th>{html.escape(d.replace('_', ' ').title())}</th>" for d in RUBRIC_DIMENSIONS)
+    body = "".join(
+        HTML_TABLE_ROW.substitute(_cells(row, html.escape),
+                                  rubric="".join(f"<td>{_score(row[d])}</td>" for d in RUBRIC_DIMENSIONS))
+        for row in rows
+    )
+    return HTML_TABLE.substitute(label=html.escape(label), rubric=header, rows=body)
+
+
+def render_report(rollups: Rollups, fmt: str = 'md', title: str = "Interview Evaluation Summary",
+                  max_candidates: int = 200) -> str:
+    # Tables are built as lists of rendered rows and joined once.
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format {fmt!r}; expected one of {', '.join(REPORT_FORMATS)}")
+    summary = rollups.summary()
+    table = _html_table if fmt == 'html' else _markdown_table
+    note = ""
+    if summary['truncated']:
+        note = TRUNCATED_NOTE.format(answers=summary['answers'])
+        note = f"<p><i>{html.escape(note)}</i></p>" if fmt == 'html' else f"\n_{note}_\n"
+    return (HTML_REPORT if fmt == 'html' else MARKDOWN_REPORT).substitute(
+        title=html.escape(title) if fmt == 'html' else title,
+        interviews=summary['interviews'],
+        answers=summary['answers'],
+        mean=f"{summary['mean']:.1f}",
+        fallbacks=summary['fallbacks'],
+        prescored=summary['prescored'],
+        note=note,
+        skills=table('Skill', rollups.table('skill')),
+        categories=table('Category', rollups.table('category')),
+        candidates=table('Candidate', rollups.table('candidate')[:max_candidates]),
+    )
+
+
+INTERVIEW_REPORT = Template("""# Interview Evaluation Report
+
+**Total Questions:** $total
+**Answered Questions:** $answered
+**Average Score:** $mean/10
+
+$questions""")
+
+INTERVIEW_QUESTION = Template("""
+## Question $number
+**Q:** $question
+
+**A:** $answer
+
+**Score:** $score/10
+
+$rubric**Feedback:** $feedback
+
+""")
+
+
+def interview_report(records: List[dict], total_questions: int, answered_questions: int, average_score: float) -> str:
+    # The single-interview Markdown report behind the app's export button.
+    questions = []
+    for saved in records:
+        evaluation = saved['evaluation']
+        rubric = ""
+        if evaluation.get('rubric'):
+            rubric = "**Rubric:** " + ", ".join(f"{dim.replace('_', ' ').title()} {value}/10"
+                                                for dim, value in evaluation['rubric'].items()) + "\n\n"
+        questions.append(INTERVIEW_QUESTION.substitute(
+            number=saved['question_idx'] + 1,
+            question=saved['question'],
+            answer=saved['answer'],
+            score=evaluation.get('score', 0),
+            rubric=rubric,
+            feedback=evaluation.get('feedback', 'N/A'),
+        ))
+    return INTERVIEW_REPORT.substitute(total=total_questions, answered=answered_questions,
+                                       mean=f"{average_score:.1f}", questions="".join(questions))
+
+
+def export_max_rows() -> int:
+    # Cap for in-memory exports (the app's download buttons); 0 turns it off.
+    return int(os.getenv('EXPORT_MAX_ROWS', 20000))
+
+
+def export_store(store: SessionStore, owner: str, fmt: str = 'csv', query: str = "",
+                 max_rows: Optional[int] = None) -> tuple:
+    # In-memory export for download buttons: (data bytes, Markdown report,
+    # summary). Capped at `max_rows`, EXPORT_MAX_ROWS by default; the CLI
+    # streams to a file and has no cap.
+    max_rows = export_max_rows() if max_rows is None else max_rows
+    if fmt == 'parquet':
+        buffer = io.BytesIO()
+        rollups = export_evaluations(store.iter_sessions(owner, query), buffer, 'parquet', max_rows=max_rows)
+        data = buffer.getvalue()
+    else:
+        buffer = io.StringIO()
+        rollups = export_evaluations(store.iter_sessions(owner, query), buffer, 'csv', max_rows=max_rows)
+        data = buffer.getvalue().encode('utf-8')
+    return data, render_report(rollups, 'md'), rollups.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.report_export',
+        description='Export evaluations from every saved interview to CSV or Parquet, with score rollups.'
+    )
+    parser.add_argument('-o', '--output', default='evaluations.csv',
+                        help='Evaluation rows file; .parquet writes Parquet, anything else CSV')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help='Override the format implied by --output')
+    parser.add_argument('--report', help='Also write a summary report (.md or .html)')
+    parser.add_argument('--query', default="", help='Only interviews matching this search (as in the app sidebar)')
+    parser.add_argument('--store', default=None, help='Session database (default: SESSION_STORE_PATH)')
+    parser.add_argument('--owner', default=None,
+                        help="Only this signed-in user's interviews (default: every owner, for admins with file access)")
+    parser.add_argument('--batch-size', type=int, default=5000, help='Rows per Parquet row group')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+    report_fmt = None
+    if args.report:
+        report_fmt = 'html' if args.report.endswith(('.html', '.htm')) else 'md'
+    path = args.store or os.getenv('SESSION_STORE_PATH', DEFAULT_PATH)
+    if not path:
+        parser.error("Session persistence is off (SESSION_STORE_PATH is empty); pass --store")
+    # Exports read only; never evict old interviews on the way.
+    store = SessionStore(path, max_age=None)
+
+    start = time.perf_counter()
+    try:
+        rollups = export_evaluations(store.iter_sessions(user_owner(args.owner) if args.owner else None, args.query), args.output, fmt, args.batch_size)
+    except RuntimeError as e:
+        parser.error(str(e))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(render_report(rollups, report_fmt))
+    summary = rollups.summary()
+    print(f"Exported {summary['answers']} evaluations from {summary['interviews']} interviews to {args.output} "
+          f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    for row in rollups.table('skill')[:10]:
+        print(f"  {row['mean']:4.1f}/10  {row['answers']:6d} answers  {row['name']}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from utils.telemetry import Counter, Histogram, LLM_RETRIES, Span, register_metric
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITIES = {'interactive': INTERACTIVE, 'bulk': BULK}
+PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+
+RETRYABLE_TYPES = ('ResourceExhausted', 'ServiceUnavailable', 'TooManyRequests', 'DeadlineExceeded',
+                   'InternalServerError')
+RETRYABLE_MARKERS = ('429', '503', 'resource exhausted', 'resource has been exhausted', 'rate limit',
+                     'unavailable', 'deadline exceeded', 'timed out')
+
+LLM_HEDGES = register_metric(Counter('interview_agent_llm_hedges_total', 'Hedged LLM requests by outcome'))
+LLM_ABANDONED = register_metric(Counter('interview_agent_llm_abandoned_total',
+                                        'LLM calls left running after their deadline passed or a hedge won'))
+RATE_LIMIT_WAIT = register_metric(Histogram('interview_agent_rate_limit_wait_seconds',
+                                            'Time spent waiting for a rate limit token',
+                                            buckets=(0.001, 0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60)))
+
+_priority = contextvars.ContextVar('llm_priority', default=INTERACTIVE)
+
+
+class LLMUnavailable(Exception):
+    # Raised once the scheduler gives up; `reason` is what callers report as the fallback reason.
+    def __init__(self, reason: str, attempts: int, last_error: Optional[BaseException] = None):
+        detail = f": {last_error}" if last_error is not None else ""
+        super().__init__(f"LLM unavailable ({reason} after {attempts} attempt(s)){detail}")
+        self.reason = reason
+        self.attempts = attempts
+        self.last_error = last_error
+
+
+def fallback_reason(error: BaseException) -> str:
+    return getattr(error, 'reason', None) or type(error).__name__
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_TYPES:
+        return True
+    text = str(error).lower()
+    return any(marker in text for marker in RETRYABLE_MARKERS)
+
+
+@contextmanager
+def use_priority(priority):
+    if isinstance(priority, str):
+        priority = PRIORITIES[priority]
+    token = _priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class TokenBucket:
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiting = [0] * len(PRIORITIES)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        if self.rate <= 0:
+            return True
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    # Lower-priority callers step aside while anyone more urgent is queued.
+                    blocked = any(self._waiting[p] for p in range(priority))
+                    if self._tokens >= 1 and not blocked:
+                        self._tokens -= 1
+                        return True
+                    delay = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.05
+                    if end is not None:
+                        if now >= end:
+                            return False
+                        delay = min(delay, end - now)
+                    self._cond.wait(delay)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+class Scheduler:
+    def __init__(self, requests_per_minute: float = None, burst: int = None, max_attempts: int = None,
+                 base_delay: float = None, max_delay: float = None, interactive_deadline: float = None,
+                 bulk_deadline: float = None, hedge_after: float = None, max_concurrency: int = None):
+        self.requests_per_minute = _env_float('LLM_RATE_LIMIT_RPM', 60) if requests_per_minute is None else requests_per_minute
+        self.burst = int(_env_float('LLM_RATE_LIMIT_BURST', 10)) if burst is None else burst
+        self.max_attempts = int(_env_float('LLM_MAX_ATTEMPTS', 5)) if max_attempts is None else max_attempts
+        self.base_delay = _env_float('LLM_RETRY_BASE_DELAY', 0.5) if base_delay is None else base_delay
+        self.max_delay = _env_float('LLM_RETRY_MAX_DELAY', 8) if max_delay is None else max_delay
+        self.deadlines = {
+            INTERACTIVE: _env_float('LLM_DEADLINE_SECONDS', 20) if interactive_deadline is None else interactive_deadline,
+            BULK: _env_float('LLM_BULK_DEADLINE_SECONDS', 120) if bulk_deadline is None else bulk_deadline,
+        }
+        # 0 disables hedging; otherwise a duplicate request is sent if the first is still pending.
+        self.hedge_after = _env_float('LLM_HEDGE_AFTER_SECONDS', 0) if hedge_after is None else hedge_after
+        # A blocking client call cannot be interrupted, so a call abandoned at
+        # its deadline keeps its worker until the API returns. Every call holds
+        # one of `max_concurrency` slots until then and the pool has exactly
+        # that many threads: abandoned calls are capped at the pool size, and new
+        # calls wait (within their deadline) for a free slot instead of queueing
+        # unseen behind them.
+        self.max_concurrency = max(1, int(_env_float('LLM_MAX_CONCURRENCY', 16)) if max_concurrency is None
+                                   else max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='llm')
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._abandoned = 0
+        self._abandoned_lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+    def bucket(self, api_key: str = None) -> TokenBucket:
+        key = api_key if api_key is not None else os.getenv('GOOGLE_API_KEY', '')
+        with self._buckets_lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.requests_per_minute, self.burst)
+            return bucket
+
+    def _acquire(self, priority: int, end: float) -> bool:
+        start = time.monotonic()
+        acquired = self.bucket().acquire(priority, timeout=max(0.0, end - start))
+        RATE_LIMIT_WAIT.observe(time.monotonic() - start, priority=PRIORITY_NAMES[priority])
+        return acquired
+
+    def _backoff(self, attempt: int, end: float) -> float:
+        # Full jitter: a random delay up to the exponential cap, never past the deadline.
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return min(delay, max(0.0, end - time.monotonic()))
+
+    def _submit(self, end: float, func: Callable, *args, wait_for_slot: bool = True) -> Optional[Future]:
+        # Runs `func` on a worker once a slot is free. Raises TimeoutError if
+        # none frees up before `end`, or returns None without waiting.
+        timeout = max(0.0, end - time.monotonic()) if wait_for_slot else 0
+        if not self._slots.acquire(timeout=timeout):
+            if not wait_for_slot:
+                return None
+            raise TimeoutError(f"No free LLM worker before the deadline ({self.max_concurrency} busy)")
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _abandon(self, future: Future, stage: str):
+        if future.done() or future.cancel():
+            return
+        LLM_ABANDONED.inc(stage=stage)
+        with self._abandoned_lock:
+            self._abandoned += 1
+        future.add_done_callback(self._abandoned_done)
+
+    def _abandoned_done(self, future: Future):
+        with self._abandoned_lock:
+            self._abandoned -= 1
+
+    def stats(self) -> dict:
+        with self._abandoned_lock:
+            return {'max_concurrency': self.max_concurrency, 'abandoned_running': self._abandoned}
+
+    def _attempt(self, func: Callable, end: float, stage: str):
+        future = self._submit(end, func)
+        pending = {future}
+        if self.hedge_after > 0:
+            done, _ = wait(pending, timeout=min(self.hedge_after, max(0.0, end - time.monotonic())))
+            # A hedge duplicates a request already paid for, so it takes no
+            # rate-limit token; it is only sent if a worker slot is free at once.
+            if not done and time.monotonic() < end:
+                hedge = self._submit(end, func, wait_for_slot=False)
+                if hedge is not None:
+                    LLM_HEDGES.inc(stage=stage, outcome='sent')
+                    pending.add(hedge)
+
+        error = None
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=max(0.0, end - time.monotonic()), return_when=FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"LLM call exceeded its deadline ({stage})")
+                for finished in done:
+                    if finished.exception() is None:
+                        if finished is not future:
+                            LLM_HEDGES.inc(stage=stage, outcome='won')
+                        return finished.result()
+                    error = finished.exception()
+            raise error
+        finally:
+            for unfinished in pending:
+                self._abandon(unfinished, stage)
+
+    def _next_chunk(self, iterator: Iterator, end: float, stage: str):
+        future = self._submit(end, next, iterator, None)
+        try:
+            return future.result(timeout=max(0.0, end - time.monotonic()))
+        except TimeoutError:
+            self._abandon(future, stage)
+            raise TimeoutError(f"LLM stream exceeded its deadline ({stage})")
+
+    def call(self, func: Callable, stage: str = 'llm', priority: int = None, deadline: float = None,
+             trace: Optional[Span] = None):
+        # `trace` is the caller's span; its `retries` attribute is kept up to date.
+        priority = current_priority() if priority is None else priority
+        end = time.monotonic() + (self.deadlines[priority] if deadline is None else deadline)
+        attempts = 0
+        last_error = None
+        while attempts < self.max_attempts:
+            if not self._acquire(priority, end):
+                raise LLMUnavailable('rate_limited', attempts, last_error)
+            attempts += 1
+            if trace is not None:
+                trace.set(retries=attempts - 1)
+            try:
+                return self._attempt(func, end, stage)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+            if time.monotonic() >= end:
+                break
+            LLM_RETRIES.inc(stage=stage)
+            time.sleep(self._backoff(attempts, end))
+        reason = 'deadline_exceeded' if time.monotonic() >= end else 'retries_exhausted'
+        raise LLMUnavailable(reason, attempts, last_error)
+
+    def stream(self, open_stream: Callable[[], Iterator], stage: str = 'llm', priority: int = None,
+               deadline: float = None, trace: Optional[Span] = None) -> Iterator:
+        # Retries happen only before the first chunk; once text has been shown it cannot be replayed.
+        # The deadline covers the whole response: a stream still running past it
+        # is abandoned and LLMUnavailable raised after the chunks already yielded.
+        priority = current_priority() if priority is None else priority
+        end = time.monotonic() + (self.deadlines[priority] if deadline is None else deadline)
+        attempts = 0
+        last_error = None
+        while attempts < self.max_attempts:
+            if not self._acquire(priority, end):
+                raise LLMUnavailable('rate_limited', attempts, last_error)
+            attempts += 1
+            if trace is not None:
+                trace.set(retries=attempts - 1)
+            iterator = None
+            try:
+                iterator = iter(open_stream())
+                chunk = self._next_chunk(iterator, end, stage)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+            else:
+                while chunk is not None:
+                    yield chunk
+                    try:
+                        chunk = self._next_chunk(iterator, end, stage)
+                    except TimeoutError as e:
+                        raise LLMUnavailable('deadline_exceeded', attempts, e) from e
+                return
+            if time.monotonic() >= end:
+                break
+            LLM_RETRIES.inc(stage=stage)
+            time.sleep(self._backoff(attempts, end))
+        reason = 'deadline_exceeded' if time.monotonic() >= end else 'retries_exhausted'
+        raise LLMUnavailable(reason, attempts, last_error)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = Scheduler()
+    return _scheduler
+
+
+def set_scheduler(scheduler: Optional[Scheduler]):
+    global _scheduler
+    _scheduler = scheduler
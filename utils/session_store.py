@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Iterator, List, Optional
+
+DEFAULT_PATH = '.sessions.sqlite3'
+
+
+class SessionStore:
+    # Interview sessions as zlib-compressed JSON records in a WAL-mode SQLite
+    # file, so checkpoints don't block readers in other Streamlit sessions.
+    # Every session belongs to an owner (a signed-in user or a per-browser
+    # token); reads, searches and writes only ever see the caller's own rows.
+
+    def __init__(self, path: str = DEFAULT_PATH, max_age: Optional[float] = 30 * 24 * 3600):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, owner TEXT NOT NULL DEFAULT '', title TEXT NOT NULL, search_text TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, data BLOB NOT NULL)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")]
+        if 'owner' not in columns:
+            # Sessions saved before owners existed stay unowned: hidden from
+            # everyone in the app, still reachable by the export CLI.
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_owner ON sessions (owner, updated_at)")
+        self._conn.commit()
+        self._digests = {}
+        if max_age:
+            self.evict_older_than(max_age)
+
+    def save(self, session_id: str, owner: str, record: dict, title: str = "", search_text: str = "") -> bool:
+        # Returns False when nothing changed, or when the id belongs to another owner.
+        if not owner:
+            raise ValueError("Sessions must be saved with an owner")
+        data = zlib.compress(json.dumps(record, separators=(',', ':')).encode('utf-8'), 6)
+        digest = hashlib.sha1(data).digest()
+        if self._digests.get((owner, session_id)) == digest:
+            return False
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO sessions (id, owner, title, search_text, created_at, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "title = excluded.title, search_text = excluded.search_text, "
+                "updated_at = excluded.updated_at, data = excluded.data "
+                "WHERE sessions.owner = excluded.owner",
+                (session_id, owner, title, (title + "\n" + search_text).lower(), now, now, data)
+            )
+            self._conn.commit()
+        if not cursor.rowcount:
+            return False
+        self._digests[(owner, session_id)] = digest
+        return True
+
+    def load(self, session_id: str, owner: str) -> Optional[dict]:
+        if not owner:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM sessions WHERE id = ? AND owner = ?",
+                                     (session_id, owner)).fetchone()
+        if row is None:
+            return None
+        self._digests[(owner, session_id)] = hashlib.sha1(row[0]).digest()
+        return json.loads(zlib.decompress(row[0]))
+
+    @staticmethod
+    def _search_clause(query: str):
+        terms = query.lower().split()
+        params = ['%' + t.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%' for t in terms]
+        return " AND ".join("search_text LIKE ? ESCAPE '\\'" for _ in terms), params
+
+    def list_sessions(self, owner: str, query: str = "", limit: int = 20) -> List[dict]:
+        where, params = self._search_clause(query)
+        sql = "SELECT id, title, created_at, updated_at FROM sessions WHERE owner = ?"
+        if where:
+            sql += " AND " + where
+        sql += " ORDER BY updated_at DESC LIMIT ?"
+        params = [owner, *params, limit]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{'id': r[0], 'title': r[1], 'created_at': r[2], 'updated_at': r[3]} for r in rows]
+
+    def iter_sessions(self, owner: Optional[str], query: str = "", batch_size: int = 200) -> Iterator[dict]:
+        # Every matching session, oldest update first, fetched in keyset-paged
+        # batches so exports stream without holding the lock or all rows.
+        # owner=None reads every owner's sessions; only offline tools do that.
+        where, params = self._search_clause(query)
+        if owner is not None:
+            where = " AND ".join(filter(None, ["owner = ?", where]))
+            params = [owner, *params]
+        last = (-1.0, '')
+        while True:
+            sql = ("SELECT id, title, created_at, updated_at, data FROM sessions WHERE (updated_at, id) > (?, ?)"
+                   + (" AND " + where if where else "") + " ORDER BY updated_at, id LIMIT ?")
+            with self._lock:
+                rows = self._conn.execute(sql, [*last, *params, batch_size]).fetchall()
+            for session_id, title, created_at, updated_at, data in rows:
+                yield {'id': session_id, 'title': title, 'created_at': created_at, 'updated_at': updated_at,
+                       'record': json.loads(zlib.decompress(data))}
+            if len(rows) < batch_size:
+                return
+            last = (rows[-1][3], rows[-1][0])
+
+    def delete(self, session_id: str, owner: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ? AND owner = ?", (session_id, owner))
+            self._conn.commit()
+        self._digests.pop((owner, session_id), None)
+
+    def evict_older_than(self, seconds: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - seconds,))
+            self._conn.commit()
+        self._digests.clear()
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions").fetchone()
+        return {'sessions': count, 'stored_bytes': size, 'path': self.path}
+
+
+def user_owner(identity: str) -> str:
+    return 'user:' + identity.strip().lower()
+
+
+def token_owner(token: str) -> str:
+    # Per-browser tokens are secrets carried in the page link; only a hash is stored.
+    return 'token:' + hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> Optional[SessionStore]:
+    # SESSION_STORE_PATH= (empty) turns persistence off.
+    global _store
+    path = os.getenv('SESSION_STORE_PATH', DEFAULT_PATH)
+    if not path:
+        return None
+    with _store_lock:
+        if _store is None or _store.path != path:
+            max_age_days = float(os.getenv('SESSION_MAX_AGE_DAYS', 30))
+            _store = SessionStore(path, max_age=max_age_days * 24 * 3600 if max_age_days > 0 else None)
+        return _store
@@ -0,0 +1,150 @@
+import json
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+DEFAULT_TAXONOMY = {
+    'Python': ['python'],
+    'Java': ['java'],
+    'JavaScript': ['javascript', 'js', 'ecmascript'],
+    'TypeScript': ['typescript'],
+    'React': ['react', 'reactjs', 'react.js'],
+    'Angular': ['angular', 'angularjs'],
+    'Vue': ['vue', 'vuejs', 'vue.js'],
+    'Svelte': ['svelte'],
+    'Node.js': ['node.js', 'nodejs'],
+    'Express': ['express', 'expressjs', 'express.js'],
+    'Django': ['django'],
+    'Flask': ['flask'],
+    'Spring': ['spring', 'springboot', 'spring boot'],
+    'SQL': ['sql'],
+    'NoSQL': ['nosql'],
+    'MongoDB': ['mongodb', 'mongo'],
+    'PostgreSQL': ['postgresql', 'postgres'],
+    'MySQL': ['mysql'],
+    'Redis': ['redis'],
+    'DynamoDB': ['dynamodb'],
+    'AWS': ['aws', 'amazon web services'],
+    'Azure': ['azure'],
+    'GCP': ['gcp', 'google cloud'],
+    'Cloud': ['cloud'],
+    'Docker': ['docker'],
+    'Kubernetes': ['kubernetes', 'k8s'],
+    'Git': ['git'],
+    'CI/CD': ['ci/cd', 'ci cd', 'continuous integration', 'continuous delivery'],
+    'Jenkins': ['jenkins'],
+    'GitHub Actions': ['github actions'],
+    'GitLab': ['gitlab'],
+    'REST API': ['rest api', 'rest', 'restful'],
+    'API': ['api', 'apis'],
+    'GraphQL': ['graphql'],
+    'gRPC': ['grpc'],
+    'SOAP': ['soap'],
+    'HTML': ['html', 'html5'],
+    'CSS': ['css', 'css3'],
+    'Sass': ['sass', 'scss'],
+    'Tailwind': ['tailwind', 'tailwindcss'],
+    'Bootstrap': ['bootstrap'],
+    'Webpack': ['webpack'],
+    'Vite': ['vite'],
+    'Babel': ['babel'],
+    'npm': ['npm'],
+    'Yarn': ['yarn'],
+    'Microservices': ['microservices', 'microservice'],
+    'Serverless': ['serverless'],
+    'Lambda': ['lambda', 'aws lambda'],
+    'Agile': ['agile'],
+    'Scrum': ['scrum'],
+    'DevOps': ['devops'],
+    'Machine Learning': ['machine learning', 'ml'],
+    'AI': ['ai', 'artificial intelligence'],
+    'Deep Learning': ['deep learning'],
+    'Data Science': ['data science'],
+    'TensorFlow': ['tensorflow'],
+    'PyTorch': ['pytorch'],
+    'Keras': ['keras'],
+    'Pandas': ['pandas'],
+    'NumPy': ['numpy'],
+    'scikit-learn': ['scikit-learn', 'sklearn', 'scikit learn'],
+    'NLP': ['nlp', 'natural language processing'],
+    'Computer Vision': ['computer vision'],
+    'OpenCV': ['opencv'],
+    'LLM': ['llm', 'llms', 'large language models'],
+    'C++': ['c++', 'cpp'],
+    'C#': ['c#', 'csharp'],
+    '.NET': ['.net', 'dotnet'],
+    'Go': ['go', 'golang'],
+    'Rust': ['rust'],
+    'Ruby': ['ruby'],
+    'PHP': ['php'],
+    'Cassandra': ['cassandra'],
+    'Elasticsearch': ['elasticsearch'],
+    'Kafka': ['kafka'],
+    'RabbitMQ': ['rabbitmq'],
+    'Testing': ['testing', 'unit testing'],
+    'Jest': ['jest'],
+    'pytest': ['pytest'],
+    'Selenium': ['selenium'],
+    'JUnit': ['junit'],
+}
+
+
+class SkillMatch(NamedTuple):
+    name: str
+    count: int
+    positions: List[int]
+
+
+class SkillMatcher:
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self.taxonomy = taxonomy
+        self._canonical = {}
+        for name, aliases in taxonomy.items():
+            for alias in [name] + list(aliases):
+                self._canonical[alias.lower()] = name
+
+        # Longest alias first so "rest api" wins over "rest" and "c++" over "c".
+        alternation = '|'.join(re.escape(alias) for alias in sorted(self._canonical, key=len, reverse=True))
+        # Skill names contain ".", "+", "#" and "/", so \b is not enough; the
+        # lookarounds treat any letter or digit next to the match as a word char.
+        self._pattern = re.compile(rf'(?<![a-z0-9])(?:{alternation})(?![a-z0-9+#])')
+
+    def match(self, text: str) -> List[SkillMatch]:
+        found = {}
+        for m in self._pattern.finditer(text.lower()):
+            name = self._canonical[m.group(0)]
+            found.setdefault(name, []).append(m.start())
+        matches = [SkillMatch(name, len(positions), positions) for name, positions in found.items()]
+        matches.sort(key=lambda m: (-m.count, m.positions[0]))
+        return matches
+
+    def canonicalize(self, skill: str) -> str:
+        return self._canonical.get(skill.strip().lower(), skill.strip())
+
+
+def load_taxonomy(path: str) -> Dict[str, List[str]]:
+    with open(path, encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    if not isinstance(taxonomy, dict) or not all(isinstance(v, list) for v in taxonomy.values()):
+        raise ValueError(f"Skill taxonomy in {path} must map skill names to lists of aliases")
+    return taxonomy
+
+
+_default_matcher = None
+
+
+def get_skill_matcher() -> SkillMatcher:
+    global _default_matcher
+    if _default_matcher is None:
+        taxonomy = dict(DEFAULT_TAXONOMY)
+        taxonomy_path = os.getenv('SKILL_TAXONOMY_PATH')
+        if taxonomy_path:
+            taxonomy.update(load_taxonomy(taxonomy_path))
+        _default_matcher = SkillMatcher(taxonomy)
+    return _default_matcher
+
+
+def set_skill_matcher(matcher: Optional[SkillMatcher]):
+    global _default_matcher
+    _default_matcher = matcher
+
@@ -0,0 +1,102 @@
+import json
+import re
+from typing import Any, Callable, List
+
+from utils.telemetry import Counter, register_metric
+
+PARSE_FAILURES = register_metric(Counter('interview_agent_parse_failures_total',
+                                         'LLM responses that failed structured parsing'))
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+}
+
+
+class StructuredOutputError(ValueError):
+    pass
+
+
+def schema_prompt(schema: dict) -> str:
+    return f"Respond with ONLY a JSON object (no prose, no code fences) matching this JSON schema:\n{json.dumps(schema, separators=(',', ':'))}"
+
+
+def extract_json(text: str) -> Any:
+    # Models sometimes wrap JSON in code fences or add a sentence around it.
+    text = text.strip()
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end <= start:
+        raise StructuredOutputError("No JSON object found in response")
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"Invalid JSON in response: {e}") from e
+
+
+def validate(value: Any, schema: dict, path: str = '$') -> List[str]:
+    # Supports the subset of JSON Schema the prompts use: type, properties,
+    # required, items, enum, minimum/maximum and minItems/maxItems.
+    errors = []
+    expected = schema.get('type')
+    if expected:
+        python_type = _TYPES[expected]
+        is_bool = isinstance(value, bool)
+        if not isinstance(value, python_type) or (is_bool and expected in ('integer', 'number')):
+            return [f"{path}: expected {expected}, got {type(value).__name__}"]
+    if 'enum' in schema and value not in schema['enum']:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+    if 'minimum' in schema and value < schema['minimum']:
+        errors.append(f"{path}: {value} is below {schema['minimum']}")
+    if 'maximum' in schema and value > schema['maximum']:
+        errors.append(f"{path}: {value} is above {schema['maximum']}")
+    if isinstance(value, dict):
+        for key in schema.get('required', ()):
+            if key not in value:
+                errors.append(f"{path}: missing '{key}'")
+        for key, subschema in schema.get('properties', {}).items():
+            if key in value:
+                errors.extend(validate(value[key], subschema, f"{path}.{key}"))
+    if isinstance(value, list):
+        if 'minItems' in schema and len(value) < schema['minItems']:
+            errors.append(f"{path}: fewer than {schema['minItems']} items")
+        if 'maxItems' in schema and len(value) > schema['maxItems']:
+            errors.append(f"{path}: more than {schema['maxItems']} items")
+        if 'items' in schema:
+            for index, item in enumerate(value):
+                errors.extend(validate(item, schema['items'], f"{path}[{index}]"))
+    return errors
+
+
+def parse_structured(text: str, schema: dict, stage: str = 'llm', count_failure: bool = True) -> dict:
+    # Callers with a fallback layout pass count_failure=False and count the
+    # failure themselves once the fallback has failed too.
+    try:
+        data = extract_json(text)
+        errors = validate(data, schema)
+        if errors:
+            raise StructuredOutputError("; ".join(errors[:5]))
+        return data
+    except StructuredOutputError:
+        if count_failure:
+            PARSE_FAILURES.inc(stage=stage)
+        raise
+
+
+def keep_parsed(parse: Callable[[str], object], parsed: list) -> Callable[[str], None]:
+    # A validator for invoke_llm/stream_llm that keeps what it parsed, so a
+    # response is parsed once rather than again after the call returns.
+    def validate(content: str):
+        parsed.append(parse(content))
+    return validate
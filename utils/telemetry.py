@@ -0,0 +1,198 @@
+import bisect
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RECENT_SPANS_PER_SESSION = 50
+MAX_TRACKED_SESSIONS = 256
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_session_id = contextvars.ContextVar('telemetry_session', default=None)
+
+
+def bind_session(session_id: Optional[str]):
+    _session_id.set(session_id)
+
+
+def current_session() -> Optional[str]:
+    return _session_id.get()
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Tuple[str, tuple, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def samples(self) -> List[Tuple[str, tuple, float]]:
+        out = []
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['counts']):
+                    cumulative += count
+                    out.append((f"{self.name}_bucket", key + (('le', repr(float(bound))),), cumulative))
+                out.append((f"{self.name}_bucket", key + (('le', '+Inf'),), series['count']))
+                out.append((f"{self.name}_sum", key, series['sum']))
+                out.append((f"{self.name}_count", key, series['count']))
+        return out
+
+
+SPAN_DURATION = Histogram('interview_agent_span_duration_seconds', 'Duration of traced pipeline stages')
+LLM_CALLS = Counter('interview_agent_llm_calls_total', 'LLM calls by stage and cache outcome')
+LLM_TOKENS = Counter('interview_agent_llm_tokens_total', 'Estimated LLM tokens by direction')
+LLM_RETRIES = Counter('interview_agent_llm_retries_total', 'LLM call retries')
+FALLBACKS = Counter('interview_agent_fallbacks_total', 'Stages that fell back to a local result')
+SPAN_ERRORS = Counter('interview_agent_span_errors_total', 'Stages that raised')
+METRICS = [SPAN_DURATION, LLM_CALLS, LLM_TOKENS, LLM_RETRIES, FALLBACKS, SPAN_ERRORS]
+
+
+def register_metric(metric):
+    METRICS.append(metric)
+    return metric
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in labels) + "}"
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in METRICS:
+        kind = 'histogram' if isinstance(metric, Histogram) else 'counter'
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {kind}")
+        lines.extend(f"{name}{_format_labels(labels)} {value}" for name, labels, value in metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+class Span:
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.session_id = current_session()
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'session': self.session_id,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            'error': self.error,
+            **self.attrs,
+        }
+
+
+_recent = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+def _remember(span: Span):
+    key = span.session_id or '-'
+    with _recent_lock:
+        spans = _recent.get(key)
+        if spans is None:
+            spans = _recent[key] = deque(maxlen=RECENT_SPANS_PER_SESSION)
+            while len(_recent) > MAX_TRACKED_SESSIONS:
+                _recent.popitem(last=False)
+        else:
+            _recent.move_to_end(key)
+        spans.append(span.to_dict())
+
+
+def recent_spans(session_id: Optional[str] = None, limit: int = 20) -> List[dict]:
+    with _recent_lock:
+        spans = list(_recent.get(session_id or '-', ()))
+    return spans[-limit:]
+
+
+def configure_logging():
+    # LOG_LEVEL applies to this package's loggers (utils.*) only; the root
+    # logger and third-party libraries keep whatever the host configured.
+    package = logging.getLogger(__name__.split('.')[0])
+    package.setLevel(os.getenv('LOG_LEVEL', 'WARNING').upper())
+    if not package.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        package.addHandler(handler)
+        package.propagate = False
+
+
+def _sample_rate() -> float:
+    return float(os.getenv('TRACE_SAMPLE_RATE', 1.0))
+
+
+@contextmanager
+def span(name: str, **attrs):
+    current = Span(name, attrs)
+    start = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.error = type(e).__name__
+        SPAN_ERRORS.inc(span=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        current.duration_ms = round(elapsed * 1000, 2)
+        SPAN_DURATION.observe(elapsed, span=name)
+        if current.attrs.get('fallback_used'):
+            FALLBACKS.inc(span=name, reason=current.attrs.get('fallback_reason', 'error'))
+        _remember(current)
+        if logger.isEnabledFor(logging.INFO) and random.random() < _sample_rate():
+            logger.info("span %s %.1fms %s", name, current.duration_ms,
+                        " ".join(f"{k}={v}" for k, v in current.attrs.items()),
+                        extra={'span': current.to_dict()})
+
+
+def record_llm_call(stage: str, cache_hit: bool, tokens_in: int, tokens_out: int):
+    LLM_CALLS.inc(stage=stage, cache='hit' if cache_hit else 'miss')
+    if not cache_hit:
+        LLM_TOKENS.inc(tokens_in, direction='in')
+        LLM_TOKENS.inc(tokens_out, direction='out')
+
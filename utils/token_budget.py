@@ -0,0 +1,232 @@
+import contextvars
+import math
+import os
+import re
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+from utils.telemetry import current_session
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*•▪●◦]|\d+[.)])\s+")
+_HEADING_PATTERN = re.compile(r"^[A-Za-z][A-Za-z /&'-]{1,50}:?$")
+
+SECTION_PRIORITIES = [
+    (('requirement', 'qualification', 'must have', 'skills', 'technical', 'what you bring', 'you have'), 0),
+    (('responsibilit', 'what you will do', "what you'll do", 'experience', 'role', 'duties', 'nice to have', 'preferred', 'projects'), 1),
+    (('about', 'benefit', 'perks', 'compensation', 'salary', 'culture', 'who we are', 'equal opportunity', 'how to apply'), 3),
+]
+
+BOILERPLATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r"equal opportunity",
+        r"without regard to (race|color|religion)",
+        r"reasonable accommodation",
+        r"apply (now|today)",
+        r"privacy (policy|notice)",
+        r"\bcookie (policy|settings)",
+        r"all rights reserved",
+        r"^page \d+( of \d+)?$",
+    )
+]
+
+
+class TokenBudgetExceeded(Exception):
+    pass
+
+
+def count_tokens(text: str) -> int:
+    # Roughly matches SentencePiece-style tokenizers: punctuation is one token,
+    # words cost about one token per four characters.
+    if not text:
+        return 0
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def _section_priority(heading: str) -> int:
+    heading = heading.lower()
+    for keywords, priority in SECTION_PRIORITIES:
+        if any(keyword in heading for keyword in keywords):
+            return priority
+    return 2
+
+
+def _is_heading(line: str) -> bool:
+    if _BULLET_PATTERN.match(line) or len(line) > 60:
+        return False
+    return bool(_HEADING_PATTERN.match(line)) and (line.endswith(':') or line.isupper() or len(line.split()) <= 4)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    used = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        used += max(1, math.ceil(len(match.group(0)) / 4))
+        if used > max_tokens:
+            return text[:match.start()].rstrip()
+    return text
+
+
+def compact_text(text: str, max_tokens: int) -> str:
+    if not text:
+        return ""
+
+    lines = []
+    seen = set()
+    for raw_line in text.splitlines():
+        line = " ".join(raw_line.split())
+        key = line.lower()
+        if not line or key in seen or any(p.search(line) for p in BOILERPLATE_PATTERNS):
+            continue
+        seen.add(key)
+        lines.append(line)
+
+    cleaned = "\n".join(lines)
+    if count_tokens(cleaned) <= max_tokens:
+        return cleaned
+
+    ranked = []
+    priority = 2
+    for position, line in enumerate(lines):
+        if _is_heading(line):
+            priority = _section_priority(line)
+            rank = priority
+        else:
+            # Bullets inside a section are the requirements themselves; keep them ahead of prose.
+            rank = priority + (0 if _BULLET_PATTERN.match(line) else 0.5)
+        ranked.append((rank, position, line))
+
+    kept = []
+    used = 0
+    for rank, position, line in sorted(ranked):
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            if not kept:
+                kept.append((position, _truncate_to_tokens(line, max_tokens)))
+            continue
+        kept.append((position, line))
+        used += cost
+
+    kept_lines = [line for _, line in sorted(kept)]
+    # Drop headings whose section content was all cut.
+    return "\n".join(
+        line for i, line in enumerate(kept_lines)
+        if not _is_heading(line) or (i + 1 < len(kept_lines) and not _is_heading(kept_lines[i + 1]))
+    )
+
+
+class TokenBudget:
+    def __init__(self, per_session: Optional[int] = None):
+        self.per_session = per_session
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.calls = 0
+        # Calls refused for lack of budget; callers usually fall back rather than fail.
+        self.refusals = 0
+        self._lock = threading.Lock()
+
+    @property
+    def used(self) -> int:
+        return self.tokens_in + self.tokens_out
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.per_session is None else max(0, self.per_session - self.used)
+
+    def check(self, tokens_in: int):
+        with self._lock:
+            if self.per_session is not None and self.used + tokens_in > self.per_session:
+                self.refusals += 1
+                raise TokenBudgetExceeded(
+                    f"Session token budget exhausted ({self.used}/{self.per_session} used, {tokens_in} requested)"
+                )
+
+    def charge(self, tokens_in: int, tokens_out: int):
+        with self._lock:
+            self.tokens_in += tokens_in
+            self.tokens_out += tokens_out
+            self.calls += 1
+
+
+class BudgetScope:
+    # One use_budget block. `refused` is set when the budget refuses a call made
+    # inside it, including from threads that run a copy of its context, so
+    # concurrent requests sharing a budget cannot see each other's refusals.
+    def __init__(self, budget: Optional[TokenBudget]):
+        self.budget = budget
+        self.refused = False
+
+
+_active_scope = contextvars.ContextVar('token_budget', default=None)
+
+
+@contextmanager
+def use_budget(budget: Optional[TokenBudget]):
+    scope = BudgetScope(budget)
+    token = _active_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _active_scope.reset(token)
+
+
+def get_active_budget() -> Optional[TokenBudget]:
+    scope = _active_scope.get()
+    return None if scope is None else scope.budget
+
+
+def max_prompt_tokens() -> int:
+    return int(os.getenv('MAX_PROMPT_TOKENS', 4000))
+
+
+def session_budget_from_env() -> TokenBudget:
+    return TokenBudget(per_session=int(os.getenv('SESSION_TOKEN_BUDGET', 0)) or None)
+
+
+_call_log = deque(maxlen=200)
+_totals = {'calls': 0, 'cached_calls': 0, 'tokens_in': 0, 'tokens_out': 0}
+_stats_lock = threading.Lock()
+
+
+def record_call(model: str, tokens_in: int, tokens_out: int, cached: bool = False):
+    with _stats_lock:
+        _totals['calls'] += 1
+        if cached:
+            _totals['cached_calls'] += 1
+        else:
+            _totals['tokens_in'] += tokens_in
+            _totals['tokens_out'] += tokens_out
+        _call_log.append({'model': model, 'tokens_in': tokens_in, 'tokens_out': tokens_out, 'cached': cached,
+                          'session': current_session()})
+
+
+def get_token_stats(last: int = 20, session_id: Optional[str] = None) -> dict:
+    # Totals are process-wide; `recent` is limited to one session's calls when given.
+    with _stats_lock:
+        recent = [call for call in _call_log if session_id is None or call['session'] == session_id]
+        return dict(_totals, recent=recent[-last:])
+
+
+def check_prompt(prompt: str) -> int:
+    tokens_in = count_tokens(prompt)
+    limit = max_prompt_tokens()
+    if tokens_in > limit:
+        raise TokenBudgetExceeded(f"Prompt is {tokens_in} tokens, over the per-call limit of {limit}")
+    scope = _active_scope.get()
+    if scope is not None and scope.budget is not None:
+        try:
+            scope.budget.check(tokens_in)
+        except TokenBudgetExceeded:
+            scope.refused = True
+            raise
+    return tokens_in
+
+
+def charge_call(model: str, tokens_in: int, output: str, cached: bool = False) -> int:
+    tokens_out = count_tokens(output)
+    record_call(model, tokens_in, tokens_out, cached)
+    budget = get_active_budget()
+    if budget is not None and not cached:
+        budget.charge(tokens_in, tokens_out)
+    return tokens_out
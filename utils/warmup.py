@@ -0,0 +1,49 @@
+import logging
+import os
+import threading
+
+from utils.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+_started = False
+_done = threading.Event()
+_lock = threading.Lock()
+
+
+def warm_up():
+    # Loads the heavy dependencies deferred at import time: the Gemini client
+    # libraries and the PDF/DOCX parsers.
+    from utils import document_processor, llm_client
+
+    with span('warm_up') as stage:
+        for name, func in (('llm', llm_client.warm_up), ('parsers', document_processor.warm_up)):
+            try:
+                func()
+            except Exception as e:
+                logger.warning("Warm-up of %s failed: %s", name, e)
+                stage.set(**{f"{name}_failed": True})
+
+
+def _run():
+    try:
+        warm_up()
+    finally:
+        _done.set()
+
+
+def start_background_warm_up() -> bool:
+    # Once per process, on a daemon thread; APP_WARM_UP=0 turns it off.
+    global _started
+    if os.getenv('APP_WARM_UP', '1').lower() in ('0', 'false', 'no'):
+        return False
+    with _lock:
+        if _started:
+            return False
+        _started = True
+    threading.Thread(target=_run, name='warm-up', daemon=True).start()
+    return True
+
+
+def wait_for_warm_up(timeout: float = None) -> bool:
+    return _done.wait(timeout)